@@ -8,3 +8,74 @@ class Config:
     MAILGUN_DOMAIN = os.getenv('MAILGUN_DOMAIN')
     MAILGUN_PASSWORD = os.getenv('MAILGUN_PASSWORD')
     FIREBASE_CREDENTIALS_PATH = os.getenv("FIREBASE_CREDENTIALS_PATH")
+    # Upstream base URLs, overridable so the app can run against local stand-ins (see benchmark.py)
+    GOOGLE_PLACES_API_URL = os.getenv("GOOGLE_PLACES_API_URL", "https://maps.googleapis.com/maps/api/place")
+    RAPIDAPI_SCRAPER_URL = os.getenv("RAPIDAPI_SCRAPER_URL", "https://website-social-scraper-api.p.rapidapi.com/contacts")
+    APPS_SCRIPT_SHEET_URL = os.getenv("APPS_SCRIPT_SHEET_URL", "https://script.google.com/macros/s/AKfycbx5kuuR9WqK9ZxFNrWuy2lvEwpeG1CimGBfwcVtpEReBoSnNc1gCO6XiQcVsm598U8C/exec")
+    APPS_SCRIPT_FORM_URL = os.getenv("APPS_SCRIPT_FORM_URL", "https://script.google.com/macros/s/AKfycbzIQ2UFxgqcNasLr24x4CKDtIwtqEMJ-0O5mUrBqRGeZ59CR-_UrQekZCwSePa0VvGb/exec")
+    TRANSLATE_API_ENDPOINT = os.getenv("TRANSLATE_API_ENDPOINT")  # Unset means Google's endpoint and credentials
+    TRANSLATE_BATCH_MAX_TEXTS = int(os.getenv("TRANSLATE_BATCH_MAX_TEXTS", 128))  # Strings per upstream request
+    TRANSLATE_BATCH_MAX_CHARS = int(os.getenv("TRANSLATE_BATCH_MAX_CHARS", 5000))  # Characters per upstream request
+    TRANSLATION_CACHE_TTL = int(os.getenv("TRANSLATION_CACHE_TTL", 90 * 24 * 3600))
+    TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", 20000))
+    TRANSLATION_CACHE_PERSIST = os.getenv("TRANSLATION_CACHE_PERSIST", "true").lower() == "true"  # Share via CACHE_PATH
+    TRANSLATION_CACHE_DISK_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_DISK_MAX_ENTRIES", 200000))
+    PLACES_NEXT_PAGE_DELAY = float(os.getenv("PLACES_NEXT_PAGE_DELAY", 2))  # Seconds before a next_page_token is usable
+    PLACES_PAGE_TOKEN_RETRIES = int(os.getenv("PLACES_PAGE_TOKEN_RETRIES", 3))  # Extra tries for a token not yet valid
+    PLACE_DETAILS_MAX_WORKERS = int(os.getenv("PLACE_DETAILS_MAX_WORKERS", 8))
+    CACHE_PATH = os.getenv("CACHE_PATH", "cache.sqlite3")
+    PLACE_DETAILS_CACHE_TTL = int(os.getenv("PLACE_DETAILS_CACHE_TTL", 30 * 24 * 3600))
+    PLACE_DETAILS_NEGATIVE_CACHE_TTL = int(os.getenv("PLACE_DETAILS_NEGATIVE_CACHE_TTL", 7 * 24 * 3600))
+    PLACE_DETAILS_CACHE_MAX_ENTRIES = int(os.getenv("PLACE_DETAILS_CACHE_MAX_ENTRIES", 100000))
+    BUSINESS_QUERY_CACHE_TTL = int(os.getenv("BUSINESS_QUERY_CACHE_TTL", 24 * 3600))
+    BUSINESS_QUERY_CACHE_MAX_ENTRIES = int(os.getenv("BUSINESS_QUERY_CACHE_MAX_ENTRIES", 5000))
+    LEAD_DISCOVERY_ENGINE = os.getenv("LEAD_DISCOVERY_ENGINE", "threads")  # "threads" or "asyncio"
+    ASYNC_SCRAPE_CONCURRENCY = int(os.getenv("ASYNC_SCRAPE_CONCURRENCY", 200))
+    ASYNC_DETAILS_CONCURRENCY = int(os.getenv("ASYNC_DETAILS_CONCURRENCY", 20))
+    ASYNC_HTTP_TIMEOUT = float(os.getenv("ASYNC_HTTP_TIMEOUT", 30))
+    RAPIDAPI_RATE_LIMIT = float(os.getenv("RAPIDAPI_RATE_LIMIT", 5))  # Starting requests per second
+    RAPIDAPI_MIN_RATE = float(os.getenv("RAPIDAPI_MIN_RATE", 0.5))
+    RAPIDAPI_MAX_RATE = float(os.getenv("RAPIDAPI_MAX_RATE", 20))
+    RAPIDAPI_BURST = int(os.getenv("RAPIDAPI_BURST", 10))
+    SCRAPER_MAX_RETRIES = int(os.getenv("SCRAPER_MAX_RETRIES", 4))
+    SCRAPER_BACKOFF_BASE = float(os.getenv("SCRAPER_BACKOFF_BASE", 0.5))
+    SCRAPER_BACKOFF_CAP = float(os.getenv("SCRAPER_BACKOFF_CAP", 8))
+    CONTACT_INFO_CACHE_TTL = int(os.getenv("CONTACT_INFO_CACHE_TTL", 30 * 24 * 3600))
+    CONTACT_INFO_NEGATIVE_CACHE_TTL = int(os.getenv("CONTACT_INFO_NEGATIVE_CACHE_TTL", 24 * 3600))
+    CONTACT_INFO_CACHE_MAX_ENTRIES = int(os.getenv("CONTACT_INFO_CACHE_MAX_ENTRIES", 100000))
+    SCRAPER_MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", 10))
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 10))  # Number of hosts kept pooled
+    HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", SCRAPER_MAX_WORKERS + PLACE_DETAILS_MAX_WORKERS))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 30))
+    APPS_SCRIPT_TIMEOUT = float(os.getenv("APPS_SCRIPT_TIMEOUT", 120))
+    JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 3600))
+    JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.sqlite3")
+    JOB_QUEUE_WORKER_PROCESSES = int(os.getenv("JOB_QUEUE_WORKER_PROCESSES", 2))
+    JOB_QUEUE_VISIBILITY_TIMEOUT = float(os.getenv("JOB_QUEUE_VISIBILITY_TIMEOUT", 600))
+    JOB_QUEUE_MAX_ATTEMPTS = int(os.getenv("JOB_QUEUE_MAX_ATTEMPTS", 3))
+    JOB_QUEUE_RETRY_BACKOFF = float(os.getenv("JOB_QUEUE_RETRY_BACKOFF", 30))
+    JOB_QUEUE_POLL_INTERVAL = float(os.getenv("JOB_QUEUE_POLL_INTERVAL", 1))
+    SMTP_HOST = os.getenv("SMTP_HOST", "smtp.eu.mailgun.org")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", 587))  # Use port 587 for TLS
+    SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+    SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", 4))
+    SURVEY_MAX_ANSWER_CHARS = int(os.getenv("SURVEY_MAX_ANSWER_CHARS", 500))
+    SURVEY_MAP_REDUCE_THRESHOLD = int(os.getenv("SURVEY_MAP_REDUCE_THRESHOLD", 6000))  # Estimated prompt tokens
+    SURVEY_CHUNK_TOKENS = int(os.getenv("SURVEY_CHUNK_TOKENS", 3000))
+    SURVEY_CHUNK_MAX_TOKENS = int(os.getenv("SURVEY_CHUNK_MAX_TOKENS", 500))
+    SURVEY_CHUNK_CONCURRENCY = int(os.getenv("SURVEY_CHUNK_CONCURRENCY", 4))
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")  # "openai" or "fake" for load tests
+    FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", 0.5))  # Seconds before the first token
+    FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", 50))
+    FAKE_LLM_FORM_PATH = os.getenv("FAKE_LLM_FORM_PATH")  # JSON file replacing the canned form design
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 24 * 3600))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1000))
+    LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "false").lower() == "true"
+    LLM_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", 20000))
+    METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", 1000))  # Calls kept per endpoint for latency percentiles
+    FEEDBACK_ANALYSIS_TTL = int(os.getenv("FEEDBACK_ANALYSIS_TTL", 30 * 24 * 3600))
+    FEEDBACK_ANALYSIS_MAX_ENTRIES = int(os.getenv("FEEDBACK_ANALYSIS_MAX_ENTRIES", 10000))
+    EMAIL_RATE_LIMIT = float(os.getenv("EMAIL_RATE_LIMIT", 5))  # Messages per second across all job workers
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+    EMAIL_RETRY_BACKOFF = float(os.getenv("EMAIL_RETRY_BACKOFF", 60))
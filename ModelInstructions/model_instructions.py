@@ -103,7 +103,7 @@ class Instructions:
 
     Data Handling:
 
-    The input will be a table where the first row contains column headers representing product-related questions, and subsequent rows contain customer responses.
+    The input starts with the number of responses and a numbered list of the product-related questions (Q1, Q2, ...). Answers to multiple-choice, checkbox, dropdown and scale questions are given as exact counts, percentages, means and NPS scores; use these numbers as they are instead of estimating them. Free-text answers follow as CSV whose columns are the question numbers, one row per response. Answers ending in … were shortened.
     Filter out responses with nonsensical, irrelevant, or joke entries. Only analyze meaningful and genuine feedback.
     Analysis Goals:
 
@@ -119,4 +119,22 @@ class Instructions:
     Key Observations: List the most common themes or trends in the feedback.
     Recommendations: Provide concise suggestions to enhance the product.
     Text Output: Return the analyzed data in plain text format within a copyable text box for easy use.
-    """
\ No newline at end of file
+    """
+    SYSTEM_INSTRUCTIONS_ANALYSIS_CHUNK = """
+    Purpose: Take notes on one part of the free-text answers to a product validation survey, or combine notes already taken on several parts. Another analyst will merge your notes with the notes on the other parts, so do not write an overall conclusion or recommendations. If the data is in Bulgarian write the notes in Bulgarian, otherwise in English.
+
+    Data Handling:
+
+    The questions are listed first as Q1, Q2, ... The answers follow either as CSV whose columns are those question numbers, one row per response, or as notes on earlier parts.
+    Filter out responses with nonsensical, irrelevant, or joke entries. Only analyze meaningful and genuine feedback.
+
+    Notes Format:
+
+    Recurring Themes: Common topics, with roughly how many responses mention each.
+    Positive Sentiments: Phrases or themes reflecting satisfaction or praise.
+    Negative Sentiments: Concerns, complaints, or suggestions for improvement.
+    Quotes: A few short, representative quotes.
+    """
+    SYSTEM_INSTRUCTIONS_ANALYSIS_UPDATE = """
+    Purpose: Update an earlier analysis of customer feedback with responses that arrived since. You receive the previous analysis, which covers the first responses, followed by the new responses (or an analysis of them). Fold the new feedback into the previous analysis: combine counts and percentages weighted by the number of responses each side covers, keep themes that still hold, and add or revise themes the new responses support. Return one complete analysis of all responses, not a description of what changed.
+    """ + SYSTEM_INSTRUCTIONS_ANALYSIS
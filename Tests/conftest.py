@@ -0,0 +1,54 @@
+import socket
+import threading
+
+import pytest
+from aiosmtpd.controller import Controller
+from Config.config import Config
+from utils.rate_limiter import rapidapi_limiter
+from utils.llm_cache import llm_response_cache
+from utils.metrics import call_metrics
+from utils.translation import translation_memory
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Point every on-disk cache at a fresh file and empty the in-process ones so tests never share state."""
+    monkeypatch.setattr(Config, "CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(Config, "JOB_QUEUE_PATH", str(tmp_path / "jobs.sqlite3"))
+    llm_response_cache.clear()
+    translation_memory.clear()
+    call_metrics.reset()
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiter(monkeypatch):
+    """Start every test with an unthrottled RapidAPI limiter and near-instant retry backoff."""
+    rapidapi_limiter.reset(rate=1000, burst=1000, min_rate=1, max_rate=1000)
+    monkeypatch.setattr(Config, "SCRAPER_BACKOFF_BASE", 0.001)
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            self.messages.append((envelope.mail_from, list(envelope.rcpt_tos), envelope.content))
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    """Local SMTP stand-in recording every delivered message."""
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
@@ -0,0 +1,12 @@
+"""Tasks for the worker process test in test_job_queue.py; worker processes import this module by name."""
+import os
+
+from Config.config import Config
+
+
+def square_task(job, payload):
+    job.update(pid=os.getpid(), processes=Config.JOB_QUEUE_WORKER_PROCESSES)
+    return payload["value"] ** 2
+
+
+TASKS = {"square": square_task}
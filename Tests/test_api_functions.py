@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 from flask import Flask, request
 from api_functions.api_functions import ApiFunctions
+from ModelInstructions.model_instructions import Instructions
 import pandas as pd
 import json
 import os
@@ -22,7 +23,7 @@ def client(test_app):
     return test_app.test_client()
 
 
-@patch("api_functions.api_functions.requests.post")
+@patch("utils.http_client.post")
 def test_create_google_form_success(mock_requests_post, test_app):
     """Tests the successful creation of a Google Form."""
 
@@ -48,7 +49,7 @@ def test_create_google_form_success(mock_requests_post, test_app):
         assert response["spreadsheetUrl"] == "https://sheets.google.com/survey_data"
 
 
-@patch("api_functions.api_functions.requests.post")
+@patch("utils.http_client.post")
 def test_create_google_form_failure(mock_requests_post, test_app):
     """Tests failure case when Google Form creation fails."""
 
@@ -69,7 +70,7 @@ def test_create_google_form_failure(mock_requests_post, test_app):
         assert response["error"] == "Failed to create Google Form"
 
 
-@patch("api_functions.api_functions.requests.post")
+@patch("utils.http_client.post")
 def test_create_google_form_invalid_json(mock_requests_post, test_app):
     """Tests case where API response is not valid JSON."""
 
@@ -119,6 +120,28 @@ def test_call_openai_agent_success(test_app):
         assert response == "This is a test response."
 
 
+def test_call_openai_agent_caches_repeated_descriptions(test_app):
+    """Tests that repeats differing only in whitespace reuse the first completion."""
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value.choices = [MagicMock(message=MagicMock(content="Form JSON"))]
+
+    for description in ["We sell eco-friendly products.", "  We sell   eco-friendly\nproducts. "]:
+        with test_app.test_request_context(json={"business_description": description}):
+            assert ApiFunctions.call_openai_agent(mock_client) == "Form JSON"
+
+    assert mock_client.chat.completions.create.call_count == 1
+
+
+def test_complete_chat_cache_is_keyed_by_instructions():
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value.choices = [MagicMock(message=MagicMock(content="Reply"))]
+
+    ApiFunctions.complete_chat(mock_client, "Instructions v1", "Same content")
+    ApiFunctions.complete_chat(mock_client, "Instructions v2", "Same content")
+    ApiFunctions.complete_chat(mock_client, "Instructions v2", "Same content", max_tokens=500)
+
+    assert mock_client.chat.completions.create.call_count == 3
+
 def test_call_openai_agent_failure(test_app):
     """Tests handling of API failure."""
 
@@ -264,3 +287,401 @@ def test_analyze_feedback_openai_error(test_app):
             assert "error" in data
             assert data["error"] == "Failed to analyze survey data"
 
+
+
+def test_discover_business_emails_reports_progress():
+    """Test that lead discovery reports counts and partial emails to its job."""
+    job = MagicMock()
+    contacts = [
+        ("http://a.com", {"emails": ["info@a.com", "sales@a.com"]}),
+        ("http://b.com", {"emails": []}),
+        ("http://c.com", {"result": {"emails": ["hello@c.com"]}}),
+    ]
+
+    def fake_iter_contact_info(websites):
+        list(websites)
+        return iter(contacts)
+
+    with patch("api_functions.api_functions.iter_businesses", return_value=iter(["http://a.com", "http://b.com", "http://c.com", "N/A"])), \
+            patch("api_functions.api_functions.iter_contact_info", side_effect=fake_iter_contact_info):
+        emails = ApiFunctions.discover_business_emails("cafes in sofia", job=job)
+
+    assert emails == ["info@a.com", "hello@c.com"]
+    last_update = job.update.call_args
+    assert last_update.kwargs == {
+        "result": ["info@a.com", "hello@c.com"],
+        "placesFound": 4,
+        "sitesScraped": 3,
+        "emailsFound": 2,
+    }
+
+
+def test_discover_business_emails_asyncio_engine_reports_progress():
+    """The asyncio engine reports the same progress as the threaded one, while it runs."""
+    job = MagicMock()
+
+    def fake_discover(query, on_page, on_contact):
+        on_page(["http://a.com", "N/A", "http://b.com"])
+        on_contact("http://a.com", {"emails": ["info@a.com"]})
+        assert job.update.call_args.kwargs == {"result": ["info@a.com"], "placesFound": 3, "sitesScraped": 1,
+                                               "emailsFound": 1}
+        on_contact("http://b.com", None)
+
+    with patch("api_functions.api_functions.Config.config.Config.LEAD_DISCOVERY_ENGINE", "asyncio"), \
+            patch("api_functions.api_functions.discover_business_contacts_sync", side_effect=fake_discover):
+        emails = ApiFunctions.discover_business_emails("cafes in sofia", job=job)
+
+    assert emails == ["info@a.com"]
+    assert job.update.call_args.kwargs == {"result": ["info@a.com"], "placesFound": 3, "sitesScraped": 2,
+                                           "emailsFound": 1}
+
+
+def test_get_business_emails_returns_unique_emails(test_app):
+    """Tests the synchronous lead discovery endpoint."""
+    with test_app.test_request_context(json={"googlePlacesQuery": "cafes in sofia"}):
+        with patch.object(ApiFunctions, "discover_business_emails", return_value=["info@a.com"]) as mock_discover:
+            response, status_code = ApiFunctions.get_business_emails()
+
+    mock_discover.assert_called_once_with("cafes in sofia")
+    assert status_code == 200
+    assert response == ["info@a.com"]
+
+
+def test_enqueue_job(test_app):
+    """Tests queueing an endpoint's work on the durable job queue."""
+    with test_app.test_request_context(json={"task": "analyze_feedback", "payload": {"spreadsheetId": "sheet"}}):
+        with patch("api_functions.api_functions.job_queue.enqueue", return_value="job123") as mock_enqueue:
+            response, status_code = ApiFunctions.enqueue_job()
+
+    assert status_code == 202
+    assert json.loads(response.data) == {"jobId": "job123", "status": "queued"}
+    mock_enqueue.assert_called_once_with("analyze_feedback", {"spreadsheetId": "sheet"}, max_attempts=None)
+
+
+def test_enqueue_job_send_email_gets_one_attempt(test_app):
+    """Re-running send_email would mail the recipients it already reached again."""
+    payload = {"recipients": ["a@example.com"], "formUrl": "https://f"}
+    with test_app.test_request_context(json={"task": "send_email", "payload": payload}):
+        with patch("api_functions.api_functions.job_queue.enqueue", return_value="job123") as mock_enqueue:
+            ApiFunctions.enqueue_job()
+
+    mock_enqueue.assert_called_once_with("send_email", payload, max_attempts=1)
+
+
+@pytest.mark.parametrize("recipients", [None, [], ["a@example.com\r\nBcc: v@y.com"], ["Eve <e@x.com>"], [1]])
+def test_enqueue_job_send_email_rejects_invalid_recipients(test_app, recipients):
+    with test_app.test_request_context(json={"task": "send_email",
+                                             "payload": {"recipients": recipients, "formUrl": "https://f"}}):
+        with patch("api_functions.api_functions.job_queue.enqueue") as mock_enqueue:
+            _, status_code = ApiFunctions.enqueue_job()
+
+    assert status_code == 400
+    mock_enqueue.assert_not_called()
+
+
+def test_send_email_task_sends_through_send_bulk():
+    from api_functions.job_tasks import send_email_task
+
+    job = MagicMock()
+    results = [{"recipient": "a@example.com", "status": "sent"},
+               {"recipient": "b@example.com", "status": "failed", "error": "550"}]
+    with patch.object(ApiFunctions, "send_bulk_survey_emails", return_value=results) as mock_send:
+        outcome = send_email_task(job, {"recipients": ["a@example.com", "b@example.com"], "formUrl": "https://f"})
+
+    mock_send.assert_called_once_with(["a@example.com", "b@example.com"], "https://f")
+    assert outcome == {"sent": 1, "failed": 1, "results": results}
+    job.update.assert_called_once_with(sent=1, failed=1)
+
+
+def test_enqueue_job_unknown_task(test_app):
+    with test_app.test_request_context(json={"task": "mine_bitcoin"}):
+        response, status_code = ApiFunctions.enqueue_job()
+
+    assert status_code == 400
+
+
+def test_get_job(test_app):
+    with test_app.test_request_context():
+        with patch("api_functions.api_functions.job_queue.get", return_value={"jobId": "job123", "status": "done"}):
+            response, status_code = ApiFunctions.get_job("job123")
+        missing_response, missing_status_code = ApiFunctions.get_job("missing")
+
+    assert status_code == 200
+    assert json.loads(response.data)["status"] == "done"
+    assert missing_status_code == 404
+
+
+def test_business_emails_job_progress_is_shared_through_the_queue(test_app):
+    """A job accepted by one web worker and run by a queue worker is visible to any worker that polls it."""
+    from api_functions.job_tasks import TASKS
+    from utils.job_queue import SqliteJobQueue, run_job
+
+    with test_app.test_request_context(json={"task": "business_emails", "payload": {"googlePlacesQuery": "cafes"}}):
+        response, _ = ApiFunctions.enqueue_job()
+    job_id = json.loads(response.data)["jobId"]
+
+    worker_queue = SqliteJobQueue()  # Its own connection, like a separate worker process
+    with patch("api_functions.api_functions.iter_businesses", return_value=iter(["http://a.com"])), \
+            patch("api_functions.api_functions.iter_contact_info",
+                  side_effect=lambda websites: iter([(website, {"emails": ["info@a.com"]}) for website in websites])):
+        run_job(worker_queue, TASKS, worker_queue.claim())
+
+    with test_app.test_request_context():
+        response, status_code = ApiFunctions.get_job(job_id)
+    job = json.loads(response.data)
+    assert status_code == 200
+    assert job["status"] == "done"
+    assert job["result"] == ["info@a.com"]
+    assert job["progress"] == {"placesFound": 1, "sitesScraped": 1, "emailsFound": 1}
+
+
+def test_analyze_feedback_task_runs_analysis():
+    from api_functions.job_tasks import analyze_feedback_task
+
+    fake_data = pd.DataFrame({"Question": ["Q1"], "Response": ["Yes"]})
+    job = MagicMock()
+    with patch("api_functions.api_functions.fetch_sheet_data", return_value=fake_data), \
+            patch("api_functions.job_tasks.get_openai_client"), \
+            patch.object(ApiFunctions, "complete_chat", return_value="Insights"):
+        result = analyze_feedback_task(job, {"spreadsheetId": "sheet"})
+
+    assert result == {"insights": "Insights", "analyzedRows": 1, "newRows": 1, "incremental": False}
+    job.update.assert_called_once_with(rows=1, newRows=1)
+
+
+def test_start_email_campaign_suppresses_duplicates(test_app):
+    """Tests that a campaign is queued once per unique recipient and reports its progress."""
+    recipients = ["a@example.com", "A@example.com ", "b@example.com"]
+    with test_app.test_request_context(json={"recipients": recipients, "formUrl": "https://forms.google.com/x"}):
+        with patch("api_functions.api_functions.job_queue.enqueue", return_value="job123") as mock_enqueue:
+            response, status_code = ApiFunctions.start_email_campaign()
+        data = json.loads(response.data)
+        progress_response, progress_status_code = ApiFunctions.get_email_campaign(data["campaignId"])
+
+    assert status_code == 202
+    assert data["jobId"] == "job123"
+    assert data["queued"] == 2
+    assert data["duplicatesSuppressed"] == 1
+    mock_enqueue.assert_called_once_with("email_campaign", {"campaignId": data["campaignId"]})
+    assert progress_status_code == 200
+    assert json.loads(progress_response.data) == {"sent": 0, "failed": 0, "pending": 2, "total": 2, "failures": []}
+
+
+def test_email_campaign_missing_fields_and_unknown_id(test_app):
+    with test_app.test_request_context(json={"recipients": []}):
+        _, status_code = ApiFunctions.start_email_campaign()
+        _, missing_status_code = ApiFunctions.get_email_campaign("missing")
+
+    assert status_code == 400
+    assert missing_status_code == 404
+
+
+def test_analyze_survey_data_map_reduces_large_surveys(monkeypatch):
+    """Tests that a survey above the size threshold is analyzed in concurrent chunks and merged."""
+    import threading
+    import time
+    from Config.config import Config
+    from ModelInstructions.model_instructions import Instructions
+
+    monkeypatch.setattr(Config, "SURVEY_MAP_REDUCE_THRESHOLD", 400)
+    monkeypatch.setattr(Config, "SURVEY_CHUNK_TOKENS", 150)
+    monkeypatch.setattr(Config, "SURVEY_CHUNK_CONCURRENCY", 2)
+
+    df = pd.DataFrame({
+        "Rating": [i % 10 + 1 for i in range(60)],
+        "What would make you switch suppliers?": [
+            f"Respondent {i} wants faster delivery and a discount of {i} percent on bulk orders" for i in range(60)
+        ],
+    })
+
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+    prompts = []
+
+    def create(model, messages, max_tokens):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            prompts.append(messages)
+        time.sleep(0.01)
+        with lock:
+            active["now"] -= 1
+        final = messages[0]["content"] == Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS
+        return MagicMock(choices=[MagicMock(message=MagicMock(content="Final insights" if final else "notes"))])
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+
+    assert ApiFunctions.analyze_survey_data(client, df) == "Final insights"
+
+    chunk_calls = [m for m in prompts if m[0]["content"] == Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS_CHUNK]
+    final_calls = [m for m in prompts if m[0]["content"] == Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS]
+    assert len(chunk_calls) > 2
+    assert active["max"] == 2
+    assert len(final_calls) == 1
+    assert "Q1 (scale, 60 answers): mean 5.5" in final_calls[0][1]["content"]
+    assert "Part 1:\nnotes" in final_calls[0][1]["content"]
+
+
+def test_analyze_survey_data_small_survey_uses_one_call():
+    client = MagicMock()
+    client.chat.completions.create.return_value.choices[0].message.content = "Insights"
+    df = pd.DataFrame({"Comments": ["Great", "Too pricey"]})
+
+    assert ApiFunctions.analyze_survey_data(client, df) == "Insights"
+    assert client.chat.completions.create.call_count == 1
+
+
+def test_analyze_spreadsheet_only_analyzes_new_rows():
+    """Tests that repeated analyses fetch from the last analyzed row and fold new rows into the stored insights."""
+    client = MagicMock()
+    first = pd.DataFrame({"Comments": ["Great", "Too pricey"]})
+    new = pd.DataFrame({"Comments": ["Needs an API"]})
+
+    with patch("api_functions.api_functions.fetch_sheet_data", side_effect=[first, new, pd.DataFrame()]) as mock_fetch, \
+            patch.object(ApiFunctions, "complete_chat", side_effect=["Initial insights", "Updated insights"]) as mock_chat:
+        initial = ApiFunctions.analyze_spreadsheet(client, "sheet")
+        updated = ApiFunctions.analyze_spreadsheet(client, "sheet")
+        unchanged = ApiFunctions.analyze_spreadsheet(client, "sheet")
+
+    assert initial == {"insights": "Initial insights", "analyzedRows": 2, "newRows": 2, "incremental": False}
+    assert updated == {"insights": "Updated insights", "analyzedRows": 3, "newRows": 1, "incremental": True}
+    assert unchanged == {"insights": "Updated insights", "analyzedRows": 3, "newRows": 0, "incremental": True}
+    assert [c.kwargs["start_row"] for c in mock_fetch.call_args_list] == [0, 2, 3]
+    assert mock_chat.call_count == 2
+    assert mock_chat.call_args_list[0][0][1] == Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS
+    assert mock_chat.call_args_list[1][0][1] == Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS_UPDATE
+    prompt = mock_chat.call_args[0][2]
+    assert prompt.startswith("Previous analysis of the first 2 responses:\n\nInitial insights")
+    assert "Needs an API" in prompt and "Too pricey" not in prompt
+
+
+def test_analyze_feedback_full_recompute(test_app):
+    fake_data = pd.DataFrame({"Comments": ["Great", "Too pricey"]})
+    with patch("api_functions.api_functions.fetch_sheet_data", return_value=fake_data) as mock_fetch, \
+            patch.object(ApiFunctions, "complete_chat", return_value="Insights") as mock_chat:
+        for _ in range(2):
+            with test_app.test_request_context(json={"spreadsheetId": "sheet", "fullRecompute": True}):
+                response, status_code = ApiFunctions.analyze_feedback(MagicMock())
+
+    assert status_code == 200
+    assert json.loads(response.data)["incremental"] is False
+    assert [c[0][1] for c in mock_chat.call_args_list] == [Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS] * 2
+    assert [c.kwargs["start_row"] for c in mock_fetch.call_args_list] == [0, 0]
+
+
+class FakeCompletionStream:
+    """Stands in for the OpenAI Stream returned by create(stream=True)."""
+
+    def __init__(self, texts):
+        self.chunks = [MagicMock(choices=[MagicMock(delta=MagicMock(content=text))]) for text in texts]
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if self.closed:
+                return
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def parse_sse(body):
+    events = []
+    for block in body.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n") if line and not line.startswith(":"))
+        if lines:
+            events.append((lines.get("event"), json.loads(lines["data"])))
+    return events
+
+
+def test_call_openai_agent_stream_relays_deltas(test_app):
+    """Tests that form design tokens are relayed as server-sent events and the finished reply is cached."""
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = FakeCompletionStream(["{\"formTitle\"", ": \"Eco\"}"])
+
+    with test_app.test_request_context(json={"business_description": "We sell eco-friendly products."}):
+        response = ApiFunctions.call_openai_agent_stream(mock_client)
+        body = "".join(response.response)
+        again = "".join(ApiFunctions.call_openai_agent_stream(mock_client).response)
+
+    assert response.mimetype == "text/event-stream"
+    assert parse_sse(body) == [
+        ("delta", {"text": "{\"formTitle\""}),
+        ("delta", {"text": ": \"Eco\"}"}),
+        ("done", {"text": "{\"formTitle\": \"Eco\"}"}),
+    ]
+    assert mock_client.chat.completions.create.call_args.kwargs["stream"] is True
+    assert mock_client.chat.completions.create.call_count == 1
+    assert parse_sse(again)[-1] == ("done", {"text": "{\"formTitle\": \"Eco\"}"})
+
+
+def test_call_openai_agent_stream_disconnect_cancels_upstream(test_app):
+    mock_client = MagicMock()
+    upstream = FakeCompletionStream(["one", "two", "three"])
+    mock_client.chat.completions.create.return_value = upstream
+
+    with test_app.test_request_context(json={"business_description": "We sell eco-friendly products."}):
+        response = ApiFunctions.call_openai_agent_stream(mock_client)
+        chunks = iter(response.response)
+        next(chunks)  # stream open comment
+        assert parse_sse(next(chunks)) == [("delta", {"text": "one"})]
+        response.close()  # what the WSGI server does when the client goes away
+
+    assert upstream.closed
+    # A cut-off completion must not be served from the cache later
+    mock_client.chat.completions.create.return_value = FakeCompletionStream(["full"])
+    with test_app.test_request_context(json={"business_description": "We sell eco-friendly products."}):
+        body = "".join(ApiFunctions.call_openai_agent_stream(mock_client).response)
+    assert parse_sse(body)[-1] == ("done", {"text": "full"})
+
+
+def test_call_openai_agent_stream_missing_description(test_app):
+    with test_app.test_request_context(json={}):
+        _, status_code = ApiFunctions.call_openai_agent_stream(MagicMock())
+    assert status_code == 400
+
+
+def test_analyze_feedback_stream(test_app):
+    """Tests status, delta and done events of the streaming analysis, and its error event."""
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = FakeCompletionStream(["Mostly ", "positive"])
+    fake_data = pd.DataFrame({"Comments": ["Great", "Too pricey"]})
+
+    with test_app.test_request_context(json={"spreadsheetId": "sheet"}):
+        with patch("api_functions.api_functions.fetch_sheet_data", return_value=fake_data):
+            events = parse_sse("".join(ApiFunctions.analyze_feedback_stream(mock_client).response))
+        with patch("api_functions.api_functions.fetch_sheet_data", return_value=pd.DataFrame()), \
+                patch("api_functions.api_functions.feedback_analysis_cache.get", return_value=None):
+            empty_events = parse_sse("".join(ApiFunctions.analyze_feedback_stream(mock_client).response))
+
+    assert events == [
+        ("status", {"stage": "fetching"}),
+        ("status", {"stage": "analyzing", "newRows": 2}),
+        ("delta", {"text": "Mostly "}),
+        ("delta", {"text": "positive"}),
+        ("done", {"insights": "Mostly positive", "analyzedRows": 2, "newRows": 2, "incremental": False}),
+    ]
+    assert empty_events[-1] == ("error", {"error": "No survey data provided"})
+
+
+def test_analyze_feedback_stream_matches_analyze_spreadsheet(test_app):
+    """Tests that the streamed analysis folds new rows into the stored insights like analyze_spreadsheet does."""
+    previous = {"rows": 2, "insights": "Initial insights"}
+    new = pd.DataFrame({"Comments": ["Needs an API"]})
+    mock_client = MagicMock()
+    mock_client.chat.completions.create.return_value = FakeCompletionStream(["Updated insights"])
+
+    with patch("api_functions.api_functions.fetch_sheet_data", return_value=new) as mock_fetch, \
+            patch("api_functions.api_functions.feedback_analysis_cache.get", return_value=previous), \
+            patch("api_functions.api_functions.feedback_analysis_cache.set"):
+        with test_app.test_request_context(json={"spreadsheetId": "sheet"}):
+            events = parse_sse("".join(ApiFunctions.analyze_feedback_stream(mock_client).response))
+        with patch.object(ApiFunctions, "complete_chat", return_value="Updated insights") as mock_chat:
+            expected = ApiFunctions.analyze_spreadsheet(MagicMock(), "sheet")
+
+    assert events[-1] == ("done", expected)
+    assert [c.kwargs["start_row"] for c in mock_fetch.call_args_list] == [2, 2]
+    streamed = mock_client.chat.completions.create.call_args.kwargs["messages"]
+    assert [m["content"] for m in streamed] == list(mock_chat.call_args[0][1:3])
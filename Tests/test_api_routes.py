@@ -99,3 +99,105 @@ def test_translate_to_en(client, mocker):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert data['status'] == 'success'
+
+
+# Test the translate/batch route
+def test_translate_batch(client, mocker):
+    mocker.patch.object(ApiFunctions, 'translate_batch', return_value={"translations": ["Здравей"]})
+
+    response = client.post('/api/translate/batch', json={"texts": ["Hello"], "direction": "to_bg"})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['translations'] == ["Здравей"]
+
+
+# Test the cache_stats route
+def test_cache_stats(client, mocker):
+    mocker.patch.object(ApiFunctions, 'cache_stats', return_value={"status": "success"})
+
+    response = client.get('/api/cache_stats')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['status'] == 'success'
+
+
+# Test the http_pool_stats route
+def test_http_pool_stats(client, mocker):
+    mocker.patch.object(ApiFunctions, 'http_pool_stats', return_value={"status": "success"})
+
+    response = client.get('/api/http_pool_stats')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['status'] == 'success'
+
+
+# Test the job queue routes
+def test_enqueue_job(client, mocker):
+    mocker.patch.object(ApiFunctions, 'enqueue_job', return_value=({"jobId": "job123"}, 202))
+
+    response = client.post('/api/jobs', json={"task": "analyze_feedback", "payload": {}})
+    assert response.status_code == 202
+
+
+def test_get_job(client, mocker):
+    mock_get_job = mocker.patch.object(ApiFunctions, 'get_job', return_value={"status": "success"})
+
+    response = client.get('/api/jobs/job123')
+    assert response.status_code == 200
+    mock_get_job.assert_called_once_with('job123')
+
+
+# Test the bulk send_email route
+def test_send_bulk_email(client, mocker):
+    mocker.patch.object(ApiFunctions, 'send_bulk_email', return_value={"status": "success"})
+
+    response = client.post('/api/send_email/bulk', json={"recipients": [], "formUrl": ""})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['status'] == 'success'
+
+# Test the email campaign routes
+def test_start_email_campaign(client, mocker):
+    mocker.patch.object(ApiFunctions, 'start_email_campaign', return_value=({"campaignId": "abc"}, 202))
+
+    response = client.post('/api/email_campaigns', json={"recipients": ["a@x.com"], "formUrl": "https://f"})
+    assert response.status_code == 202
+    assert json.loads(response.data)['campaignId'] == 'abc'
+
+def test_get_email_campaign(client, mocker):
+    mocker.patch.object(ApiFunctions, 'get_email_campaign', return_value=({"pending": 1}, 200))
+
+    response = client.get('/api/email_campaigns/abc')
+    assert response.status_code == 200
+    assert json.loads(response.data)['pending'] == 1
+
+# Test the streaming routes
+def test_call_agent_stream(client, mocker):
+    mocker.patch.object(ApiFunctions, 'call_openai_agent_stream', return_value={"status": "success"})
+
+    response = client.post('/api/call_agent/stream', json={"business_description": "x"})
+    assert response.status_code == 200
+    assert json.loads(response.data)['status'] == 'success'
+
+def test_analyze_feedback_stream(client, mocker):
+    mocker.patch.object(ApiFunctions, 'analyze_feedback_stream', return_value={"status": "success"})
+
+    response = client.post('/api/analyze_feedback/stream', json={"spreadsheetId": "x"})
+    assert response.status_code == 200
+    assert json.loads(response.data)['status'] == 'success'
+
+# Test the metrics route
+def test_metrics(client, mocker):
+    mocker.patch.object(ApiFunctions, 'metrics', return_value={"status": "success"})
+
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert json.loads(response.data)['status'] == 'success'
+
+def test_requests_are_labelled_with_their_endpoint(client, mocker):
+    from utils.metrics import current_endpoint
+    seen = []
+    mocker.patch.object(ApiFunctions, 'call_openai_agent', side_effect=lambda _: seen.append(current_endpoint()) or "ok")
+
+    client.post('/api/call_agent', json={"business_description": "x"})
+    assert seen == ["api.call_agent"]
@@ -0,0 +1,226 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+
+from Config.config import Config
+from utils.async_engine import discover_business_contacts, discover_business_contacts_sync, fetch_place_details
+
+
+def make_transport(pages, scrape_delay=0.0, scrape_status=None, search_status=None):
+    """Build a MockTransport standing in for Google Places and the RapidAPI scraper."""
+    stats = {'in_flight': 0, 'max_in_flight': 0, 'scrapes': 0}
+    scrape_status = scrape_status or {}
+    search_status = list(search_status or [])  # Statuses of the first text search responses, then OK
+
+    async def handler(request):
+        if 'textsearch' in request.url.path:
+            page = int(request.url.params.get('pagetoken') or 0)
+            stats.setdefault('searches', []).append(page)
+            if search_status:
+                status = search_status.pop(0)
+                if status != 'OK':
+                    return httpx.Response(200, json={'status': status, 'results': []})
+            results = [{'place_id': place_id} for place_id in pages[page]]
+            next_page_token = str(page + 1) if page + 1 < len(pages) else None
+            return httpx.Response(200, json={'status': 'OK', 'results': results, 'next_page_token': next_page_token})
+        if 'details' in request.url.path:
+            place_id = request.url.params['place_id']
+            return httpx.Response(200, json={'status': 'OK', 'result': {'website': f'http://{place_id}.com'}})
+
+        website = request.url.params['website']
+        stats['scrapes'] += 1
+        stats['in_flight'] += 1
+        stats['max_in_flight'] = max(stats['max_in_flight'], stats['in_flight'])
+        await asyncio.sleep(scrape_delay)
+        stats['in_flight'] -= 1
+        status = scrape_status.get(website, 200)
+        return httpx.Response(status, json={'emails': [f'info@{website[7:]}']})
+
+    return httpx.MockTransport(handler), stats
+
+
+def test_discover_business_contacts_collects_all_pages():
+    transport, stats = make_transport([['a', 'b'], ['c']])
+
+    with patch.object(Config, 'PLACES_NEXT_PAGE_DELAY', 0):
+        results = discover_business_contacts_sync("test query", transport=transport)
+
+    assert results == {
+        'http://a.com': {'emails': ['info@a.com']},
+        'http://b.com': {'emails': ['info@b.com']},
+        'http://c.com': {'emails': ['info@c.com']},
+    }
+    assert stats['scrapes'] == 3
+
+
+def test_discover_business_contacts_runs_hundreds_in_flight():
+    place_ids = [f'place{i}' for i in range(300)]
+    transport, stats = make_transport([place_ids], scrape_delay=0.2)
+
+    start = time.perf_counter()
+    results = discover_business_contacts_sync("big query", transport=transport, scrape_concurrency=300)
+    elapsed = time.perf_counter() - start
+
+    assert len(results) == 300
+    assert stats['max_in_flight'] > 100
+    assert elapsed < 2
+
+
+def test_discover_business_contacts_respects_scrape_concurrency():
+    place_ids = [f'place{i}' for i in range(20)]
+    transport, stats = make_transport([place_ids], scrape_delay=0.01)
+
+    discover_business_contacts_sync("limited query", transport=transport, scrape_concurrency=5)
+
+    assert stats['max_in_flight'] <= 5
+
+
+def test_discover_business_contacts_failed_scrape_is_none():
+    transport, _ = make_transport([['ok', 'broken']], scrape_status={'http://broken.com': 500})
+
+    results = discover_business_contacts_sync("query with errors", transport=transport)
+
+    assert results['http://ok.com'] == {'emails': ['info@ok.com']}
+    assert results['http://broken.com'] is None
+
+
+def test_discover_business_contacts_scrapes_duplicates_once():
+    transport, stats = make_transport([['same', 'same']])
+
+    results = asyncio.run(discover_business_contacts("duplicate query", transport=transport))
+
+    assert list(results) == ['http://same.com']
+    assert stats['scrapes'] == 1
+
+
+def test_discover_business_contacts_shares_contact_cache():
+    transport, stats = make_transport([['repeat']])
+
+    discover_business_contacts_sync("first campaign", transport=transport)
+    discover_business_contacts_sync("second campaign", transport=transport)
+
+    assert stats['scrapes'] == 1
+
+
+def test_fetch_place_details_error_status_not_cached():
+    statuses = iter(['REQUEST_DENIED', 'OK'])
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.params['place_id'])
+        status = next(statuses)
+        body = {'status': status, 'result': {'website': 'http://denied.com'}} if status == 'OK' else {'status': status}
+        return httpx.Response(200, json=body)
+
+    async def lookup():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            semaphore = asyncio.Semaphore(1)
+            return [await fetch_place_details(client, 'denied', semaphore) for _ in range(3)]
+
+    assert asyncio.run(lookup()) == [{}, {'website': 'http://denied.com'}, {'website': 'http://denied.com'}]
+    assert calls == ['denied', 'denied']
+
+
+def test_discover_business_contacts_retries_page_token_not_yet_valid():
+    transport, stats = make_transport([['a'], ['b']], search_status=['OK', 'INVALID_REQUEST'])
+
+    with patch.object(Config, 'PLACES_NEXT_PAGE_DELAY', 0):
+        results = discover_business_contacts_sync("slow token query", transport=transport)
+
+    assert list(results) == ['http://a.com', 'http://b.com']
+    assert stats['searches'] == [0, 1, 1]
+
+
+def test_discover_business_contacts_error_status_not_cached():
+    transport, stats = make_transport([['a'], ['b']], search_status=['OK', 'OVER_QUERY_LIMIT'])
+
+    with patch.object(Config, 'PLACES_NEXT_PAGE_DELAY', 0):
+        partial = discover_business_contacts_sync("throttled query", transport=transport)
+        complete = discover_business_contacts_sync("throttled query", transport=transport)
+
+    assert list(partial) == ['http://a.com']
+    assert list(complete) == ['http://a.com', 'http://b.com']
+    assert stats['searches'] == [0, 1, 0, 1]
+
+
+def test_discover_business_contacts_keeps_cache_io_off_the_event_loop():
+    transport, _ = make_transport([[f'place{i}' for i in range(10)]])
+
+    def slow_cache_lookup(website_url):
+        time.sleep(0.2)  # A cache write lock held by another process
+        return False, None
+
+    with patch('utils.async_engine.get_cached_contact_info', side_effect=slow_cache_lookup):
+        start = time.perf_counter()
+        results = discover_business_contacts_sync("contended cache query", transport=transport)
+        elapsed = time.perf_counter() - start
+
+    assert len(results) == 10
+    assert elapsed < 1.5
+
+
+def test_discover_business_contacts_one_bad_site_does_not_abort_the_rest():
+    async def handler(request):
+        if 'textsearch' in request.url.path:
+            results = [{'place_id': place_id} for place_id in ('ok', 'garbled', 'slow')]
+            return httpx.Response(200, json={'status': 'OK', 'results': results})
+        if 'details' in request.url.path:
+            place_id = request.url.params['place_id']
+            return httpx.Response(200, json={'status': 'OK', 'result': {'website': f'http://{place_id}.com'}})
+        website = request.url.params['website']
+        if website == 'http://garbled.com':
+            return httpx.Response(200, content=b'<html>not json</html>')
+        if website == 'http://slow.com':
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(200, json={'emails': ['info@ok.com']})
+
+    results = discover_business_contacts_sync("mixed query", transport=httpx.MockTransport(handler))
+
+    assert results == {'http://ok.com': {'emails': ['info@ok.com']}, 'http://garbled.com': None, 'http://slow.com': None}
+
+
+def test_discover_business_contacts_unexpected_scrape_error_is_none():
+    transport, _ = make_transport([['a', 'b']])
+
+    async def flaky_scrape(client, website_url, semaphore):
+        if website_url == 'http://b.com':
+            raise RuntimeError("boom")
+        return {'emails': ['info@a.com']}
+
+    with patch('utils.async_engine.scrape_contact_info_async', side_effect=flaky_scrape):
+        results = discover_business_contacts_sync("flaky query", transport=transport)
+
+    assert results == {'http://a.com': {'emails': ['info@a.com']}, 'http://b.com': None}
+
+
+def test_discover_business_contacts_reads_endpoints_from_config_at_call_time():
+    seen_hosts = []
+
+    async def handler(request):
+        seen_hosts.append(request.url.host)
+        if 'textsearch' in request.url.path:
+            return httpx.Response(200, json={'status': 'OK', 'results': [{'place_id': 'a'}]})
+        if 'details' in request.url.path:
+            return httpx.Response(200, json={'status': 'OK', 'result': {'website': 'http://a.com'}})
+        return httpx.Response(200, json={'emails': ['info@a.com']})
+
+    with patch.object(Config, 'GOOGLE_PLACES_API_URL', 'http://places.test'), \
+            patch.object(Config, 'RAPIDAPI_SCRAPER_URL', 'http://scraper.test/contacts'):
+        discover_business_contacts_sync("configured query", transport=httpx.MockTransport(handler))
+
+    assert seen_hosts == ['places.test', 'places.test', 'scraper.test']
+
+
+def test_discover_business_contacts_reports_pages_and_contacts():
+    transport, stats = make_transport([['a', 'b'], ['a']])
+    pages, contacts = [], []
+
+    with patch.object(Config, 'PLACES_NEXT_PAGE_DELAY', 0):
+        discover_business_contacts_sync("reported query", transport=transport, on_page=pages.append,
+                                        on_contact=lambda website, contact_info: contacts.append(website))
+
+    assert pages == [['http://a.com', 'http://b.com'], ['http://a.com']]
+    assert sorted(contacts) == ['http://a.com', 'http://a.com', 'http://b.com']
+    assert stats['scrapes'] == 2
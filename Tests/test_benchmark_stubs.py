@@ -0,0 +1,129 @@
+import json
+
+import pytest
+from flask import Flask
+from openai import OpenAI
+
+from api_functions.api_functions import ApiFunctions
+from benchmarks.runner import SCENARIOS, compare_results, summarize
+from benchmarks.stubs import (StubServer, create_apps_script_app, create_openai_app, create_places_app,
+                              create_scraper_app, create_translate_app)
+from Config.config import Config
+from ModelInstructions.model_instructions import Instructions
+from utils import translation
+from utils.llm_backend import DEFAULT_FORM
+from utils.utils import fetch_sheet_data, get_businesses, scrape_contact_info
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def serve(app):
+        server = StubServer(app).start()
+        servers.append(server)
+        return server
+
+    yield serve
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def test_app():
+    app = Flask(__name__)
+    app.testing = True
+    return app
+
+
+def test_places_stub_pages_through_next_page_token(stub, monkeypatch):
+    server = stub(create_places_app(pages=3, page_size=5, no_website_ratio=0.2))
+    monkeypatch.setattr(Config, "GOOGLE_PLACES_API_URL", server.url)
+    monkeypatch.setattr(Config, "PLACES_NEXT_PAGE_DELAY", 0)
+
+    websites = get_businesses("cafes in Sofia", use_cache=False)
+
+    assert len(websites) == 15
+    assert "N/A" in websites
+    assert len(set(websites) - {"N/A"}) == len([website for website in websites if website != "N/A"])
+    assert websites == get_businesses("cafes in Sofia", use_cache=False)
+
+
+def test_scraper_stub_injects_429s_that_retries_absorb(stub, monkeypatch):
+    app = create_scraper_app(rate_limited_ratio=0.3, retry_after=0)
+    server = stub(app)
+    monkeypatch.setattr(Config, "RAPIDAPI_SCRAPER_URL", f"{server.url}/contacts")
+
+    results = [scrape_contact_info(f"https://www.shop{i}.com", check_cache=False) for i in range(10)]
+
+    assert all(result["emails"][0] == f"info@shop{i}.com" for i, result in enumerate(results))
+    assert app.config["counts"]["rate_limited"] > 0
+    assert app.config["counts"]["requests"] == 10 + app.config["counts"]["rate_limited"]
+
+
+def test_apps_script_stub_serves_sheets_and_forms(stub, monkeypatch, test_app):
+    server = stub(create_apps_script_app(rows=12))
+    monkeypatch.setattr(Config, "APPS_SCRIPT_SHEET_URL", f"{server.url}/sheet")
+    monkeypatch.setattr(Config, "APPS_SCRIPT_FORM_URL", f"{server.url}/form")
+
+    full = fetch_sheet_data("sheet-1")
+    tail = fetch_sheet_data("sheet-1", start_row=10)
+    assert full.shape == (12, 5)
+    assert tail.reset_index(drop=True).equals(full.iloc[10:].reset_index(drop=True))
+
+    with test_app.test_request_context(json={"form_title": "Survey", "questions": []}):
+        body, status = ApiFunctions.create_google_form()
+    assert status == 200
+    assert body["formUrl"].startswith("https://docs.google.com/forms/d/")
+
+
+def test_openai_stub_speaks_the_chat_completions_api(stub):
+    server = stub(create_openai_app(latency=0, tokens_per_second=0))
+    client = OpenAI(api_key="test", base_url=f"{server.url}/v1")
+
+    reply = client.chat.completions.create(model="gpt-4", messages=[
+        {"role": "system", "content": "Summarize the survey."},
+        {"role": "user", "content": "Hello"}
+    ])
+    assert reply.choices[0].message.content
+    assert reply.usage.completion_tokens > 0
+
+    stream = client.chat.completions.create(model="gpt-4", stream=True, stream_options={"include_usage": True},
+                                            messages=[{"role": "system", "content": Instructions.SYSTEM_INSTRUCTIONS_FORM},
+                                                      {"role": "user", "content": "A bakery"}])
+    chunks = list(stream)
+    text = "".join(chunk.choices[0].delta.content for chunk in chunks if chunk.choices)
+    assert json.loads(text) == DEFAULT_FORM
+    assert chunks[-1].usage.total_tokens > 0
+
+
+def test_translate_stub_behind_translate_client(stub, monkeypatch):
+    server = stub(create_translate_app())
+    monkeypatch.setattr(Config, "TRANSLATE_API_ENDPOINT", server.url)
+    monkeypatch.setattr(translation, "_client", None)
+
+    assert translation.translate_texts(["Hello", "Thanks"], "en", "bg") == ["[bg] Hello", "[bg] Thanks"]
+
+
+def test_scenario_payloads_differ_across_requests_and_scenarios():
+    payloads = [str(scenario.payload(index)) for name, scenario in SCENARIOS.items() for index in range(3)
+                if not name.endswith("_repeated")]
+
+    assert len(set(payloads)) == len(payloads)
+
+
+def test_summarize_and_compare():
+    samples = [{"latency": ms / 1000, "ttfb": None, "ok": ms != 100, "status": 200} for ms in range(1, 101)]
+    current = {"settings": {"requests": 100}, "endpoints": {"call_agent": summarize(samples, wall=2.0)}}
+    previous = {"revision": {"commit": "abc"}, "settings": {"requests": 50},
+                "endpoints": {"call_agent": dict(current["endpoints"]["call_agent"], rps=25.0)}}
+
+    stats = current["endpoints"]["call_agent"]
+    assert stats["rps"] == 50.0
+    assert stats["errors"] == 1
+    assert stats["latency_ms"]["p50"] == pytest.approx(50.5)
+    assert "ttfb_ms" not in stats
+
+    report = compare_results(current, previous)
+    assert "settings differ (requests)" in report
+    assert "+100.0%" in report
@@ -0,0 +1,145 @@
+import email
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from flask import Flask, json
+
+from api_functions.api_functions import ApiFunctions
+from utils.bulk_email import render_envelope, send_bulk, unique_recipients
+from utils.smtp_pool import SmtpConnectionPool
+
+
+def make_pool(controller, **kwargs):
+    return SmtpConnectionPool(controller.hostname, controller.port, use_tls=False, **kwargs)
+
+
+class RefusingHandler:
+    """Accepts everything except recipients at refused.example.com."""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.endswith("@refused.example.com"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        return await self.handler.handle_DATA(server, session, envelope)
+
+
+def test_unique_recipients():
+    assert unique_recipients([" a@x.com", "A@x.com", "b@x.com", "a@x.com "]) == ["a@x.com", "b@x.com"]
+
+
+def test_send_bulk_reports_per_recipient(smtp_server):
+    controller, handler = smtp_server
+    controller.handler = RefusingHandler(handler)
+    pool = make_pool(controller, max_size=4)
+    message = ApiFunctions.build_survey_message("https://forms.google.com/x", "info@pro-val.net")
+    recipients = [f"user{i}@example.com" for i in range(40)] + ["nobody@refused.example.com", "not-an-email"]
+
+    results = send_bulk(pool, "info@pro-val.net", recipients, message, max_connections=4)
+
+    assert [result["recipient"] for result in results] == recipients
+    assert [result["status"] for result in results[:40]] == ["sent"] * 40
+    assert results[40]["status"] == "failed"
+    assert results[41] == {"recipient": "not-an-email", "status": "failed", "error": "Invalid email address"}
+    assert len(handler.messages) == 40
+    assert 1 < pool.stats()["opened"] <= 4
+    pool.close_all()
+
+
+def test_send_bulk_sets_one_to_header_per_recipient(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller)
+    message = ApiFunctions.build_survey_message("https://forms.google.com/x", "info@pro-val.net")
+
+    send_bulk(pool, "info@pro-val.net", ["a@example.com", "b@example.com"], message, max_connections=1)
+
+    for _, rcpt_tos, content in handler.messages:
+        parsed = email.message_from_bytes(content)
+        assert parsed.get_all("To") == rcpt_tos
+        assert "https://forms.google.com/x" in parsed.get_payload()[0].get_payload()
+    pool.close_all()
+
+
+def test_send_bulk_survives_dropped_connection():
+    failing = MagicMock()
+    failing.sendmail.side_effect = ConnectionResetError("connection reset")
+    healthy = MagicMock()
+    pool = MagicMock()
+    pool.connection.return_value.__enter__.side_effect = [failing, healthy]
+    message = ApiFunctions.build_survey_message("https://forms.google.com/x", "info@pro-val.net")
+
+    results = send_bulk(pool, "info@pro-val.net", ["a@example.com", "b@example.com"], message, max_connections=1)
+
+    assert results[0]["status"] == "failed"
+    assert results[1]["status"] == "sent"
+    assert healthy.sendmail.call_count == 1
+
+
+def test_send_bulk_email_endpoint():
+    app = Flask(__name__)
+    results = [{"recipient": "a@example.com", "status": "sent"},
+               {"recipient": "b@example.com", "status": "failed", "error": "550"}]
+    with app.test_request_context(json={"recipients": ["a@example.com", "b@example.com"], "formUrl": "https://f"}):
+        with patch.object(ApiFunctions, "send_bulk_survey_emails", return_value=results):
+            response, status_code = ApiFunctions.send_bulk_email()
+
+    assert status_code == 200
+    assert json.loads(response.data) == {"sent": 1, "failed": 1, "results": results}
+
+
+def test_send_bulk_email_endpoint_missing_fields():
+    app = Flask(__name__)
+    with app.test_request_context(json={"recipients": []}):
+        response, status_code = ApiFunctions.send_bulk_email()
+
+    assert status_code == 400
+
+
+def test_send_bulk_email_endpoint_rejects_non_string_recipients():
+    app = Flask(__name__)
+    with app.test_request_context(json={"recipients": ["a@example.com", 1], "formUrl": "https://f"}):
+        response, status_code = ApiFunctions.send_bulk_email()
+
+    assert status_code == 400
+
+
+def test_send_survey_emails_gives_each_copy_its_own_to_header(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller)
+
+    with patch("api_functions.api_functions.smtp_pool", pool):
+        result = ApiFunctions.send_survey_emails(["a@example.com", "a@x.com\r\nBcc: v@y.com", "b@example.com"],
+                                                 "https://forms.google.com/x")
+
+    assert result["success_count"] == 2
+    assert result["failure_count"] == 1
+    assert [rcpt_tos for _, rcpt_tos, _ in handler.messages] == [["a@example.com"], ["b@example.com"]]
+    for _, rcpt_tos, content in handler.messages:
+        assert email.message_from_bytes(content).get_all("To") == rcpt_tos
+    pool.close_all()
+
+
+def test_send_bulk_rejects_header_injection(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller)
+    message = ApiFunctions.build_survey_message("https://forms.google.com/x", "info@pro-val.net")
+    crafted = ["a@x.com\r\nBcc: victim@y.com", "a@x.com\nBcc: victim@y.com", "Eve <e@x.com>", "a@x.com, b@y.com"]
+
+    results = send_bulk(pool, "info@pro-val.net", crafted + ["ok@example.com"], message, max_connections=1)
+
+    assert [result["status"] for result in results] == ["failed"] * 4 + ["sent"]
+    assert len(handler.messages) == 1
+    assert b"Bcc" not in handler.messages[0][2]
+    pool.close_all()
+
+
+def test_render_envelope_refuses_line_breaks():
+    assert render_envelope("Subject: Hi\n\nBody", "a@x.com") == "To: a@x.com\nSubject: Hi\n\nBody"
+    with pytest.raises(ValueError):
+        render_envelope("Subject: Hi\n\nBody", "a@x.com\r\nBcc: victim@y.com")
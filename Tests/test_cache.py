@@ -0,0 +1,185 @@
+import time
+from unittest.mock import patch, Mock
+from utils.cache import SqliteCache, TieredCache
+from utils.utils import get_place_details, scrape_contact_info, scrape_contact_info_parallel
+from Config.config import Config
+
+
+def test_cache_set_and_get():
+    cache = SqliteCache('test_entries')
+    cache.set('key', {'website': 'http://example.com'}, ttl=60)
+    assert cache.get('key') == {'website': 'http://example.com'}
+    assert cache.get('missing') is None
+
+
+def test_cache_entry_expires():
+    cache = SqliteCache('test_entries')
+    cache.set('key', 'value', ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get('key') is None
+
+
+def test_cache_zero_ttl_stores_nothing():
+    cache = SqliteCache('test_entries')
+    cache.set('key', 'value', ttl=0)
+    assert cache.get('key') is None
+
+
+def test_cache_evicts_entries_closest_to_expiry():
+    cache = SqliteCache('test_entries', max_entries=3)
+    for i in range(5):
+        cache.set(f'key_{i}', i, ttl=60 + i)
+
+    assert len(cache) == 3
+    assert cache.get('key_0') is None
+    assert cache.get('key_1') is None
+    assert cache.get('key_4') == 4
+
+
+def test_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'shared.sqlite3')
+    writer = SqliteCache('test_entries', path=path)
+    reader = SqliteCache('test_entries', path=path)
+    writer.set('key', [1, 2, 3], ttl=60)
+    assert reader.get('key') == [1, 2, 3]
+
+
+def _details_response(result, status_code=200):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = {'status': 'OK', 'result': result}
+    return response
+
+
+def test_get_place_details_served_from_cache():
+    with patch('utils.http_client.get', return_value=_details_response({'website': 'http://cached.com'})) as mock_get:
+        first = get_place_details('cached_place')
+        second = get_place_details('cached_place')
+
+    assert first == second == {'website': 'http://cached.com'}
+    assert mock_get.call_count == 1
+
+
+def test_get_place_details_negative_caching():
+    with patch('utils.http_client.get', return_value=_details_response({'name': 'No Website'})) as mock_get, \
+            patch('utils.utils.Config.PLACE_DETAILS_NEGATIVE_CACHE_TTL', 60):
+        get_place_details('no_website_place')
+        result = get_place_details('no_website_place')
+
+    assert result == {'name': 'No Website'}
+    assert mock_get.call_count == 1
+
+
+def test_get_place_details_errors_not_cached():
+    with patch('utils.http_client.get', return_value=_details_response({'website': 'http://a.com'}, status_code=500)) as mock_get:
+        assert get_place_details('failing_place') == {}
+        assert get_place_details('failing_place') == {}
+
+    assert mock_get.call_count == 2
+
+
+def test_get_place_details_error_status_not_cached():
+    # Google reports quota and key problems with HTTP 200 and a status, not a result
+    over_limit = Mock(status_code=200)
+    over_limit.json.return_value = {'status': 'OVER_QUERY_LIMIT', 'error_message': 'You have exceeded your daily request quota'}
+    with patch('utils.http_client.get', side_effect=[over_limit, _details_response({'website': 'http://a.com'})]) as mock_get:
+        assert get_place_details('throttled_place') == {}
+        assert get_place_details('throttled_place') == {'website': 'http://a.com'}
+        assert get_place_details('throttled_place') == {'website': 'http://a.com'}
+
+    assert mock_get.call_count == 2
+
+
+def test_cache_hit_miss_counters():
+    cache = SqliteCache('test_entries')
+    cache.set('key', 'value', ttl=60)
+    cache.get('key')
+    cache.get('key')
+    cache.get('missing')
+
+    stats = cache.stats()
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 2 / 3
+    assert stats['entries'] == 1
+
+
+def _contact_response(status_code, emails=None):
+    response = Mock(status_code=status_code, headers={})
+    response.json.return_value = {'emails': emails or []}
+    return response
+
+
+def test_scrape_contact_info_cached_per_domain():
+    with patch('utils.http_client.get', return_value=_contact_response(200, ['info@shop.com'])) as mock_get:
+        first = scrape_contact_info('http://www.shop.com')
+        second = scrape_contact_info('https://shop.com/contact')
+
+    assert first == second == {'emails': ['info@shop.com']}
+    assert mock_get.call_count == 1
+
+
+def test_scrape_contact_info_caches_failures_with_negative_ttl():
+    with patch('utils.http_client.get', return_value=_contact_response(404)) as mock_get:
+        assert scrape_contact_info('http://gone.com') is None
+        assert scrape_contact_info('http://gone.com') is None
+
+    assert mock_get.call_count == 1
+
+
+def test_scrape_contact_info_empty_emails_use_negative_ttl():
+    with patch('utils.http_client.get', return_value=_contact_response(200)), \
+            patch('utils.utils.contact_info_cache.set') as mock_set:
+        scrape_contact_info('http://quiet.com')
+
+    assert mock_set.call_args.args[2] == Config.CONTACT_INFO_NEGATIVE_CACHE_TTL
+
+
+def test_scrape_contact_info_rate_limit_exhaustion_not_cached():
+    with patch('utils.http_client.get', return_value=_contact_response(429)) as mock_get, \
+            patch('utils.utils.Config.SCRAPER_MAX_RETRIES', 0):
+        scrape_contact_info('http://busy.com')
+        scrape_contact_info('http://busy.com')
+
+    assert mock_get.call_count == 2
+
+
+def test_parallel_scraping_uses_contact_cache():
+    with patch('utils.http_client.get', return_value=_contact_response(200, ['a@cached.com'])):
+        scrape_contact_info('http://cached.com')
+
+    with patch('utils.utils.scrape_contact_info') as mock_scrape:
+        results = scrape_contact_info_parallel(['http://www.cached.com'])
+
+    mock_scrape.assert_not_called()
+    assert results == {'http://www.cached.com': {'emails': ['a@cached.com']}}
+
+
+def test_tiered_cache_evicts_least_recently_used():
+    cache = TieredCache("tiered", max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["memory_hits"] == 3
+
+
+def test_tiered_cache_entry_expires():
+    cache = TieredCache("tiered", max_entries=10, ttl=0.05)
+    cache.set("a", 1)
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+
+def test_tiered_cache_persists_to_disk():
+    TieredCache("tiered", max_entries=10, ttl=60, persist=True).set("a", {"value": 1})
+    restarted = TieredCache("tiered", max_entries=10, ttl=60, persist=True)
+
+    assert restarted.get("a") == {"value": 1}
+    assert restarted.get("a") == {"value": 1}
+    stats = restarted.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["disk_entries"]) == (1, 1, 1)
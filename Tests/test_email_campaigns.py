@@ -0,0 +1,137 @@
+import smtplib
+import time
+from unittest.mock import MagicMock
+
+from flask import Flask
+
+from api_functions.api_functions import ApiFunctions
+from api_functions.job_tasks import email_campaign_task
+from utils.email_campaigns import CampaignSender, EmailCampaignStore, is_transient
+from utils.smtp_pool import SmtpConnectionPool
+
+
+class GreylistingHandler:
+    """Answers 451 to the first attempt for each greylisted@ recipient and 550 for rejected@ recipients."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.seen = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("rejected@"):
+            return "550 No such user"
+        if address.startswith("greylisted@") and address not in self.seen:
+            self.seen.add(address)
+            return "451 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        return await self.handler.handle_DATA(server, session, envelope)
+
+
+def make_campaign(store, recipients):
+    campaign_id = store.create("https://forms.google.com/x", "info@pro-val.net")
+    queued = store.add_recipients(campaign_id, recipients)
+    return campaign_id, queued
+
+
+def survey_message():
+    return ApiFunctions.build_survey_message("https://forms.google.com/x", "info@pro-val.net")
+
+
+def test_duplicate_recipients_are_suppressed():
+    store = EmailCampaignStore()
+    campaign_id, queued = make_campaign(store, ["a@x.com", " A@x.com", "b@x.com"])
+
+    assert queued == 2
+    assert store.add_recipients(campaign_id, ["B@X.com", "c@x.com"]) == 1
+    assert store.progress(campaign_id) == {"sent": 0, "failed": 0, "pending": 3, "total": 3}
+
+
+def test_is_transient():
+    assert is_transient(smtplib.SMTPRecipientsRefused({"a@x.com": (451, b"Try again")}))
+    assert not is_transient(smtplib.SMTPRecipientsRefused({"a@x.com": (550, b"No such user")}))
+    assert is_transient(smtplib.SMTPDataError(421, b"Busy"))
+    assert not is_transient(smtplib.SMTPDataError(554, b"Rejected"))
+    assert is_transient(smtplib.SMTPServerDisconnected())
+    assert is_transient(TimeoutError())
+
+
+def test_campaign_retries_transient_failures(smtp_server):
+    controller, handler = smtp_server
+    controller.handler = GreylistingHandler(handler)
+    pool = SmtpConnectionPool(controller.hostname, controller.port, use_tls=False)
+    store = EmailCampaignStore()
+    campaign_id, _ = make_campaign(store, ["a@example.com", "greylisted@example.com", "rejected@example.com"])
+    sender = CampaignSender(store, pool, rate_limit=1000, max_attempts=3, retry_backoff=0.01)
+    job = MagicMock()
+
+    counts = sender.run(campaign_id, survey_message(), job=job)
+
+    assert counts == {"sent": 2, "failed": 1, "pending": 0, "total": 3}
+    assert sorted(rcpt for _, rcpts, _ in handler.messages for rcpt in rcpts) == [
+        "a@example.com", "greylisted@example.com"
+    ]
+    assert store.failures(campaign_id)[0]["recipient"] == "rejected@example.com"
+    job.update.assert_called_with(sent=2, failed=1, pending=0, total=3)
+    pool.close_all()
+
+
+def test_campaign_fails_crafted_recipients_without_sending():
+    pool = MagicMock()
+    store = EmailCampaignStore()
+    campaign_id, _ = make_campaign(store, ["a@x.com\r\nBcc: victim@y.com", "b@x.com"])
+
+    counts = CampaignSender(store, pool, rate_limit=1000, max_attempts=3, retry_backoff=0.01).run(
+        campaign_id, survey_message())
+
+    assert counts == {"sent": 1, "failed": 1, "pending": 0, "total": 2}
+    server = pool.connection.return_value.__enter__.return_value
+    server.sendmail.assert_called_once()
+    assert server.sendmail.call_args[0][1] == "b@x.com"
+
+
+def test_campaign_gives_up_after_max_attempts():
+    server = MagicMock()
+    server.sendmail.side_effect = smtplib.SMTPRecipientsRefused({"a@x.com": (451, b"Try again")})
+    pool = MagicMock()
+    pool.connection.return_value.__enter__.return_value = server
+    store = EmailCampaignStore()
+    campaign_id, _ = make_campaign(store, ["a@x.com"])
+
+    counts = CampaignSender(store, pool, rate_limit=1000, max_attempts=3, retry_backoff=0.001).run(
+        campaign_id, survey_message())
+
+    assert counts["failed"] == 1
+    assert server.sendmail.call_count == 3
+
+
+def test_campaign_respects_rate_limit():
+    pool = MagicMock()
+    store = EmailCampaignStore()
+    campaign_id, _ = make_campaign(store, [f"user{i}@x.com" for i in range(6)])
+
+    start = time.monotonic()
+    CampaignSender(store, pool, rate_limit=20, max_attempts=3, retry_backoff=0.01).run(campaign_id, survey_message())
+
+    # Burst of one, then 20 per second: five gaps of 50ms
+    assert time.monotonic() - start >= 0.24
+    assert pool.connection.return_value.__enter__.return_value.sendmail.call_count == 6
+
+
+def test_start_email_campaign_rejects_non_string_recipients():
+    app = Flask(__name__)
+    with app.test_request_context(json={"recipients": [{"email": "a@example.com"}], "formUrl": "https://f"}):
+        _, status_code = ApiFunctions.start_email_campaign()
+
+    assert status_code == 400
+
+
+def test_email_campaign_task_rejects_unknown_campaign():
+    try:
+        email_campaign_task(MagicMock(), {"campaignId": "missing"})
+    except ValueError as e:
+        assert "missing" in str(e)
+    else:
+        raise AssertionError("Expected ValueError")
@@ -0,0 +1,75 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from utils.http_client import PooledHttpClient
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused(local_server):
+    client = PooledHttpClient(pool_connections=2, pool_maxsize=4, timeout=(1, 1))
+    for _ in range(5):
+        assert client.request('GET', f"{local_server}/ping").json() == {"ok": True}
+
+    stats = next(iter(client.pool_stats().values()))
+    assert stats["connections_opened"] == 1
+    assert stats["requests"] == 5
+    assert stats["idle_connections"] == 1
+    assert stats["max_size"] == 4
+
+
+def test_threads_share_the_pool_but_not_the_session(local_server):
+    client = PooledHttpClient(pool_connections=2, pool_maxsize=4, timeout=(1, 1))
+    sessions = []
+
+    def worker():
+        sessions.append(client.session)
+        for _ in range(3):
+            client.request('GET', f"{local_server}/ping")
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(session) for session in sessions}) == 4
+    stats = next(iter(client.pool_stats().values()))
+    assert stats["requests"] == 12
+    assert stats["connections_opened"] <= 4
+
+
+def test_default_timeout_applied():
+    client = PooledHttpClient(pool_connections=1, pool_maxsize=1, timeout=(2, 7))
+    with patch.object(client.session, 'request') as mock_request:
+        client.request('GET', 'http://example.com')
+        client.request('GET', 'http://example.com', timeout=60)
+
+    assert mock_request.call_args_list[0].kwargs['timeout'] == (2, 7)
+    assert mock_request.call_args_list[1].kwargs['timeout'] == 60
@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+
+from Config.config import Config
+from utils.job_queue import SqliteJobQueue, run_job, run_worker, start_worker_pool
+
+
+def make_queue(tmp_path, **kwargs):
+    kwargs.setdefault("visibility_timeout", 60)
+    kwargs.setdefault("max_attempts", 3)
+    kwargs.setdefault("retry_backoff", 0)
+    return SqliteJobQueue(path=str(tmp_path / "queue.sqlite3"), **kwargs)
+
+
+def test_enqueue_claim_complete(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.enqueue("business_emails", {"googlePlacesQuery": "cafes"})
+
+    job = queue.claim()
+    assert job["jobId"] == job_id
+    assert job["status"] == "running"
+    assert job["attempts"] == 1
+    assert job["payload"] == {"googlePlacesQuery": "cafes"}
+
+    assert queue.complete(job_id, 1, ["info@cafe.com"])
+    assert queue.get(job_id)["status"] == "done"
+    assert queue.get(job_id)["result"] == ["info@cafe.com"]
+
+
+def test_claimed_job_is_invisible_to_other_workers(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.enqueue("task", {})
+    assert queue.claim() is not None
+    assert SqliteJobQueue(path=queue.path).claim() is None
+
+
+def test_expired_visibility_makes_job_claimable_again(tmp_path):
+    queue = make_queue(tmp_path, visibility_timeout=0.05)
+    job_id = queue.enqueue("task", {})
+    queue.claim()
+    time.sleep(0.1)
+
+    job = queue.claim()
+    assert job["jobId"] == job_id
+    assert job["attempts"] == 2
+
+
+def test_expired_job_out_of_attempts_fails(tmp_path):
+    queue = make_queue(tmp_path, visibility_timeout=0.05, max_attempts=1)
+    job_id = queue.enqueue("task", {})
+    queue.claim()
+    time.sleep(0.1)
+
+    assert queue.claim() is None
+    assert queue.get(job_id)["status"] == "failed"
+
+
+def test_failed_job_is_retried_until_max_attempts(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    job_id = queue.enqueue("task", {})
+
+    queue.claim()
+    queue.fail(job_id, 1, "first error")
+    assert queue.get(job_id)["status"] == "queued"
+
+    queue.claim()
+    queue.fail(job_id, 2, "second error")
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "second error"
+
+
+def test_retry_waits_for_backoff(tmp_path):
+    queue = make_queue(tmp_path, retry_backoff=60)
+    job_id = queue.enqueue("task", {})
+    queue.claim()
+    queue.fail(job_id, 1, "error")
+    assert queue.claim() is None
+
+
+def test_heartbeat_stores_progress_and_partial_result(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.enqueue("task", {})
+    queue.claim()
+    assert queue.heartbeat(job_id, 1, progress={"sitesScraped": 4}, result=["a@b.com"])
+
+    job = queue.get(job_id)
+    assert job["progress"] == {"sitesScraped": 4}
+    assert job["result"] == ["a@b.com"]
+
+
+def test_superseded_claim_cannot_record_an_outcome(tmp_path):
+    queue = make_queue(tmp_path, visibility_timeout=0.05)
+    job_id = queue.enqueue("task", {})
+    queue.claim()
+    time.sleep(0.1)
+    queue.claim()  # The first worker looked dead, so a second one took over
+
+    assert not queue.heartbeat(job_id, 1)
+    assert not queue.complete(job_id, 1, "stale")
+    assert not queue.fail(job_id, 1, "stale")
+    assert queue.get(job_id)["status"] == "running"
+    assert queue.complete(job_id, 2, "fresh")
+    assert queue.get(job_id)["result"] == "fresh"
+
+
+def test_run_job_heartbeats_long_tasks(tmp_path):
+    queue = make_queue(tmp_path, visibility_timeout=0.1)
+    job_id = queue.enqueue("slow", {})
+
+    def slow_task(job, payload):
+        time.sleep(0.35)  # Several visibility timeouts without reporting progress
+        return "done"
+
+    claimed = queue.claim()
+    runner = threading.Thread(target=run_job, args=(queue, {"slow": slow_task}, claimed))
+    runner.start()
+    time.sleep(0.2)
+    assert queue.claim() is None  # Still owned by the running attempt
+    runner.join()
+
+    job = queue.get(job_id)
+    assert (job["status"], job["attempts"], job["result"]) == ("done", 1, "done")
+
+
+def test_non_retryable_task_fails_after_one_attempt(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.enqueue("send", {})
+    calls = []
+
+    def send_task(job, payload):
+        calls.append(1)
+        raise RuntimeError("550 No such user")
+    send_task.retryable = False
+
+    run_job(queue, {"send": send_task}, queue.claim())
+
+    assert queue.get(job_id)["status"] == "failed"
+    assert queue.claim() is None
+    assert len(calls) == 1
+
+
+def test_run_job_unknown_task_is_not_retried(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.enqueue("missing", {})
+    run_job(queue, {}, queue.claim())
+    assert queue.get(job_id)["status"] == "failed"
+
+
+def test_run_worker_processes_jobs(tmp_path):
+    queue = make_queue(tmp_path)
+    tasks = {"add": lambda job, payload: payload["a"] + payload["b"]}
+    job_id = queue.enqueue("add", {"a": 2, "b": 3})
+    stop_event = threading.Event()
+
+    worker = threading.Thread(target=run_worker, args=(tasks,),
+                              kwargs={"queue": queue, "poll_interval": 0.01, "stop_event": stop_event})
+    worker.start()
+    deadline = time.time() + 5
+    while queue.get(job_id)["status"] != "done" and time.time() < deadline:
+        time.sleep(0.01)
+    stop_event.set()
+    worker.join()
+
+    assert queue.get(job_id)["result"] == 5
+
+
+def test_worker_pool_runs_jobs_in_separate_processes(tmp_path):
+    queue = make_queue(tmp_path)
+    job_ids = [queue.enqueue("square", {"value": value}) for value in range(4)]
+
+    # More processes than JOB_QUEUE_WORKER_PROCESSES configures, as worker.py --processes allows
+    workers, stop_event = start_worker_pool("job_queue_tasks", Config.JOB_QUEUE_WORKER_PROCESSES + 1, path=queue.path)
+    try:
+        deadline = time.time() + 30
+        while any(queue.get(job_id)["status"] != "done" for job_id in job_ids) and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop_event.set()
+        for worker in workers:
+            worker.join(10)
+
+    assert [queue.get(job_id)["result"] for job_id in job_ids] == [0, 1, 4, 9]
+    assert all(queue.get(job_id)["progress"]["pid"] != os.getpid() for job_id in job_ids)
+    assert all(queue.get(job_id)["progress"]["processes"] == Config.JOB_QUEUE_WORKER_PROCESSES + 1 for job_id in job_ids)
@@ -0,0 +1,72 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+from flask import Flask
+from openai import OpenAI
+
+from api_functions.api_functions import ApiFunctions
+from utils.llm_backend import DEFAULT_FORM, FakeLlmClient, create_llm_client
+
+
+@pytest.fixture
+def test_app():
+    app = Flask(__name__)
+    app.testing = True
+    return app
+
+
+def test_create_llm_client_selects_backend(monkeypatch):
+    from Config.config import Config
+    monkeypatch.setattr(Config, "OPENAI_API_KEY", "test-key")
+
+    assert isinstance(create_llm_client("openai"), OpenAI)
+    monkeypatch.setattr(Config, "LLM_BACKEND", "fake")
+    assert isinstance(create_llm_client(), FakeLlmClient)
+    with pytest.raises(ValueError):
+        create_llm_client("unknown")
+
+
+def test_fake_backend_serves_canned_form_through_call_agent(test_app):
+    with test_app.test_request_context(json={"business_description": "We sell eco-friendly products."}):
+        reply = ApiFunctions.call_openai_agent(FakeLlmClient())
+
+    form = json.loads(reply)
+    assert form == DEFAULT_FORM
+    assert set(form) == {"formTitle", "questions", "googlePlacesQuery"}
+
+
+def test_fake_backend_reports_usage_and_streams(test_app):
+    client = FakeLlmClient()
+    response = client.chat.completions.create(
+        model="gpt-4", messages=[{"role": "system", "content": "Analyze"}, {"role": "user", "content": "data"}]
+    )
+    chunks = list(client.chat.completions.create(
+        model="gpt-4", messages=[{"role": "user", "content": "data"}], stream=True,
+        stream_options={"include_usage": True}
+    ))
+
+    assert response.usage.completion_tokens > 0
+    assert "".join(chunk.choices[0].delta.content for chunk in chunks[:-1]) == response.choices[0].message.content
+    assert chunks[-1].choices == [] and chunks[-1].usage.total_tokens > 0
+
+
+def test_fake_backend_latency_and_token_rate():
+    client = FakeLlmClient(latency=0.05, tokens_per_second=200)
+    messages = [{"role": "user", "content": "data"}]
+
+    start = time.monotonic()
+    stream = iter(client.chat.completions.create(model="gpt-4", messages=messages, stream=True, max_tokens=20))
+    next(stream)
+    first_token = time.monotonic() - start
+    list(stream)
+    total = time.monotonic() - start
+
+    assert 0.05 <= first_token < 0.2
+    assert total >= 0.05 + 20 / 200
+
+
+def test_fake_backend_runs_feedback_analysis(test_app):
+    df = pd.DataFrame({"Comments": ["Great", "Too pricey"]})
+    assert "Overall Sentiment" in ApiFunctions.analyze_survey_data(FakeLlmClient(), df)
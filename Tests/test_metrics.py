@@ -0,0 +1,83 @@
+import pytest
+import requests
+from unittest.mock import MagicMock, patch
+
+from api_functions.api_functions import ApiFunctions
+from utils.metrics import CallMetrics, call_metrics, endpoint_scope
+from utils.utils import fetch_sheet_data
+
+
+def test_summary_reports_percentiles_tokens_and_cost():
+    metrics = CallMetrics(window=100)
+    for ms in range(1, 101):
+        metrics.record("openai", ms / 1000, endpoint="api.call_agent", model="gpt-4",
+                       prompt_tokens=1000, completion_tokens=500)
+
+    stats = metrics.summary()["api.call_agent"]["openai"]
+
+    assert stats["calls"] == 100
+    assert stats["latency_ms"]["p50"] == pytest.approx(50.5)
+    assert stats["latency_ms"]["p99"] == pytest.approx(99.0, abs=0.1)
+    assert stats["totals"]["prompt_tokens"] == 100000
+    assert stats["per_call"]["cost_usd"] == pytest.approx(0.06)
+    assert stats["models"] == {"gpt-4": 100}
+
+
+def test_window_bounds_latency_samples():
+    metrics = CallMetrics(window=2)
+    for seconds in (10, 0.001, 0.001):
+        metrics.record("openai", seconds, endpoint="e")
+
+    stats = metrics.summary()["e"]["openai"]
+    assert stats["calls"] == 3
+    assert stats["latency_ms"]["max"] == 1.0
+
+
+def test_timed_records_errors_and_cancellations():
+    metrics = CallMetrics(window=10)
+
+    with pytest.raises(RuntimeError):
+        with endpoint_scope("api.analyze_feedback"), metrics.timed("openai"):
+            raise RuntimeError("rate limited")
+
+    def stream():
+        with metrics.timed("openai_stream"):
+            yield "token"
+            yield "token"
+
+    with endpoint_scope("api.analyze_feedback"):
+        tokens = stream()
+        next(tokens)
+        tokens.close()
+
+    report = metrics.summary()["api.analyze_feedback"]
+    assert report["openai"]["errors"] == 1
+    assert report["openai"]["last_error"] == "rate limited"
+    assert report["openai_stream"]["cancelled"] == 1
+
+
+def test_complete_chat_records_usage_under_endpoint():
+    client = MagicMock()
+    response = client.chat.completions.create.return_value
+    response.choices[0].message.content = "Reply"
+    response.usage = MagicMock(prompt_tokens=120, completion_tokens=30, total_tokens=150)
+
+    with endpoint_scope("api.call_agent"):
+        ApiFunctions.complete_chat(client, "Instructions", "Content")
+
+    stats = call_metrics.summary()["api.call_agent"]["openai"]
+    assert stats["totals"]["total_tokens"] == 150
+    assert stats["totals"]["prompt_chars"] == len("Instructions") + len("Content")
+
+
+def test_sheet_fetch_is_timed_separately():
+    with patch('utils.http_client.post') as mock_post:
+        mock_post.return_value.json.return_value = [{"column1": "a"}, {"column1": "b"}]
+        fetch_sheet_data("sheet")
+        mock_post.side_effect = requests.exceptions.ConnectionError("Network error")
+        fetch_sheet_data("sheet")
+
+    stats = call_metrics.summary()["background"]["sheet_fetch"]
+    assert stats["calls"] == 2
+    assert stats["errors"] == 1
+    assert stats["totals"]["rows"] == 2
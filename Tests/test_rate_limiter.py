@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque
+from unittest.mock import patch, Mock
+
+from utils.rate_limiter import AdaptiveRateLimiter, parse_retry_after, rapidapi_limiter
+from utils.utils import scrape_contact_info, scrape_contact_info_parallel
+
+
+def make_limiter(rate=10.0, burst=1, min_rate=1.0, max_rate=100.0):
+    return AdaptiveRateLimiter(rate=rate, burst=burst, min_rate=min_rate, max_rate=max_rate)
+
+
+def test_limiter_spaces_out_requests():
+    limiter = make_limiter(rate=20.0, burst=1)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        limiter.acquire()
+    elapsed = time.perf_counter() - start
+
+    # The first token is in the bucket, the remaining four arrive every 50ms
+    assert elapsed >= 0.19
+
+
+def test_limiter_halves_rate_once_per_cooldown():
+    limiter = make_limiter(rate=10.0)
+    limiter.on_rate_limited()
+    limiter.on_rate_limited()
+    assert limiter.rate == 5.0
+    assert limiter.stats()['rate_limited_count'] == 2
+
+
+def test_limiter_respects_min_and_max_rate():
+    limiter = make_limiter(rate=1.5, min_rate=1.0, max_rate=1.6)
+    limiter.on_rate_limited()
+    assert limiter.rate == 1.0
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.rate == 1.6
+
+
+def test_limiter_retry_after_pauses_all_callers():
+    limiter = make_limiter(rate=100.0, burst=100)
+    limiter.on_rate_limited(retry_after=2)
+    assert limiter.reserve() > 1.9
+
+
+def test_backoff_grows_with_jitter():
+    for attempt in range(4):
+        delay = AdaptiveRateLimiter.backoff(attempt, base=0.5, cap=2)
+        expected = min(2, 0.5 * 2 ** attempt)
+        assert expected / 2 <= delay <= expected
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
+
+
+def test_scrape_contact_info_honours_retry_after():
+    response_429 = Mock(status_code=429, headers={'Retry-After': '5'})
+    response_200 = Mock(status_code=200, headers={})
+    response_200.json.return_value = {'emails': ['a@example.com']}
+
+    with patch('utils.http_client.get', side_effect=[response_429, response_200]), \
+            patch('utils.utils.rapidapi_limiter.acquire'):
+        result = scrape_contact_info('http://example.com')
+
+    assert result == {'emails': ['a@example.com']}
+    assert rapidapi_limiter.stats()['paused_for'] > 4
+
+
+def test_scrape_contact_info_gives_up_after_max_retries():
+    with patch('utils.http_client.get', return_value=Mock(status_code=429, headers={})) as mock_get, \
+            patch('utils.utils.Config.SCRAPER_MAX_RETRIES', 3):
+        assert scrape_contact_info('http://example.com') is None
+
+    assert mock_get.call_count == 4
+
+
+def test_parallel_scraping_settles_under_provider_limit():
+    """Many workers sharing the limiter should adapt to a provider that allows 40 requests/s"""
+    provider_limit = 40
+    sent_at = deque()
+    lock = threading.Lock()
+
+    def provider(*args, **kwargs):
+        with lock:
+            now = time.monotonic()
+            while sent_at and now - sent_at[0] > 1:
+                sent_at.popleft()
+            if len(sent_at) >= provider_limit:
+                return Mock(status_code=429, headers={})
+            sent_at.append(now)
+        response = Mock(status_code=200, headers={})
+        response.json.return_value = {'emails': []}
+        return response
+
+    rapidapi_limiter.reset(rate=200, burst=5, min_rate=5, max_rate=200)
+    websites = [f'site{i}.com' for i in range(80)]
+    with patch('utils.http_client.get', side_effect=provider), \
+            patch('utils.utils.Config.SCRAPER_BACKOFF_BASE', 0.2):
+        results = scrape_contact_info_parallel(websites)
+
+    assert all(result is not None for result in results.values())
+    assert rapidapi_limiter.rate < 200
@@ -0,0 +1,97 @@
+import socket
+import threading
+from unittest.mock import patch
+
+from flask import Flask
+
+from api_functions.api_functions import ApiFunctions
+from utils.smtp_pool import SmtpConnectionPool
+
+
+def make_pool(controller, **kwargs):
+    return SmtpConnectionPool(controller.hostname, controller.port, use_tls=False, **kwargs)
+
+
+def test_pool_reuses_connection(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller)
+
+    for i in range(5):
+        pool.sendmail("info@pro-val.net", f"user{i}@example.com", "Subject: hi\r\n\r\nhello")
+
+    assert len(handler.messages) == 5
+    assert pool.stats()["opened"] == 1
+    assert pool.stats()["reused"] == 4
+    pool.close_all()
+
+
+def test_pool_is_bounded(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller, max_size=2)
+    in_use = []
+    peak = []
+    lock = threading.Lock()
+
+    def send(i):
+        with pool.connection() as server:
+            with lock:
+                in_use.append(i)
+                peak.append(len(in_use))
+            server.sendmail("info@pro-val.net", f"user{i}@example.com", "Subject: hi\r\n\r\nhello")
+            with lock:
+                in_use.remove(i)
+
+    threads = [threading.Thread(target=send, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(handler.messages) == 8
+    assert max(peak) <= 2
+    assert pool.stats()["opened"] <= 2
+    pool.close_all()
+
+
+def test_pool_replaces_dead_connection(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller, health_check_after=0)
+    pool.sendmail("info@pro-val.net", "a@example.com", "Subject: hi\r\n\r\nhello")
+
+    # Kill the idle connection behind the pool's back
+    pool._idle[0][0].sock.shutdown(socket.SHUT_RDWR)
+
+    pool.sendmail("info@pro-val.net", "b@example.com", "Subject: hi\r\n\r\nhello")
+    assert len(handler.messages) == 2
+    assert pool.stats()["opened"] == 2
+    assert pool.stats()["discarded"] == 1
+    pool.close_all()
+
+
+def test_sendmail_reconnects_when_connection_drops_mid_send(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller, health_check_after=60)
+    pool.sendmail("info@pro-val.net", "a@example.com", "Subject: hi\r\n\r\nhello")
+    pool._idle[0][0].sock.shutdown(socket.SHUT_RDWR)
+
+    pool.sendmail("info@pro-val.net", "b@example.com", "Subject: hi\r\n\r\nhello")
+    assert [rcpts for _, rcpts, _ in handler.messages] == [["a@example.com"], ["b@example.com"]]
+    assert pool.stats()["opened"] == 2
+    pool.close_all()
+
+
+def test_send_survey_emails_and_feedback_share_the_pool(smtp_server):
+    controller, handler = smtp_server
+    pool = make_pool(controller)
+    app = Flask(__name__)
+
+    with patch("api_functions.api_functions.smtp_pool", pool):
+        result = ApiFunctions.send_survey_emails(["a@example.com", "b@example.com"], "https://forms.google.com/x")
+        with app.test_request_context(json={"name": "Ivan", "message": "Great product"}):
+            response, status_code = ApiFunctions.feedback()
+
+    assert result == {"status": "Email sent successfully", "success_count": 2}
+    assert status_code == 200
+    assert [rcpts for _, rcpts, _ in handler.messages] == [["a@example.com"], ["b@example.com"], ["info@pro-val.net"]]
+    assert pool.stats()["opened"] == 1
+    pool.close_all()
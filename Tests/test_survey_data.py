@@ -0,0 +1,125 @@
+import pandas as pd
+
+from utils.survey_data import (
+    classify_answers, estimate_tokens, is_nps_question, summarize_survey, survey_prompt,
+    text_chunks
+)
+
+
+def sample_sheet(rows=60):
+    """Responses shaped like a Google Forms export of the questionnaires call_openai_agent designs."""
+    choices = ["Quality", "Price", "Brand Reputation", "Sustainability"]
+    return pd.DataFrame({
+        "Timestamp": [f"2024-05-{i % 28 + 1:02d} 10:{i % 60:02d}:00" for i in range(rows)],
+        "What is the name of your business?": [f"Business {i}" for i in range(rows)],
+        "Which of the following features do you consider most important? (Select one)":
+            [choices[i % 4] for i in range(rows)],
+        "Which features would you like to see in future products? (Select all that apply)":
+            ["Eco-Friendly Materials, Fast Delivery" if i % 2 else "Custom Designs" for i in range(rows)],
+        "On a scale of 1 to 10, how likely are you to recommend our product to a friend?":
+            [i % 10 + 1 for i in range(rows)],
+        "Please describe your experience with similar products.":
+            [f"Used supplier {i} for {i % 7 + 1} years, delivery was slow." if i % 3 else "" for i in range(rows)],
+    })
+
+
+def test_summarize_survey_drops_duplicate_columns_and_truncates():
+    df = pd.DataFrame([["Yes", "Yes", "x" * 50], ["No", "No", "short"]], columns=["Agree?", "Agree?", "Why?"])
+
+    summary = summarize_survey(df, max_answer_chars=10)
+
+    assert [question["question"] for question in summary["questions"]] == ["Agree?", "Why?"]
+    assert summary["text"]["Q2"].tolist() == ["xxxxxxxxxx…", "short"]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Hello world") == 2
+    assert estimate_tokens("a" + " " * 40 + "b") > estimate_tokens("a b")
+
+
+def test_classify_answers():
+    assert classify_answers(pd.Series(["9", "10", "3", ""])) == "scale"
+    assert classify_answers(pd.Series(["12.5", "100"])) == "numeric"
+    assert classify_answers(pd.Series(["2024-05-01 10:00:00", "2024-05-02 11:30:00"])) == "timestamp"
+    assert classify_answers(pd.Series(["Email", "SMS", "Email", "Email"])) == "choice"
+    assert classify_answers(pd.Series(["Fast Delivery, Custom Designs", "Fast Delivery", "Custom Designs",
+                                       "Fast Delivery, Custom Designs"])) == "checkbox"
+    assert classify_answers(pd.Series(["Great service", "Too expensive for us"])) == "text"
+    assert classify_answers(pd.Series(["", ""])) == "empty"
+
+
+def test_summarize_survey_computes_exact_statistics():
+    df = pd.DataFrame({
+        "How likely are you to recommend us?": [10, 9, 8, 7, 6, 0],
+        "Preferred channel": ["Email", "SMS", "Email", "Email", "Email", "SMS"],
+        "Features wanted": ["A, B", "B", "A", "A, B", "B", "A, B"],
+        "Comments": ["Love it", "Too pricey", "", "Needs an API", "Slow support", "No"],
+    })
+
+    summary = summarize_survey(df)
+    questions = {question["question"]: question for question in summary["questions"]}
+
+    assert summary["responses"] == 6
+    scale = questions["How likely are you to recommend us?"]
+    assert scale["type"] == "scale"
+    assert scale["mean"] == 6.67
+    assert scale["nps"] == 0.0
+    assert questions["Preferred channel"]["distribution"] == {"Email": 4, "SMS": 2}
+    assert questions["Features wanted"]["distribution"] == {"B": 5, "A": 4}
+    assert questions["Comments"]["type"] == "text"
+    assert list(summary["text"].columns) == ["Q4"]
+    assert len(summary["text"]) == 5
+
+
+def test_summarize_survey_no_nps_for_other_scales():
+    df = pd.DataFrame({
+        "How satisfied are you with delivery? (1-7)": [7, 7, 6, 7, 6, 5],
+        "How likely are you to recommend us? (1-5)": [5, 4, 5, 5, 3, 4],
+    })
+
+    summary = summarize_survey(df)
+
+    assert [question["type"] for question in summary["questions"]] == ["scale", "scale"]
+    assert all("nps" not in question for question in summary["questions"])
+    assert "NPS" not in survey_prompt(df)
+
+
+def test_summarize_survey_nps_for_low_recommend_answers():
+    df = pd.DataFrame({"On a scale of 0 to 10, how likely are you to recommend us?": [5, 3, 0, 4, 5, 2]})
+
+    question = summarize_survey(df)["questions"][0]
+
+    assert question["nps"] == -100.0
+
+
+def test_is_nps_question():
+    assert is_nps_question("How likely are you to recommend our product to a friend?")
+    assert is_nps_question("On a scale of 1 to 10, how likely are you to recommend us?")
+    assert is_nps_question("Would you recommend us (0-10)?")
+    assert not is_nps_question("How would you rate our service from 1 to 7?")
+    assert not is_nps_question("How likely are you to recommend us, 1-5?")
+
+
+def test_survey_prompt_sends_summaries_and_free_text_only():
+    df = sample_sheet()
+    prompt = survey_prompt(df)
+
+    assert "Q3 (choice, 60 answers): Quality: 15 (25%); Price: 15 (25%)" in prompt
+    assert "Q5 (scale, 60 answers): mean 5.5, median 5.5, NPS -40 |" in prompt
+    assert "Free-text answers (CSV):\nQ2,Q6\n" in prompt
+    # Against df.to_string() with main.py's unlimited display options, which the prompt used to be
+    with pd.option_context("display.width", None, "display.max_rows", None, "display.max_columns", None):
+        padded = df.to_string()
+    assert estimate_tokens(prompt) < estimate_tokens(padded) * 0.6
+
+
+def test_text_chunks_keep_rows_whole_and_repeat_header():
+    text = pd.DataFrame({"Q2": [f"Answer number {i} about delivery times" for i in range(30)]})
+
+    chunks = text_chunks(text, max_tokens=40)
+
+    assert len(chunks) > 1
+    assert all(chunk.startswith("Q2\n") for chunk in chunks)
+    assert all(estimate_tokens(chunk) <= 40 for chunk in chunks)
+    assert [row for chunk in chunks for row in chunk.split("\n")[1:]] == list(text["Q2"])
@@ -0,0 +1,141 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+
+from api_functions.api_functions import ApiFunctions
+from utils import translation
+from utils.cache import TieredCache
+from utils.translation import get_translate_client, translate_texts, translation_chunks, translation_key, translation_memory
+
+
+@pytest.fixture
+def test_app():
+    app = Flask(__name__)
+    app.testing = True
+    return app
+
+
+@pytest.fixture
+def translate_client(monkeypatch):
+    """Stand-in shared client that tags each text with its target language."""
+    client = MagicMock()
+    client.translate.side_effect = lambda values, target_language, source_language: [
+        {"translatedText": f"[{target_language}] {value}", "input": value} for value in values
+    ]
+    monkeypatch.setattr(translation, "_client", client)
+    return client
+
+
+def test_translation_chunks_respect_text_and_character_limits():
+    assert translation_chunks(["a", "b", "c", "d", "e"], max_texts=2, max_chars=100) == [["a", "b"], ["c", "d"], ["e"]]
+    assert translation_chunks(["aaa", "bbb", "c", "dddddd"], max_texts=10, max_chars=5) == [["aaa"], ["bbb", "c"], ["dddddd"]]
+    assert translation_chunks([], max_texts=2, max_chars=5) == []
+
+
+def test_client_is_created_once_per_process(monkeypatch):
+    created = []
+    monkeypatch.setattr(translation, "_client", None)
+    monkeypatch.setattr(translation.translate, "Client", lambda **kwargs: created.append(kwargs) or object())
+
+    threads = [threading.Thread(target=get_translate_client) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert get_translate_client() is get_translate_client()
+
+
+def test_translate_texts_keeps_order_across_chunks(translate_client, monkeypatch):
+    monkeypatch.setattr(translation.Config, "TRANSLATE_BATCH_MAX_TEXTS", 2)
+    texts = [f"text {i}" for i in range(5)]
+
+    assert translate_texts(texts, "en", "bg") == [f"[bg] text {i}" for i in range(5)]
+    assert translate_client.translate.call_count == 3
+
+
+def test_translate_batch_endpoint(test_app, translate_client):
+    with test_app.test_request_context(json={"texts": ["Здравей", "Благодаря"], "direction": "to_en"}):
+        response, status = ApiFunctions.translate_batch()
+
+    assert status == 200
+    assert response.get_json() == {"translations": ["[en] Здравей", "[en] Благодаря"]}
+    translate_client.translate.assert_called_once_with(["Здравей", "Благодаря"], target_language="en",
+                                                       source_language="bg")
+
+
+@pytest.mark.parametrize("body", [
+    {"texts": ["Hello"], "direction": "to_de"},
+    {"texts": "Hello", "direction": "to_bg"},
+    {"texts": ["Hello", 3], "direction": "to_bg"},
+])
+def test_translate_batch_rejects_bad_input(test_app, translate_client, body):
+    with test_app.test_request_context(json=body):
+        _, status = ApiFunctions.translate_batch()
+
+    assert status == 400
+    translate_client.translate.assert_not_called()
+
+
+def test_translate_batch_reports_upstream_failure(test_app, translate_client):
+    translate_client.translate.side_effect = RuntimeError("quota exceeded")
+
+    with test_app.test_request_context(json={"texts": ["Hello"], "direction": "to_bg"}):
+        response, status = ApiFunctions.translate_batch()
+
+    assert status == 500
+    assert response.get_json() == {"error": "Failed to translate texts"}
+
+
+def test_translation_memory_answers_repeats_without_upstream_call(translate_client):
+    before = translation_memory.stats()
+    assert translate_texts(["Quality", "Price"], "en", "bg") == ["[bg] Quality", "[bg] Price"]
+    assert translate_texts(["  Price ", "Quality", "Fast delivery"], "en", "bg") == [
+        "[bg] Price", "[bg] Quality", "[bg] Fast delivery"
+    ]
+
+    assert translate_client.translate.call_count == 2
+    translate_client.translate.assert_called_with(["Fast delivery"], target_language="bg", source_language="en")
+    after = translation_memory.stats()
+    assert after["memory_hits"] - before["memory_hits"] == 2
+    assert after["misses"] - before["misses"] == 3
+
+
+def test_translation_memory_keys_include_the_language_pair(translate_client):
+    translate_texts(["Brand"], "en", "bg")
+    translate_texts(["Brand"], "bg", "en")
+
+    assert translate_client.translate.call_count == 2
+
+
+def test_duplicates_in_a_batch_go_upstream_once(translate_client):
+    assert translate_texts(["Yes", "No", "Yes"], "en", "bg") == ["[bg] Yes", "[bg] No", "[bg] Yes"]
+    translate_client.translate.assert_called_once_with(["Yes", "No"], target_language="bg", source_language="en")
+
+
+def test_translation_memory_is_shared_through_the_persistent_tier(translate_client):
+    translate_texts(["Sustainability"], "en", "bg")
+    # Another worker starts with an empty memory tier but the same SQLite file
+    other_worker = TieredCache("translation_memory", max_entries=10, ttl=60, persist=True)
+
+    assert other_worker.get(translation_key("en", "bg", "Sustainability")) == "[bg] Sustainability"
+    assert other_worker.stats()["disk_hits"] == 1
+
+
+def test_translate_endpoint_reports_hit_rate_in_cache_stats(test_app, translate_client, monkeypatch):
+    monkeypatch.setattr(translation_memory, "memory_hits", 0)
+    monkeypatch.setattr(translation_memory, "disk_hits", 0)
+    monkeypatch.setattr(translation_memory, "misses", 0)
+    for _ in range(4):
+        with test_app.test_request_context(json={"text": "Thank you!"}):
+            assert ApiFunctions.translate_to_bulgarian("Thank you!") == "[bg] Thank you!"
+
+    with test_app.app_context():
+        response, status = ApiFunctions.cache_stats()
+    stats = response.get_json()["translations"]
+
+    assert translate_client.translate.call_count == 1
+    assert stats["hit_rate"] == 0.75
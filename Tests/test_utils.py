@@ -2,16 +2,18 @@ import pytest
 import requests
 from unittest.mock import patch, MagicMock, call
 import pandas as pd
-from utils.utils import fetch_sheet_data, scrape_contact_info, get_businesses, get_place_details, scrape_contact_info_parallel
+from utils.utils import fetch_sheet_data, scrape_contact_info, get_businesses, get_place_details, scrape_contact_info_parallel, get_place_websites, normalize_query, business_query_cache, iter_businesses, iter_contact_info
 import requests
 from unittest.mock import patch, Mock
 from concurrent.futures import Future
 import time
+from Config.config import Config
+
 
 def test_fetch_sheet_data_success():
     mock_data = [{"column1": "value1", "column2": "value2"}]
     expected_df = pd.DataFrame(mock_data)
-    with patch('requests.post') as mock_post:
+    with patch('utils.http_client.post') as mock_post:
         mock_response = MagicMock()
         mock_response.json.return_value = mock_data
         mock_response.raise_for_status = MagicMock()
@@ -20,7 +22,7 @@ def test_fetch_sheet_data_success():
         pd.testing.assert_frame_equal(result_df, expected_df)
 
 def test_fetch_sheet_data_http_error():
-    with patch('requests.post') as mock_post:
+    with patch('utils.http_client.post') as mock_post:
         mock_response = MagicMock()
         mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("HTTP Error")
         mock_post.return_value = mock_response
@@ -28,7 +30,7 @@ def test_fetch_sheet_data_http_error():
         assert result_df.equals(pd.DataFrame())
 
 def test_fetch_sheet_data_invalid_json():
-    with patch('requests.post') as mock_post:
+    with patch('utils.http_client.post') as mock_post:
         mock_response = MagicMock()
         mock_response.json.side_effect = ValueError("Invalid JSON")
         mock_response.raise_for_status = MagicMock()
@@ -37,7 +39,7 @@ def test_fetch_sheet_data_invalid_json():
         assert result_df.equals(pd.DataFrame())
 
 def test_fetch_sheet_data_network_error():
-    with patch('requests.post') as mock_post:
+    with patch('utils.http_client.post') as mock_post:
         mock_post.side_effect = requests.exceptions.ConnectionError("Network error")
         result_df = fetch_sheet_data("valid_spreadsheet_id")
         assert result_df.equals(pd.DataFrame())
@@ -45,7 +47,7 @@ def test_fetch_sheet_data_network_error():
 def test_fetch_sheet_data_empty_spreadsheet_id():
     mock_data = [{"column1": "value1", "column2": "value2"}]
     expected_df = pd.DataFrame(mock_data)
-    with patch('requests.post') as mock_post:
+    with patch('utils.http_client.post') as mock_post:
         mock_response = MagicMock()
         mock_response.json.return_value = mock_data
         mock_response.raise_for_status = MagicMock()
@@ -54,8 +56,23 @@ def test_fetch_sheet_data_empty_spreadsheet_id():
         pd.testing.assert_frame_equal(result_df, expected_df)
 
 
+def test_fetch_sheet_data_start_row_slices_full_sheet():
+    mock_data = [{"column1": "a"}, {"column1": "b"}, {"column1": "c"}]
+    with patch('utils.http_client.post') as mock_post:
+        mock_post.return_value.json.return_value = mock_data
+        result_df = fetch_sheet_data("sheet", start_row=2)
+    assert mock_post.call_args.kwargs['json'] == {'id': 'sheet', 'startRow': 2}
+    pd.testing.assert_frame_equal(result_df, pd.DataFrame([{"column1": "c"}]))
+
+def test_fetch_sheet_data_start_row_honoured_by_script():
+    with patch('utils.http_client.post') as mock_post:
+        mock_post.return_value.json.return_value = {"startRow": 2, "rows": [{"column1": "c"}]}
+        result_df = fetch_sheet_data("sheet", start_row=2)
+    pd.testing.assert_frame_equal(result_df, pd.DataFrame([{"column1": "c"}]))
+
+
 def test_scrape_contact_info_success():
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {'email': 'example@example.com'}
@@ -65,7 +82,7 @@ def test_scrape_contact_info_success():
         assert result == {'email': 'example@example.com'}
 
 def test_scrape_contact_info_rate_limit_fallback():
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         mock_response_429 = Mock()
         mock_response_429.status_code = 429  # Simulate rate limit response
 
@@ -84,15 +101,36 @@ def test_scrape_contact_info_rate_limit_fallback():
         assert result == {'email': 'example@example.com'}
 
 def test_scrape_contact_info_failure():
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         mock_response = Mock()
         mock_response.status_code = 404
         mock_get.return_value = mock_response
         result = scrape_contact_info('http://example.com')
         assert result is None
 
+def test_scrape_contact_info_retries_timeouts():
+    with patch('utils.http_client.get') as mock_get:
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'email': 'example@example.com'}
+        mock_get.side_effect = [requests.exceptions.ReadTimeout("read timed out"), mock_response]
+
+        result = scrape_contact_info('http://example.com')
+
+    assert mock_get.call_count == 2
+    assert result == {'email': 'example@example.com'}
+
+def test_scrape_contact_info_connection_errors_exhaust_retries():
+    with patch('utils.http_client.get', side_effect=requests.exceptions.ConnectionError("refused")) as mock_get:
+        result = scrape_contact_info('http://unreachable.com')
+        # Not cached: the next call tries again
+        scrape_contact_info('http://unreachable.com')
+
+    assert result is None
+    assert mock_get.call_count == 2 * (Config.SCRAPER_MAX_RETRIES + 1)
+
 def test_scrape_contact_info_rate_limit_exceeded():
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         mock_response = Mock()
         mock_response.status_code = 429
         mock_get.return_value = mock_response
@@ -100,7 +138,7 @@ def test_scrape_contact_info_rate_limit_exceeded():
         assert result is None
 
 
-@patch('requests.get')
+@patch('utils.http_client.get')
 def test_get_place_details_success(mock_get):
     expected_result = {
         'name': 'Test Place',
@@ -108,6 +146,7 @@ def test_get_place_details_success(mock_get):
         'website': 'http://testplace.com'
     }
     response_data = {
+        'status': 'OK',
         'result': expected_result
     }
 
@@ -119,7 +158,7 @@ def test_get_place_details_success(mock_get):
     result = get_place_details("test_place_id")
     assert result == expected_result
 
-@patch('requests.get')
+@patch('utils.http_client.get')
 def test_get_place_details_no_result(mock_get):
     mock_response = Mock()
     mock_response.json.return_value = {}
@@ -129,7 +168,7 @@ def test_get_place_details_no_result(mock_get):
     result = get_place_details("test_place_id_no_result")
     assert result == {}
 
-@patch('requests.get')
+@patch('utils.http_client.get')
 def test_get_place_details_incorrect_status_code(mock_get):
     mock_response = Mock()
     mock_response.json.return_value = {
@@ -145,9 +184,10 @@ def test_get_place_details_incorrect_status_code(mock_get):
     result = get_place_details("test_place_id_error")
     assert result == {}
 
-@patch('requests.get')
+@patch('utils.http_client.get')
 def test_get_place_details_missing_fields(mock_get):
     response_data = {
+        'status': 'OK',
         'result': {
             'name': 'Incomplete Place'
             # Missing formatted_address and website
@@ -162,17 +202,17 @@ def test_get_place_details_missing_fields(mock_get):
     result = get_place_details("test_place_id_incomplete")
     assert result == {'name': 'Incomplete Place'}
 
-@patch('requests.get')
+@patch('utils.http_client.get')
 def test_get_place_details_empty_result(mock_get):
     mock_response = Mock()
-    mock_response.json.return_value = {'result': {}}
+    mock_response.json.return_value = {'status': 'OK', 'result': {}}
     mock_response.status_code = 200
     mock_get.return_value = mock_response
 
     result = get_place_details("test_place_id_empty")
     assert result == {}
 
-@patch('requests.get')
+@patch('utils.http_client.get')
 def test_get_place_details_api_key_error(mock_get):
     mock_response = Mock()
     mock_response.json.return_value = {'error_message': 'Invalid API key', 'status': 'REQUEST_DENIED'}
@@ -186,6 +226,7 @@ def test_get_place_details_api_key_error(mock_get):
 @pytest.fixture
 def mock_api_response():
     return {
+        'status': 'OK',
         'results': [
             {
                 'name': 'Test Restaurant 1',
@@ -205,6 +246,7 @@ def mock_api_response():
 @pytest.fixture
 def mock_place_details():
     return {
+        'status': 'OK',
         'result': {
             'website': 'http://test-restaurant.com',
             'name': 'Test Restaurant',
@@ -215,7 +257,7 @@ def mock_place_details():
 
 def test_get_businesses_successful_request(mock_api_response, mock_place_details):
     """Test successful API request with multiple results"""
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         # Create separate mock responses for each API call
         search_response = Mock()
         search_response.status_code = 200
@@ -243,7 +285,7 @@ def test_get_businesses_successful_request(mock_api_response, mock_place_details
 
 def test_get_businesses_with_pagination(mock_api_response, mock_place_details):
     """Test pagination handling"""
-    with patch('requests.get') as mock_get, \
+    with patch('utils.http_client.get') as mock_get, \
             patch('time.sleep') as mock_sleep:  # Mock sleep to speed up tests
 
         # First page response
@@ -285,12 +327,13 @@ def test_get_businesses_with_pagination(mock_api_response, mock_place_details):
 
         assert len(result) == 4  # Two results from each page
         assert mock_sleep.called
-        assert mock_get.call_count == 6  # Two pages plus four place details
+        # Two pages plus two place details; the second page repeats the same places, served from cache
+        assert mock_get.call_count == 4
 
 
 def test_get_businesses_missing_website(mock_api_response):
     """Test handling of missing website in place details"""
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         # Create search response
         search_response = Mock()
         search_response.status_code = 200
@@ -300,6 +343,7 @@ def test_get_businesses_missing_website(mock_api_response):
         details_response = Mock()
         details_response.status_code = 200
         details_response.json.return_value = {
+            'status': 'OK',
             'result': {
                 'name': 'Test Restaurant',
                 'formatted_address': '123 Test St'
@@ -323,7 +367,7 @@ def test_get_businesses_missing_website(mock_api_response):
 
 def test_get_businesses_api_error():
     """Test handling of API error response"""
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         error_response = Mock()
         error_response.status_code = 400
         mock_get.return_value = error_response
@@ -336,10 +380,10 @@ def test_get_businesses_api_error():
 
 def test_get_businesses_empty_results():
     """Test handling of empty results from API"""
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         empty_response = Mock()
         empty_response.status_code = 200
-        empty_response.json.return_value = {'results': [], 'next_page_token': None}
+        empty_response.json.return_value = {'status': 'ZERO_RESULTS', 'results': [], 'next_page_token': None}
         mock_get.return_value = empty_response
 
         result = get_businesses("test query")
@@ -366,7 +410,7 @@ def test_parallel_scraping_successful():
     """Test successful parallel scraping of multiple websites"""
     websites = ['http://example1.com', 'http://example2.com']
 
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         # Set up mock responses
         response1 = Mock()
         response1.status_code = 200
@@ -390,7 +434,7 @@ def test_parallel_scraping_with_errors():
     """Test parallel scraping handling of failed requests"""
     websites = ['http://example1.com', 'http://error.com']
 
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         # Set up responses
         success_response = Mock()
         success_response.status_code = 200
@@ -428,7 +472,7 @@ def test_parallel_scraping_max_workers():
     mock_instance.__exit__ = Mock(return_value=None)
 
     with patch('utils.utils.ThreadPoolExecutor', mock_executor), \
-            patch('requests.get') as mock_get:
+            patch('utils.http_client.get') as mock_get:
         # Set up a mock response for requests.get.
         mock_response = Mock()
         mock_response.status_code = 200
@@ -457,7 +501,7 @@ def test_parallel_scraping_mixed_results():
     """Test parallel scraping with mix of successful, failed, and None results"""
     websites = ['success.com', 'error.com', 'timeout.com']
 
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         # Set up different responses
         success_response = Mock()
         success_response.status_code = 200
@@ -483,7 +527,7 @@ def test_parallel_scraping_empty_response():
     """Test parallel scraping with empty response"""
     websites = ['empty.com']
 
-    with patch('requests.get') as mock_get:
+    with patch('utils.http_client.get') as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {'result': {'emails': []}}
@@ -492,4 +536,277 @@ def test_parallel_scraping_empty_response():
         results = scrape_contact_info_parallel(websites)
 
         assert len(results) == 1
-        assert results['empty.com']['result']['emails'] == []
\ No newline at end of file
+        assert results['empty.com']['result']['emails'] == []
+
+
+def _slow_place_details(place_id):
+    time.sleep(0.2)
+    return {'website': f'http://{place_id}.com'}
+
+
+def test_get_place_websites_keeps_order():
+    """Test that concurrent details lookups return websites in the original order"""
+    place_ids = [f'place_{i}' for i in range(6)]
+
+    def details_side_effect(place_id):
+        # Finish the earlier places last to make out-of-order completion likely
+        time.sleep(0.01 * (len(place_ids) - int(place_id.split('_')[1])))
+        return {'website': f'http://{place_id}.com'}
+
+    with patch('utils.utils.get_place_details', side_effect=details_side_effect):
+        result = get_place_websites(place_ids, max_workers=6)
+
+    assert result == [f'http://place_{i}.com' for i in range(6)]
+
+
+def test_get_place_websites_missing_website():
+    """Test that places without a website keep the 'N/A' placeholder"""
+    with patch('utils.utils.get_place_details', side_effect=[{'website': 'http://a.com'}, {}]):
+        result = get_place_websites(['a', 'b'], max_workers=1)
+
+    assert result == ['http://a.com', 'N/A']
+
+
+def test_get_place_websites_empty_list():
+    """Test that an empty page does not start any lookups"""
+    with patch('utils.utils.get_place_details') as mock_details:
+        assert get_place_websites([]) == []
+        mock_details.assert_not_called()
+
+
+def test_get_businesses_parallel_details_speedup():
+    """Test that details lookups for a page run concurrently against a slow stub"""
+    search_response = Mock()
+    search_response.status_code = 200
+    search_response.json.return_value = {
+        'status': 'OK',
+        'results': [{'place_id': f'place_{i}'} for i in range(8)],
+        'next_page_token': None
+    }
+
+    with patch('utils.http_client.get', return_value=search_response), \
+            patch('utils.utils.get_place_details', side_effect=_slow_place_details):
+        start = time.perf_counter()
+        serial_result = get_businesses("test query", max_workers=1)
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel_result = get_businesses("test query", max_workers=8)
+        parallel_time = time.perf_counter() - start
+
+    assert serial_result == parallel_result == [f'http://place_{i}.com' for i in range(8)]
+    assert serial_time >= 1.6
+    assert parallel_time < serial_time / 3
+
+
+@pytest.mark.parametrize("query", [
+    "Restaurants near Sofia",
+    "  restaurants   in sofia ",
+    "restaurants around Sofia.",
+    "RESTAURANTS close to Sofia",
+])
+def test_normalize_query_equivalent_phrasings(query):
+    assert normalize_query(query) == "restaurants in sofia"
+
+
+def test_get_businesses_query_cache_hit_skips_search(mock_api_response, mock_place_details):
+    """Test that an equivalent query is answered from the query cache without any API calls"""
+    with patch('utils.http_client.get') as mock_get:
+        search_response = Mock()
+        search_response.status_code = 200
+        search_response.json.return_value = mock_api_response
+
+        details_response = Mock()
+        details_response.status_code = 200
+        details_response.json.return_value = mock_place_details
+
+        mock_get.side_effect = lambda *args, **kwargs: search_response if 'textsearch' in args[0] else details_response
+
+        first = get_businesses("Restaurants near Sofia")
+        calls_after_first = mock_get.call_count
+        second = get_businesses("restaurants in  sofia")
+
+    assert first == second == ['http://test-restaurant.com', 'http://test-restaurant.com']
+    assert mock_get.call_count == calls_after_first
+    assert business_query_cache.stats()['hits'] >= 1
+
+
+def test_get_businesses_api_error_not_cached():
+    """Test that a failed search is not stored in the query cache"""
+    with patch('utils.http_client.get') as mock_get:
+        error_response = Mock()
+        error_response.status_code = 500
+        mock_get.return_value = error_response
+
+        get_businesses("failing query")
+        get_businesses("failing query")
+
+    assert mock_get.call_count == 2
+
+
+def test_get_businesses_bypass_cache(mock_api_response, mock_place_details):
+    """Test that use_cache=False always runs the search"""
+    with patch('utils.http_client.get') as mock_get:
+        empty_response = Mock()
+        empty_response.status_code = 200
+        empty_response.json.return_value = {'status': 'ZERO_RESULTS', 'results': [], 'next_page_token': None}
+        mock_get.return_value = empty_response
+
+        get_businesses("uncached query", use_cache=False)
+        get_businesses("uncached query", use_cache=False)
+
+    assert mock_get.call_count == 2
+
+
+def test_iter_businesses_yields_before_next_page(mock_api_response, mock_place_details):
+    """Test that the first page's websites are yielded before the second page is requested"""
+    first_page = dict(mock_api_response, next_page_token='test_token')
+    second_page = dict(mock_api_response, next_page_token=None)
+    search_pages = iter([first_page, second_page])
+    search_calls = []
+
+    def get_side_effect(*args, **kwargs):
+        response = Mock()
+        response.status_code = 200
+        if 'textsearch' in args[0]:
+            search_calls.append(kwargs['params'].get('pagetoken'))
+            response.json.return_value = next(search_pages)
+        else:
+            response.json.return_value = mock_place_details
+        return response
+
+    with patch('utils.http_client.get', side_effect=get_side_effect), patch('time.sleep'):
+        stream = iter_businesses("test query")
+        first_website = next(stream)
+        assert first_website == 'http://test-restaurant.com'
+        assert search_calls == [None]
+
+        remaining = list(stream)
+
+    assert len(remaining) == 3
+    assert search_calls == [None, 'test_token']
+
+
+def test_iter_contact_info_overlaps_slow_stream():
+    """Test that scraping starts while the website stream is still producing pages"""
+    def slow_pages():
+        yield from ['page1-a.com', 'page1-b.com']
+        time.sleep(0.3)  # Simulates the wait for the next results page
+        yield from ['page2-a.com', 'page2-b.com']
+
+    def slow_scrape(website, check_cache=True):
+        time.sleep(0.3)
+        return {'emails': [f'info@{website}']}
+
+    with patch('utils.utils.scrape_contact_info', side_effect=slow_scrape):
+        start = time.perf_counter()
+        results = dict(iter_contact_info(slow_pages(), max_workers=2))
+        elapsed = time.perf_counter() - start
+
+    assert results == {website: {'emails': [f'info@{website}']}
+                       for website in ['page1-a.com', 'page1-b.com', 'page2-a.com', 'page2-b.com']}
+    # Fetch-then-scrape would take 0.3s of paging plus two 0.3s rounds of scraping on two workers
+    assert elapsed < 0.8
+
+
+def test_scrape_contact_info_parallel_accepts_generator():
+    """Test that the parallel scraper consumes a generator of websites"""
+    with patch('utils.utils.scrape_contact_info', side_effect=lambda website, check_cache=True: {'emails': []}):
+        results = scrape_contact_info_parallel(website for website in ['a.com', 'b.com'])
+
+    assert results == {'a.com': {'emails': []}, 'b.com': {'emails': []}}
+
+
+def test_parallel_scraping_dedupes_domains_and_fans_out():
+    """Test that each canonical domain is scraped once and placeholders are skipped"""
+    websites = ['http://www.chain.com', 'N/A', 'https://chain.com/sofia', 'http://other.com', 'N/A']
+
+    with patch('utils.utils.scrape_contact_info', side_effect=lambda website, check_cache=True: {'emails': [website]}) as mock_scrape:
+        results = scrape_contact_info_parallel(websites)
+
+    assert mock_scrape.call_count == 2
+    assert results == {
+        'http://www.chain.com': {'emails': ['http://www.chain.com']},
+        'https://chain.com/sofia': {'emails': ['http://www.chain.com']},
+        'http://other.com': {'emails': ['http://other.com']},
+    }
+
+
+def test_iter_contact_info_duplicate_after_domain_finished():
+    """Test that a duplicate arriving after its domain was scraped reuses the finished result"""
+    def stream():
+        yield 'http://chain.com'
+        time.sleep(0.1)
+        yield 'http://www.chain.com/branch'
+
+    with patch('utils.utils.scrape_contact_info', return_value={'emails': ['a@chain.com']}) as mock_scrape:
+        results = dict(iter_contact_info(stream()))
+
+    assert mock_scrape.call_count == 1
+    assert results == {
+        'http://chain.com': {'emails': ['a@chain.com']},
+        'http://www.chain.com/branch': {'emails': ['a@chain.com']},
+    }
+
+
+def _search_side_effect(search_pages, mock_place_details, search_calls):
+    def get_side_effect(*args, **kwargs):
+        response = Mock()
+        response.status_code = 200
+        if 'textsearch' in args[0]:
+            search_calls.append(kwargs['params'].get('pagetoken'))
+            response.json.return_value = next(search_pages)
+        else:
+            response.json.return_value = mock_place_details
+        return response
+    return get_side_effect
+
+
+def test_get_businesses_error_status_on_later_page_not_cached(mock_api_response, mock_place_details):
+    """Test that a page answered with an error status ends the search without caching the partial list"""
+    search_pages = iter([dict(mock_api_response, next_page_token='test_token'),
+                         {'status': 'OVER_QUERY_LIMIT', 'results': []},
+                         mock_api_response])
+    search_calls = []
+
+    with patch('utils.http_client.get', side_effect=_search_side_effect(search_pages, mock_place_details, search_calls)), \
+            patch('time.sleep'):
+        partial = get_businesses("throttled query")
+        complete = get_businesses("throttled query")
+
+    assert partial == ['http://test-restaurant.com', 'http://test-restaurant.com']
+    assert complete == partial
+    assert search_calls == [None, 'test_token', None]
+
+
+def test_get_businesses_retries_page_token_not_yet_valid(mock_api_response, mock_place_details):
+    """Test that INVALID_REQUEST for a fresh page token is retried after another delay"""
+    search_pages = iter([dict(mock_api_response, next_page_token='test_token'),
+                         {'status': 'INVALID_REQUEST', 'results': []},
+                         mock_api_response])
+    search_calls = []
+
+    with patch('utils.http_client.get', side_effect=_search_side_effect(search_pages, mock_place_details, search_calls)), \
+            patch('time.sleep') as mock_sleep:
+        result = get_businesses("slow token query")
+        cached = get_businesses("slow token query")
+
+    assert len(result) == 4
+    assert cached == result
+    assert search_calls == [None, 'test_token', 'test_token']
+    assert mock_sleep.call_count == 2
+
+
+def test_get_businesses_gives_up_on_invalid_page_token(mock_api_response, mock_place_details):
+    """Test that a page token still rejected after the retries is not cached"""
+    search_pages = iter([dict(mock_api_response, next_page_token='bad_token')]
+                        + [{'status': 'INVALID_REQUEST', 'results': []}] * 10)
+    search_calls = []
+
+    with patch('utils.http_client.get', side_effect=_search_side_effect(search_pages, mock_place_details, search_calls)), \
+            patch('time.sleep'), patch('utils.utils.Config.PLACES_PAGE_TOKEN_RETRIES', 2):
+        result = get_businesses("bad token query")
+
+    assert len(result) == 2
+    assert search_calls == [None, 'bad_token', 'bad_token', 'bad_token']
+    assert business_query_cache.get(normalize_query("bad token query")) is None
@@ -0,0 +1,54 @@
+import pytest
+from utils.websites import canonical_website, group_websites
+
+
+@pytest.mark.parametrize("website, expected", [
+    ("http://example.com", "example.com"),
+    ("https://www.Example.com/menu?lang=en", "example.com"),
+    ("example.com", "example.com"),
+    ("https://shop.example.com/", "example.com"),
+    ("http://example.com:8080/contact", "example.com"),
+    ("https://www.pizzeria.co.uk/", "pizzeria.co.uk"),
+    ("https://cafe.com.bg", "cafe.com.bg"),
+    ("https://joes-diner.business.site/", "joes-diner.business.site"),
+    ("https://www.facebook.com/JoesDiner/", "facebook.com/joesdiner"),
+    ("https://m.facebook.com/joesdiner/about", "facebook.com/joesdiner"),
+    ("https://pizza.co.il", "pizza.co.il"),
+    ("https://www.burger.co.il/menu", "burger.co.il"),
+    ("https://shop.kimchi.co.kr", "kimchi.co.kr"),
+    ("https://parrilla.com.ar", "parrilla.com.ar"),
+    ("https://kava.com.ua", "kava.com.ua"),
+    ("https://ramen.ne.jp", "ramen.ne.jp"),
+    ("https://sofia.gov.bg", "sofia.gov.bg"),
+    ("https://uni.edu.au", "uni.edu.au"),
+    ("https://www.facebook.com/profile.php?id=100012345", "facebook.com/profile.php?id=100012345"),
+    ("https://www.facebook.com/pages/Joes-Diner/123", "facebook.com/pages/joes-diner"),
+    ("https://sites.google.com/view/joes-diner/home", "sites.google.com/view/joes-diner"),
+])
+def test_canonical_website(website, expected):
+    assert canonical_website(website) == expected
+
+
+@pytest.mark.parametrize("website", ["N/A", "", "  ", None, "none", "mailto:info@example.com", "localhost", 42,
+                                     "https://www.facebook.com/profile.php", "https://sites.google.com/view/",
+                                     "https://www.facebook.com", "linktr.ee/"])
+def test_canonical_website_placeholders(website):
+    assert canonical_website(website) is None
+
+
+def test_group_websites_dedupes_and_drops_placeholders():
+    websites = ["http://www.a.com", "N/A", "https://a.com/contact", "http://b.com", "N/A"]
+    assert group_websites(websites) == {
+        "a.com": ["http://www.a.com", "https://a.com/contact"],
+        "b.com": ["http://b.com"],
+    }
+
+
+def test_distinct_businesses_on_country_domains_and_platforms_stay_apart():
+    websites = [
+        "https://pizza.co.il", "https://burger.co.il",
+        "https://www.facebook.com/profile.php?id=1", "https://www.facebook.com/profile.php?id=2",
+        "https://sites.google.com/view/pizza", "https://sites.google.com/view/burger",
+    ]
+    assert all(len(group) == 1 for group in group_websites(websites).values())
+    assert len(group_websites(websites)) == 6
@@ -1,14 +1,25 @@
 from flask import jsonify, request
-import requests
 import os
-import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 import stripe
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 import Config.config
 from ModelInstructions.model_instructions import Instructions
-from utils.utils import scrape_contact_info_parallel, get_businesses, fetch_sheet_data
-from google.cloud import translate_v2 as translate
+from utils.utils import iter_contact_info, iter_businesses, fetch_sheet_data, contact_emails, place_details_cache, business_query_cache, contact_info_cache, feedback_analysis_cache
+from utils.async_engine import discover_business_contacts_sync
+from utils import http_client
+from utils.job_queue import job_queue, is_retryable, payload_error
+from utils.smtp_pool import smtp_pool
+from utils.bulk_email import send_bulk
+from utils.email_campaigns import campaign_store
+from utils.sse import format_sse, sse_response
+from utils.metrics import call_metrics, current_endpoint, endpoint_scope, usage_counts
+from utils.llm_cache import llm_response_cache, completion_key
+from utils.survey_data import survey_prompt, summarize_survey, survey_overview, question_legend, text_chunks, token_batches, estimate_tokens
+from utils.translation import DIRECTIONS, translate_texts, translation_memory
 
 stripe.api_key = Config.config.Config.STRIPE_SECRET_KEY
 
@@ -18,22 +29,52 @@ class ApiFunctions:
         # return list("tochkatapetrov@gmail.com")
         data = request.json
         query = data.get("googlePlacesQuery")
+        return ApiFunctions.discover_business_emails(query), 200
 
-        # Step 1: Get the websites to scrape
-        websites = get_businesses(query)
+    @staticmethod
+    def discover_business_emails(query, job=None):
+        """
+        Find businesses for a Google Places query and return one email per business website.
 
-        # Step 2: Scrape contact info in parallel
-        response = scrape_contact_info_parallel(websites)
+        Args:
+            query (str): Google Places text search query.
+            job (QueuedJob): Optional queued job to report progress and partial results to.
 
-        # Step 3: Collect emails
+        Returns:
+            list: Unique emails found.
+        """
+        progress = {"placesFound": 0, "sitesScraped": 0, "emailsFound": 0}
         emails = []
-        for website in response:
-            if response.get(website) is not None:
-                # Assuming the API response contains an "emails" field with a list of emails
-                email_list = response.get(website).get("emails", [])
-                if email_list:  # Check if there's at least one email in the list
-                    emails.append(email_list[0])  # Add the first email from the list
-        return list(set(emails)), 200
+
+        def places_found(count):
+            progress["placesFound"] += count
+            if job is not None:
+                job.update(**progress)
+
+        def site_scraped(website, contact_info):
+            progress["sitesScraped"] += 1
+            email_list = contact_emails(contact_info)
+            if email_list and email_list[0] not in emails:  # Keep the first email of each site
+                emails.append(email_list[0])
+                progress["emailsFound"] = len(emails)
+            if job is not None:
+                job.update(result=list(emails), **progress)
+
+        if Config.config.Config.LEAD_DISCOVERY_ENGINE == "asyncio":
+            discover_business_contacts_sync(query, on_page=lambda websites: places_found(len(websites)),
+                                            on_contact=site_scraped)
+            return emails
+
+        def counted(websites):
+            for website in websites:
+                places_found(1)
+                yield website
+
+        # Stream the websites into the scraper so scraping overlaps pagination
+        for website, contact_info in iter_contact_info(counted(iter_businesses(query))):
+            site_scraped(website, contact_info)
+
+        return emails
 
     @staticmethod
     def create_google_form():
@@ -43,14 +84,14 @@ class ApiFunctions:
         form_title = data.get("form_title")
         questions = data.get("questions")
 
-        url = "https://script.google.com/macros/s/AKfycbzIQ2UFxgqcNasLr24x4CKDtIwtqEMJ-0O5mUrBqRGeZ59CR-_UrQekZCwSePa0VvGb/exec"
+        url = Config.config.Config.APPS_SCRIPT_FORM_URL
         payload = {
             "formTitle": form_title,
             "questions": questions
         }
 
         # Make the request to the Google Apps Script
-        response = requests.post(url, json=payload)
+        response = http_client.post(url, json=payload, timeout=(Config.config.Config.HTTP_CONNECT_TIMEOUT, Config.config.Config.APPS_SCRIPT_TIMEOUT))
         # Handle response
         print(response.status_code)
         if response.status_code == 200:
@@ -80,21 +121,32 @@ class ApiFunctions:
             return None
 
         try:
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": Instructions.SYSTEM_INSTRUCTIONS_FORM},
-                    {"role": "user", "content": description}
-                ],
-                max_tokens=1000
-            )
-
-            return response.choices[0].message.content
+            return ApiFunctions.complete_chat(client, Instructions.SYSTEM_INSTRUCTIONS_FORM, description)
 
         except Exception as e:
             print(f"Error calling OpenAI API: {e}")
             return None
 
+    @staticmethod
+    def call_openai_agent_stream(client):
+        """Stream the form design as server-sent events: delta events with text, then done or error."""
+        data = request.json or {}
+        description = data.get("business_description")
+        if not description:
+            return jsonify({"error": "Missing business_description"}), 400
+
+        def events():
+            parts = []
+            try:
+                yield from ApiFunctions.relay_chat(client, Instructions.SYSTEM_INSTRUCTIONS_FORM, description, parts)
+            except Exception as e:
+                print(f"Error calling OpenAI API: {e}")
+                yield format_sse({"error": "Failed to call OpenAI API"}, event="error")
+                return
+            yield format_sse({"text": "".join(parts)}, event="done")
+
+        return sse_response(events())
+
     @staticmethod
     def analyze_feedback(client):
         """
@@ -108,32 +160,302 @@ class ApiFunctions:
         """
         data = request.json
         spreadsheetId = data.get("spreadsheetId")
+        full_recompute = bool(data.get("fullRecompute"))
 
         try:
-            # Fetch and convert survey data
-            df = fetch_sheet_data(spreadsheetId)
-            if df.empty:
+            # Fetch and analyze the survey data, or only the responses added since the last analysis
+            analysis = ApiFunctions.analyze_spreadsheet(client, spreadsheetId, full_recompute=full_recompute)
+            if analysis is None:
                 return jsonify({"error": "No survey data provided"}), 400
 
-            survey_data = df.to_string()
+            return jsonify(analysis), 200  # Added status code 200
+
+        except Exception as e:
+            print(f"Error calling OpenAI API: {e}")
+            return jsonify({"error": "Failed to analyze survey data"}), 500
+
+    @staticmethod
+    def analyze_feedback_stream(client):
+        """
+        Streaming analyze_feedback: status events while the sheet is fetched and prepared, delta events while
+        the model writes, then a done event with the same body analyze_feedback returns (or an error event).
+        """
+        data = request.json or {}
+        spreadsheet_id = data.get("spreadsheetId")
+        full_recompute = bool(data.get("fullRecompute"))
+
+        def events():
+            yield format_sse({"stage": "fetching"}, event="status")
+            try:
+                fetched = ApiFunctions.fetch_new_responses(spreadsheet_id, full_recompute)
+                if fetched is None:
+                    yield format_sse({"error": "No survey data provided"}, event="error")
+                    return
+
+                previous, df = fetched
+                prompt = ApiFunctions.spreadsheet_analysis_prompt(client, previous, df)
+                if prompt is None:
+                    insights = previous['insights']
+                else:
+                    yield format_sse({"stage": "analyzing", "newRows": len(df)}, event="status")
+                    parts = []
+                    yield from ApiFunctions.relay_chat(client, *prompt, parts)
+                    insights = "".join(parts)
+
+                result = ApiFunctions.record_spreadsheet_analysis(spreadsheet_id, previous, df, insights)
+            except Exception as e:
+                print(f"Error calling OpenAI API: {e}")
+                yield format_sse({"error": "Failed to analyze survey data"}, event="error")
+                return
+            yield format_sse(result, event="done")
+
+        return sse_response(events())
+
+    @staticmethod
+    def analyze_spreadsheet(client, spreadsheet_id, full_recompute=False):
+        """
+        Analyze a spreadsheet's responses, reusing the stored analysis of the rows seen before.
+
+        Only rows added since the last call are fetched and folded into the stored insights, so repeated
+        calls cost O(new rows). full_recompute ignores the stored analysis and analyzes every row again.
+
+        Args:
+            client: OpenAI client instance
+            spreadsheet_id (str): The ID of the Google Spreadsheet
+            full_recompute (bool): Analyze all rows from scratch
+
+        Returns:
+            dict: insights, analyzedRows (responses covered), newRows and incremental, or None without data
+        """
+        fetched = ApiFunctions.fetch_new_responses(spreadsheet_id, full_recompute)
+        if fetched is None:
+            return None
+
+        previous, df = fetched
+        prompt = ApiFunctions.spreadsheet_analysis_prompt(client, previous, df)
+        insights = previous['insights'] if prompt is None else ApiFunctions.complete_chat(client, *prompt)
+
+        return ApiFunctions.record_spreadsheet_analysis(spreadsheet_id, previous, df, insights)
+
+    @staticmethod
+    def record_spreadsheet_analysis(spreadsheet_id, previous, df, insights):
+        """Store the insights covering previous rows plus df, and describe them for the response."""
+        total_rows = (previous['rows'] if previous else 0) + len(df)
+        if spreadsheet_id and not df.empty:
+            feedback_analysis_cache.set(
+                spreadsheet_id, {"rows": total_rows, "insights": insights}, Config.config.Config.FEEDBACK_ANALYSIS_TTL
+            )
+        return {
+            "insights": insights,
+            "analyzedRows": total_rows,
+            "newRows": len(df),
+            "incremental": previous is not None
+        }
+
+    @staticmethod
+    def fetch_new_responses(spreadsheet_id, full_recompute=False):
+        """
+        Fetch the responses the stored analysis of a spreadsheet doesn't cover yet.
+
+        Returns:
+            Tuple[dict, pd.DataFrame]: The stored analysis (None for a full analysis) and the responses after it,
+            or None when the spreadsheet has no responses to analyze
+        """
+        previous = None if full_recompute or not spreadsheet_id else feedback_analysis_cache.get(spreadsheet_id)
+        df = fetch_sheet_data(spreadsheet_id, start_row=previous['rows'] if previous else 0)
+        if previous is None and df.empty:
+            return None
+        return previous, df
+
+    @staticmethod
+    def spreadsheet_analysis_prompt(client, previous, df):
+        """Build the (instructions, content) folding df into the previous analysis, or None when df is empty."""
+        if df.empty:
+            return None
+        if previous is None:
+            return ApiFunctions.prepare_survey_analysis(client, df)
+        return ApiFunctions.prepare_analysis_update(client, previous['insights'], previous['rows'], df)
+
+    @staticmethod
+    def prepare_analysis_update(client, insights, analyzed_rows, new_df):
+        """Build the (instructions, content) folding new_df into an analysis of the first analyzed_rows responses."""
+        survey_data = survey_prompt(new_df)
+        if estimate_tokens(survey_data) > Config.config.Config.SURVEY_MAP_REDUCE_THRESHOLD:
+            survey_data = "Analysis of the new responses:\n\n" + ApiFunctions.analyze_survey_chunked(client, new_df)
+
+        return (
+            Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS_UPDATE,
+            f"Previous analysis of the first {analyzed_rows} responses:\n\n{insights}\n\n"
+            f"{len(new_df)} new responses:\n\n{survey_data}"
+        )
+
+    @staticmethod
+    def analyze_survey_data(client, df):
+        """
+        Ask the model for insights on survey responses.
+
+        Surveys whose prompt would exceed SURVEY_MAP_REDUCE_THRESHOLD tokens go through analyze_survey_chunked.
+
+        Args:
+            client: OpenAI client instance
+            df (pd.DataFrame): Survey responses, one row per response
+
+        Returns:
+            str: The model's analysis
+        """
+        # Call the OpenAI API to analyze the survey data
+        return ApiFunctions.complete_chat(client, *ApiFunctions.prepare_survey_analysis(client, df))
+
+    @staticmethod
+    def prepare_survey_analysis(client, df):
+        """
+        Build the final analysis request for survey responses, running the chunked stage first for large surveys.
+
+        Returns:
+            Tuple[str, str]: System instructions and user content for the final completion
+        """
+        survey_data = survey_prompt(df)
+        if estimate_tokens(survey_data) > Config.config.Config.SURVEY_MAP_REDUCE_THRESHOLD:
+            return ApiFunctions.prepare_chunked_analysis(client, df)
+        return Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS, f"Here is the survey data:\n\n{survey_data}"
+
+    @staticmethod
+    def analyze_survey_chunked(client, df):
+        """
+        Map-reduce analysis for surveys too large for one request.
+
+        The free-text answers are split into token-budgeted chunks that are analyzed concurrently, at most
+        SURVEY_CHUNK_CONCURRENCY at a time. A final call merges the partial notes with the exact statistics
+        of the structured answers. Notes too long for that call are first combined in further rounds.
+
+        Args:
+            client: OpenAI client instance
+            df (pd.DataFrame): Survey responses, one row per response
 
-            # Call the OpenAI API to analyze the survey data
+        Returns:
+            str: The model's analysis
+        """
+        return ApiFunctions.complete_chat(client, *ApiFunctions.prepare_chunked_analysis(client, df))
+
+    @staticmethod
+    def prepare_chunked_analysis(client, df):
+        """Run the chunk stage of analyze_survey_chunked and return the (instructions, content) of the merge call."""
+        config = Config.config.Config
+        summary = summarize_survey(df)
+        overview = survey_overview(summary)
+        legend = question_legend(summary)
+
+        endpoint = current_endpoint()
+
+        def take_notes(content):
+            # Pool threads do not inherit the caller's context, so carry its metrics label over
+            with endpoint_scope(endpoint):
+                return ApiFunctions.complete_chat(
+                    client, Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS_CHUNK, f"{legend}\n\n{content}",
+                    max_tokens=config.SURVEY_CHUNK_MAX_TOKENS
+                )
+
+        with ThreadPoolExecutor(max_workers=config.SURVEY_CHUNK_CONCURRENCY) as executor:
+            notes = list(executor.map(
+                take_notes,
+                [f"Free-text answers (CSV):\n{chunk}" for chunk in text_chunks(summary["text"], config.SURVEY_CHUNK_TOKENS)]
+            ))
+
+            budget = config.SURVEY_MAP_REDUCE_THRESHOLD - estimate_tokens(overview)
+            while len(notes) > 1 and sum(estimate_tokens(note) for note in notes) > budget:
+                batches = token_batches(notes, config.SURVEY_CHUNK_TOKENS)
+                if len(batches) == len(notes):
+                    # Every note fills a chunk on its own; combine them pairwise so each round shrinks the list
+                    batches = [notes[i:i + 2] for i in range(0, len(notes), 2)]
+                notes = list(executor.map(
+                    take_notes,
+                    ["Notes on earlier parts:\n\n" + "\n\n".join(batch) for batch in batches]
+                ))
+
+        survey_data = overview
+        if notes:
+            parts = "\n\n".join(f"Part {number}:\n{note}" for number, note in enumerate(notes, 1))
+            survey_data += f"\n\nNotes on the free-text answers, analyzed in {len(notes)} parts:\n\n{parts}"
+        return Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS, f"Here is the survey data:\n\n{survey_data}"
+
+    @staticmethod
+    def complete_chat(client, instructions, content, max_tokens=1000):
+        """Run one GPT-4 chat completion and return the reply text, answering repeats from llm_response_cache."""
+        model = "gpt-4"
+        cache_key = completion_key(model, instructions, content, max_tokens)
+        cached = llm_response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        with call_metrics.timed("openai", model=model, prompt_chars=len(instructions) + len(content)) as sample:
             response = client.chat.completions.create(
-                model="gpt-4",
+                model=model,
                 messages=[
-                    {"role": "system", "content": Instructions.SYSTEM_INSTRUCTIONS_ANALYSIS},
-                    {"role": "user", "content": f"Here is the survey data:\n\n{survey_data}"}
+                    {"role": "system", "content": instructions},
+                    {"role": "user", "content": content}
                 ],
-                max_tokens=1000
+                max_tokens=max_tokens
             )
+            sample.update(usage_counts(response.usage))
 
-            # Extract and return the content of the response
-            insights = response.choices[0].message.content
-            return jsonify({"insights": insights}), 200  # Added status code 200
+        # Extract and return the content of the response
+        reply = response.choices[0].message.content
+        if reply:
+            llm_response_cache.set(cache_key, reply)
+        return reply
 
-        except Exception as e:
-            print(f"Error calling OpenAI API: {e}")
-            return jsonify({"error": "Failed to analyze survey data"}), 500
+    @staticmethod
+    def stream_chat(client, instructions, content, max_tokens=1000):
+        """
+        Yield a GPT-4 chat completion's text as it is generated.
+
+        Closing the generator (the client went away) closes the upstream stream, which stops generation.
+        Only completions streamed to the end are cached; a cached completion is yielded in one piece.
+        """
+        model = "gpt-4"
+        cache_key = completion_key(model, instructions, content, max_tokens)
+        cached = llm_response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        with call_metrics.timed("openai_stream", model=model, prompt_chars=len(instructions) + len(content)) as sample:
+            start = time.perf_counter()
+            stream = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": instructions},
+                    {"role": "user", "content": content}
+                ],
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            try:
+                for chunk in stream:
+                    # The last chunk carries the usage and no choices
+                    sample.update(usage_counts(getattr(chunk, "usage", None)))
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        if not parts:
+                            sample["first_token_seconds"] = time.perf_counter() - start
+                        parts.append(delta)
+                        yield delta
+            finally:
+                stream.close()
+
+        reply = "".join(parts)
+        if reply:
+            llm_response_cache.set(cache_key, reply)
+
+    @staticmethod
+    def relay_chat(client, instructions, content, parts):
+        """Relay a streamed completion as server-sent delta events, collecting its text in parts."""
+        with closing(ApiFunctions.stream_chat(client, instructions, content)) as deltas:
+            for delta in deltas:
+                parts.append(delta)
+                yield format_sse({"text": delta}, event="delta")
 
     @staticmethod
     def send_email():
@@ -141,12 +463,11 @@ class ApiFunctions:
         recipients = data.get("recipients")  # Expecting a list of email addresses
         form_url = data.get("formUrl")
         recipients = ["tochkatapetrov@gmail.com"]
-        # Mailgun configuration
-        mailgun_domain = os.getenv('MAILGUN_DOMAIN')
-        mailgun_pwd = os.getenv('MAILGUN_PASSWORD')
-        sender_email = f'info@{mailgun_domain}'  # Use the Mailgun postmaster email
-        # sender_password = os.getenv("MAILGUN_API_KEY")  # Your Mailgun API key or SMTP password
+        return ApiFunctions.send_survey_emails(recipients, form_url)
 
+    @staticmethod
+    def build_survey_message(form_url, sender_email):
+        """Build the survey invitation without a To header, so one rendering serves every recipient."""
         # Create the message object
         message = MIMEMultipart("alternative")
         message["Subject"] = "Your Feedback is Highly Appreciated - Take our Quick Survey!"
@@ -199,34 +520,88 @@ class ApiFunctions:
         part = MIMEText(html_content, "html")
         message.attach(part)
 
+        return message
+
+    @staticmethod
+    def send_survey_emails(recipients, form_url):
+        """Email the survey link to every recipient over one Mailgun SMTP session."""
+        # Mailgun configuration
+        mailgun_domain = os.getenv('MAILGUN_DOMAIN')
+        sender_email = f'info@{mailgun_domain}'  # Use the Mailgun postmaster email
+        # sender_password = os.getenv("MAILGUN_API_KEY")  # Your Mailgun API key or SMTP password
+
+        message = ApiFunctions.build_survey_message(form_url, sender_email)
+
         # Check if recipients is a list, otherwise convert it to a list
         if isinstance(recipients, str):
             recipients = [recipients]  # Convert a single email to a list
 
-        # Prepare to send emails
-        success_count = 0
-        failure_count = 0
+        # Each copy gets only its own To header, and one bad address doesn't stop the rest
+        results = send_bulk(smtp_pool, sender_email, recipients, message, max_connections=1)
+        success_count = sum(1 for result in results if result["status"] == "sent")
+        failures = [result for result in results if result["status"] != "sent"]
+        if not failures:
+            return {"status": "Email sent successfully", "success_count": success_count}
 
-        try:
-            # Create an SMTP session using Mailgun's SMTP server
-            server = smtplib.SMTP('smtp.eu.mailgun.org', 587)  # Use port 587 for TLS
-            server.starttls()  # Upgrade to secure connection
-            server.login(sender_email, mailgun_pwd)
+        print(f"Failed to send email to {len(failures)} of {len(results)} recipients")
+        return {"status": "Error", "message": f"{len(failures)} of {len(results)} emails failed",
+                "success_count": success_count, "failure_count": len(failures), "failures": failures}
 
-            # Send the email to each recipient
-            for recipient in recipients:
-                message["To"] = recipient  # Update the To field for each recipient
-                server.sendmail(sender_email, recipient, message.as_string())
-                success_count += 1
+    @staticmethod
+    def send_bulk_email():
+        """Send the survey invitation to many recipients in parallel and report the outcome per recipient."""
+        data = request.json or {}
+        recipients = data.get("recipients") or []
+        form_url = data.get("formUrl")
+        if isinstance(recipients, str):
+            recipients = [recipients]
+        if not recipients or not form_url:
+            return jsonify({"error": "Missing recipients or formUrl"}), 400
+        if not isinstance(recipients, list) or not all(isinstance(recipient, str) for recipient in recipients):
+            return jsonify({"error": "recipients must be a list of email addresses"}), 400
 
-            server.quit()
+        results = ApiFunctions.send_bulk_survey_emails(recipients, form_url)
+        sent = sum(1 for result in results if result["status"] == "sent")
+        return jsonify({"sent": sent, "failed": len(results) - sent, "results": results}), 200
 
-            return {"status": "Email sent successfully", "success_count": success_count}
+    @staticmethod
+    def send_bulk_survey_emails(recipients, form_url):
+        """Send the survey invitation over several pooled connections; returns one result per unique recipient."""
+        sender_email = f'info@{os.getenv("MAILGUN_DOMAIN")}'
+        message = ApiFunctions.build_survey_message(form_url, sender_email)
+        return send_bulk(smtp_pool, sender_email, recipients, message, max_connections=smtp_pool.max_size)
 
-        except Exception as e:
-            failure_count += 1
-            print(f"Failed to send email: {e}")
-            return {"status": "Error", "message": str(e), "failure_count": failure_count}
+    @staticmethod
+    def start_email_campaign():
+        """Queue the survey invitation for throttled delivery and return the campaign to poll."""
+        data = request.json or {}
+        recipients = data.get("recipients") or []
+        form_url = data.get("formUrl")
+        if isinstance(recipients, str):
+            recipients = [recipients]
+        if not isinstance(recipients, list) or not all(isinstance(recipient, str) for recipient in recipients if recipient):
+            return jsonify({"error": "recipients must be a list of email addresses"}), 400
+        recipients = [recipient for recipient in recipients if recipient]
+        if not recipients or not form_url:
+            return jsonify({"error": "Missing recipients or formUrl"}), 400
+
+        campaign_id = campaign_store.create(form_url, f'info@{os.getenv("MAILGUN_DOMAIN")}')
+        queued = campaign_store.add_recipients(campaign_id, recipients)
+        job_id = job_queue.enqueue("email_campaign", {"campaignId": campaign_id})
+        return jsonify({
+            "campaignId": campaign_id,
+            "jobId": job_id,
+            "queued": queued,
+            "duplicatesSuppressed": len(recipients) - queued
+        }), 202
+
+    @staticmethod
+    def get_email_campaign(campaign_id):
+        if campaign_store.get(campaign_id) is None:
+            return jsonify({"error": "Campaign not found"}), 404
+        progress = campaign_store.progress(campaign_id)
+        progress["failures"] = campaign_store.failures(campaign_id)
+        return jsonify(progress), 200
 
     @staticmethod
     def feedback():
@@ -242,7 +617,6 @@ class ApiFunctions:
         body = f"Name: {name}\nEmail: {email}\nMessage: {message}"
 
         mailgun_domain = os.getenv('MAILGUN_DOMAIN')
-        mailgun_pwd = os.getenv('MAILGUN_PASSWORD')
         sender_email = f'info@{mailgun_domain}'
 
         msg = MIMEMultipart()
@@ -252,10 +626,7 @@ class ApiFunctions:
         msg.attach(MIMEText(body, 'plain'))
 
         try:
-            with smtplib.SMTP('smtp.eu.mailgun.org', 587) as server:
-                server.starttls()
-                server.login(sender_email, mailgun_pwd)
-                server.sendmail(sender_email, "info@pro-val.net", msg.as_string())
+            smtp_pool.sendmail(sender_email, "info@pro-val.net", msg.as_string())
 
             return jsonify({"message": "Email sent successfully"}), 200
         except Exception as e:
@@ -292,10 +663,9 @@ class ApiFunctions:
         :return: str, translated text in English
         """
         text = request.get_json()['text']
-        client = translate.Client()
-        result = client.translate(text, target_language='en', source_language='bg')
-        print(result['translatedText'])
-        return result['translatedText']
+        translated = translate_texts([text], 'bg', 'en')[0]
+        print(translated)
+        return translated
 
     @staticmethod
     def translate_to_bulgarian(text):
@@ -305,7 +675,78 @@ class ApiFunctions:
         :return: str, translated text in Bulgarian
         """
         text = request.get_json()['text']
-        client = translate.Client()
-        result = client.translate(text, target_language='bg', source_language='en')
-        print(result['translatedText'])
-        return result['translatedText']
+        translated = translate_texts([text], 'en', 'bg')[0]
+        print(translated)
+        return translated
+
+    @staticmethod
+    def translate_batch():
+        """
+        Translate a list of texts in one direction ("to_bg" or "to_en") with as few upstream requests as the
+        provider's limits allow. The translations come back in the order of the texts.
+        """
+        data = request.json or {}
+        texts = data.get("texts")
+        direction = data.get("direction")
+        if direction not in DIRECTIONS:
+            return jsonify({"error": f"direction must be one of: {', '.join(DIRECTIONS)}"}), 400
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return jsonify({"error": "texts must be a list of strings"}), 400
+        if not texts:
+            return jsonify({"translations": []}), 200
+
+        source_language, target_language = DIRECTIONS[direction]
+        try:
+            translations = translate_texts(texts, source_language, target_language)
+        except Exception as e:
+            print(f"Error calling Google Translate: {e}")
+            return jsonify({"error": "Failed to translate texts"}), 500
+        return jsonify({"translations": translations}), 200
+
+    @staticmethod
+    def cache_stats():
+        """Report hit/miss counters of the lead discovery, feedback analysis, LLM response and translation caches for this worker."""
+        return jsonify({
+            "place_details": place_details_cache.stats(),
+            "business_queries": business_query_cache.stats(),
+            "contact_info": contact_info_cache.stats(),
+            "feedback_analyses": feedback_analysis_cache.stats(),
+            "llm_responses": llm_response_cache.stats(),
+            "translations": translation_memory.stats()
+        }), 200
+
+    @staticmethod
+    def metrics():
+        """Latency percentiles, token usage, estimated cost and errors of model calls and sheet fetches per endpoint."""
+        return jsonify(call_metrics.summary()), 200
+
+    @staticmethod
+    def http_pool_stats():
+        """Report the keep-alive connection pools of this worker."""
+        return jsonify(http_client.http_client.pool_stats()), 200
+
+    @staticmethod
+    def enqueue_job():
+        """Queue an endpoint's work on the durable job queue; the payload is that endpoint's JSON body."""
+        from api_functions.job_tasks import TASKS
+
+        data = request.json or {}
+        task = data.get("task")
+        if task not in TASKS:
+            return jsonify({"error": f"Unknown task {task}", "tasks": sorted(TASKS)}), 400
+
+        payload = data.get("payload") or {}
+        error = payload_error(TASKS[task], payload)
+        if error:
+            return jsonify({"error": error}), 400
+
+        # A task that must not run twice gets one attempt, also when its worker dies
+        job_id = job_queue.enqueue(task, payload, max_attempts=None if is_retryable(TASKS[task]) else 1)
+        return jsonify({"jobId": job_id, "status": "queued"}), 202
+
+    @staticmethod
+    def get_job(job_id):
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job), 200
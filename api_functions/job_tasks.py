@@ -0,0 +1,80 @@
+from Config.config import Config
+from api_functions.api_functions import ApiFunctions
+from utils.bulk_email import is_valid_address
+from utils.llm_backend import create_llm_client
+from utils.email_campaigns import CampaignSender, campaign_store
+from utils.smtp_pool import smtp_pool
+
+_client = None
+
+
+def get_openai_client():
+    """LLM client for this worker process, created on first use."""
+    global _client
+    if _client is None:
+        _client = create_llm_client()
+    return _client
+
+
+def business_emails_task(job, payload):
+    return ApiFunctions.discover_business_emails(payload.get("googlePlacesQuery"), job=job)
+
+
+def analyze_feedback_task(job, payload):
+    analysis = ApiFunctions.analyze_spreadsheet(
+        get_openai_client(), payload.get("spreadsheetId"), full_recompute=bool(payload.get("fullRecompute"))
+    )
+    if analysis is None:
+        raise ValueError("No survey data provided")
+    job.update(rows=analysis["analyzedRows"], newRows=analysis["newRows"])
+    return analysis
+
+
+def send_email_task(job, payload):
+    results = ApiFunctions.send_bulk_survey_emails(payload.get("recipients"), payload.get("formUrl"))
+    sent = sum(1 for result in results if result["status"] == "sent")
+    job.update(sent=sent, failed=len(results) - sent)
+    return {"sent": sent, "failed": len(results) - sent, "results": results}
+
+
+def send_email_payload_error(payload):
+    recipients = payload.get("recipients")
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    if not recipients or not payload.get("formUrl"):
+        return "Missing recipients or formUrl"
+    if not isinstance(recipients, list) or not all(is_valid_address(recipient) for recipient in recipients):
+        return "recipients must be a list of valid email addresses"
+    return None
+
+
+# Recipients mailed before a failure would get the message again; email_campaign tracks them instead
+send_email_task.retryable = False
+send_email_task.validate = send_email_payload_error
+
+
+def email_campaign_task(job, payload):
+    campaign_id = payload.get("campaignId")
+    campaign = campaign_store.get(campaign_id)
+    if campaign is None:
+        raise ValueError(f"Unknown campaign {campaign_id}")
+
+    # Every worker process may run a campaign at once, so each gets its share of the provider limit
+    sender = CampaignSender(
+        campaign_store,
+        smtp_pool,
+        rate_limit=Config.EMAIL_RATE_LIMIT / max(1, Config.JOB_QUEUE_WORKER_PROCESSES),
+        max_attempts=Config.EMAIL_MAX_ATTEMPTS,
+        retry_backoff=Config.EMAIL_RETRY_BACKOFF
+    )
+    message = ApiFunctions.build_survey_message(campaign['form_url'], campaign['sender'])
+    return sender.run(campaign_id, message, job=job)
+
+
+# Task names match the endpoints whose JSON body they accept as payload
+TASKS = {
+    "business_emails": business_emails_task,
+    "analyze_feedback": analyze_feedback_task,
+    "send_email": send_email_task,
+    "email_campaign": email_campaign_task,
+}
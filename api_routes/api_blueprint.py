@@ -1,14 +1,13 @@
 from flask import Blueprint
 from api_functions.api_functions import ApiFunctions
-from openai import Client
+from utils.llm_backend import create_llm_client
 from Config.config import Config
 import firebase_admin
 from firebase_admin import firestore, credentials
 from flask import request
 
 api_bp = Blueprint('api', __name__)
-client = Client()
-client.api_key = Config.OPENAI_API_KEY
+client = create_llm_client()
 firebase_credentials = credentials.Certificate(Config.FIREBASE_CREDENTIALS_PATH)
 firebase_admin.initialize_app(firebase_credentials)
 db = firestore.client()
@@ -21,14 +20,34 @@ def create_form():
 def call_agent():
     return ApiFunctions.call_openai_agent(client)
 
+@api_bp.route('/api/call_agent/stream', methods=['POST'])
+def call_agent_stream():
+    return ApiFunctions.call_openai_agent_stream(client)
+
 @api_bp.route('/api/analyze_feedback', methods=['POST'])
 def analyze_feedback():
     return ApiFunctions.analyze_feedback(client)
 
+@api_bp.route('/api/analyze_feedback/stream', methods=['POST'])
+def analyze_feedback_stream():
+    return ApiFunctions.analyze_feedback_stream(client)
+
 @api_bp.route('/api/send_email', methods=['POST'])
 def send_email():
     return ApiFunctions.send_email()
 
+@api_bp.route('/api/send_email/bulk', methods=['POST'])
+def send_bulk_email():
+    return ApiFunctions.send_bulk_email()
+
+@api_bp.route('/api/email_campaigns', methods=['POST'])
+def start_email_campaign():
+    return ApiFunctions.start_email_campaign()
+
+@api_bp.route('/api/email_campaigns/<campaign_id>', methods=['GET'])
+def get_email_campaign(campaign_id):
+    return ApiFunctions.get_email_campaign(campaign_id)
+
 @api_bp.route('/api/feedback', methods=['POST'])
 def feedback():
     return ApiFunctions.feedback()
@@ -45,4 +64,28 @@ def translate_to_bg():
 @api_bp.route("/api/translate_to_en", methods=["POST"])
 def translate_to_en():
     text = request.get_json()['text']
-    return ApiFunctions.translate_to_english(text)
\ No newline at end of file
+    return ApiFunctions.translate_to_english(text)
+
+@api_bp.route("/api/translate/batch", methods=["POST"])
+def translate_batch():
+    return ApiFunctions.translate_batch()
+
+@api_bp.route("/api/cache_stats", methods=["GET"])
+def cache_stats():
+    return ApiFunctions.cache_stats()
+
+@api_bp.route("/api/metrics", methods=["GET"])
+def metrics():
+    return ApiFunctions.metrics()
+
+@api_bp.route("/api/http_pool_stats", methods=["GET"])
+def http_pool_stats():
+    return ApiFunctions.http_pool_stats()
+
+@api_bp.route("/api/jobs", methods=["POST"])
+def enqueue_job():
+    return ApiFunctions.enqueue_job()
+
+@api_bp.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    return ApiFunctions.get_job(job_id)
@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+
+from benchmarks.runner import SCENARIOS, compare_results, format_results, run_benchmark
+from benchmarks.stubs import StubServices
+
+
+def parse_env(values):
+    env = {}
+    for value in values:
+        key, _, setting = value.partition("=")
+        env[key] = setting
+    return env
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load the API end to end against local stand-ins for Google Places, RapidAPI, Apps Script, "
+                    "OpenAI, Google Translate and SMTP, and report requests per second and p50/p95/p99 per endpoint.")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=40, help="Measured requests per endpoint")
+    parser.add_argument("--job-requests", type=int, default=4, help="Measured lead discovery jobs")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests per endpoint first")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds before the first model token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=50)
+    parser.add_argument("--places-latency", type=float, default=0.05)
+    parser.add_argument("--places-pages", type=int, default=3)
+    parser.add_argument("--places-page-delay", type=float, default=2, help="PLACES_NEXT_PAGE_DELAY for the app")
+    parser.add_argument("--scraper-latency", type=float, default=0.2)
+    parser.add_argument("--rate-limited-ratio", type=float, default=0.1, help="Share of scraper calls answered 429")
+    parser.add_argument("--apps-script-latency", type=float, default=0.3)
+    parser.add_argument("--sheet-rows", type=int, default=60)
+    parser.add_argument("--translate-latency", type=float, default=0.05)
+    parser.add_argument("--smtp-latency", type=float, default=0.01)
+    parser.add_argument("--env", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="Extra app settings, e.g. LEAD_DISCOVERY_ENGINE=asyncio")
+    parser.add_argument("--output", help="Results file (default benchmark_results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    settings = {
+        "seed": args.seed,
+        "llm_latency": args.llm_latency,
+        "llm_tokens_per_second": args.llm_tokens_per_second,
+        "places_latency": args.places_latency,
+        "places_pages": args.places_pages,
+        "places_page_delay": args.places_page_delay,
+        "scraper_latency": args.scraper_latency,
+        "rate_limited_ratio": args.rate_limited_ratio,
+        "apps_script_latency": args.apps_script_latency,
+        "sheet_rows": args.sheet_rows,
+        "translate_latency": args.translate_latency,
+        "smtp_latency": args.smtp_latency
+    }
+
+    stubs = StubServices(settings).start()
+    try:
+        results = run_benchmark(stubs, [SCENARIOS[name] for name in args.endpoints], args.requests,
+                                args.concurrency, warmup=args.warmup, job_requests=args.job_requests,
+                                env=parse_env(args.env))
+    finally:
+        stubs.stop()
+
+    output = args.output
+    if output is None:
+        revision = results["revision"]
+        name = (revision["commit"] or "unknown")[:10] + ("-dirty" if revision["dirty"] else "")
+        output = os.path.join("benchmark_results", f"{name}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, ensure_ascii=False)
+
+    print(format_results(results))
+    print(f"Results written to {output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            print(compare_results(results, json.load(file)))
@@ -0,0 +1,23 @@
+import argparse
+import logging
+
+from werkzeug.serving import make_server
+
+
+def create_app():
+    """The Flask app with the API blueprint registered, as main.py runs it."""
+    from main import app
+    from api_routes.api_blueprint import api_bp
+    app.register_blueprint(api_bp)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the API for benchmark.py on a threaded WSGI server.")
+    parser.add_argument("--port", type=int, required=True)
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)  # No access log line per request
+    server = make_server("127.0.0.1", args.port, create_app(), threaded=True)
+    print(f"Serving the API on http://127.0.0.1:{args.port}", flush=True)
+    server.serve_forever()
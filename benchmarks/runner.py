@@ -0,0 +1,345 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from benchmarks.stubs import free_port
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOB_POLL_INTERVAL = 0.05
+
+FORM_QUESTIONS = [
+    {"text": "Which of the following features do you consider most important?", "type": "multiple-choice",
+     "options": ["Quality", "Price", "Brand Reputation", "Sustainability"], "required": True},
+    {"text": "Please describe your experience with similar products.", "type": "paragraph", "required": False}
+]
+
+UI_STRINGS = ("Start survey", "Next question", "Submit answers", "Thank you for your feedback!", "Select all that apply")
+
+
+class Scenario:
+    """
+    One endpoint under load.
+
+    payload(index) builds the JSON body of request index. Unless a scenario measures repeats on purpose,
+    every index and every scenario gets a different body so the app's caches (LLM responses included) miss.
+    kind is "json" (one response), "stream" (server-sent events, also timed to the first event) or "job"
+    (submit, then poll the job until it finishes).
+    """
+
+    def __init__(self, name, method, path, payload=None, kind="json", poll_path=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.payload = payload
+        self.kind = kind
+        self.poll_path = poll_path
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (
+    Scenario("create_form", "POST", "/api/create_form",
+             lambda index: {"form_title": f"Benchmark form {index}", "questions": FORM_QUESTIONS}),
+    Scenario("call_agent", "POST", "/api/call_agent",
+             lambda index: {"business_description": f"Benchmark shop {index} selling eco-friendly products."}),
+    Scenario("call_agent_stream", "POST", "/api/call_agent/stream",
+             lambda index: {"business_description": f"Benchmark stream shop {index} selling eco-friendly products."},
+             kind="stream"),
+    Scenario("analyze_feedback", "POST", "/api/analyze_feedback",
+             lambda index: {"spreadsheetId": f"benchmark-sheet-{index}"}),
+    Scenario("analyze_feedback_stream", "POST", "/api/analyze_feedback/stream",
+             lambda index: {"spreadsheetId": f"benchmark-stream-sheet-{index}"}, kind="stream"),
+    Scenario("business_emails_job", "POST", "/api/jobs",
+             lambda index: {"task": "business_emails",
+                            "payload": {"googlePlacesQuery": f"benchmark businesses {index} in Sofia"}},
+             kind="job", poll_path="/api/jobs/{id}"),
+    Scenario("send_email", "POST", "/api/send_email",
+             lambda index: {"formUrl": f"https://docs.google.com/forms/d/benchmark-{index}/viewform"}),
+    Scenario("send_email_bulk", "POST", "/api/send_email/bulk",
+             lambda index: {"formUrl": f"https://docs.google.com/forms/d/benchmark-{index}/viewform",
+                            "recipients": [f"user{index}-{n}@example.com" for n in range(20)]}),
+    Scenario("feedback", "POST", "/api/feedback",
+             lambda index: {"name": f"Benchmark {index}", "message": "Loving the product so far."}),
+    Scenario("translate_to_bg", "POST", "/api/translate_to_bg",
+             lambda index: {"text": f"Thank you for taking survey number {index}."}),
+    Scenario("translate_to_en", "POST", "/api/translate_to_en",
+             lambda index: {"text": f"Благодарим ви за попълнената анкета номер {index}."}),
+    # UI strings repeat across page loads, so this one deliberately cycles through a few texts
+    Scenario("translate_to_bg_repeated", "POST", "/api/translate_to_bg",
+             lambda index: {"text": UI_STRINGS[index % len(UI_STRINGS)]}),
+    Scenario("translate_batch", "POST", "/api/translate/batch",
+             lambda index: {"direction": "to_bg",
+                            "texts": [f"Survey {index} question {n}: how did you hear about us?" for n in range(20)]})
+)}
+
+
+def git_revision():
+    """Commit the tree is at and whether it has uncommitted changes, to label results."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": bool(status.strip())}
+
+
+def write_service_account(path):
+    """A syntactically valid Firebase service account with a fresh key, so the app can start offline."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption()).decode("ascii")
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({
+            "type": "service_account",
+            "project_id": "benchmark",
+            "private_key_id": "benchmark",
+            "private_key": pem,
+            "client_email": "benchmark@benchmark.iam.gserviceaccount.com",
+            "client_id": "0",
+            "token_uri": "https://oauth2.googleapis.com/token"
+        }, file)
+
+
+class AppProcess:
+    """The API in its own process behind a threaded WSGI server, configured entirely through env."""
+
+    def __init__(self, env, startup_timeout=60):
+        self.env = env
+        self.startup_timeout = startup_timeout
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+
+    def start(self):
+        env = dict(os.environ, **self.env)
+        # The app prints as it works; keep stderr for tracebacks only
+        self.process = subprocess.Popen([sys.executable, "-m", "benchmarks.app_server", "--port", str(self.port)],
+                                        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"App exited during startup with code {self.process.returncode}")
+            try:
+                if requests.get(f"{self.url}/api/metrics", timeout=1).status_code == 200:
+                    return self
+            except requests.exceptions.RequestException:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"App did not answer on {self.url} within {self.startup_timeout}s")
+
+    def stop(self):
+        _stop_process(self.process)
+
+
+class WorkerProcess:
+    """The job queue workers (worker.py) next to the app, sharing its JOB_QUEUE_PATH through env."""
+
+    def __init__(self, env):
+        self.env = env
+        self.process = None
+
+    def start(self):
+        self.process = subprocess.Popen([sys.executable, "worker.py"], cwd=REPO_ROOT, env=dict(os.environ, **self.env),
+                                        stdout=subprocess.DEVNULL)
+        return self
+
+    def stop(self):
+        _stop_process(self.process)
+
+
+def _stop_process(process):
+    if process is not None and process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def app_env(stubs, data_dir, overrides=None):
+    """Environment pointing the app at the stubs, with its SQLite files and credentials under data_dir."""
+    credentials_path = os.path.join(data_dir, "firebase.json")
+    write_service_account(credentials_path)
+    env = stubs.env()
+    env.update({
+        "FIREBASE_CREDENTIALS_PATH": credentials_path,
+        "CACHE_PATH": os.path.join(data_dir, "cache.sqlite3"),
+        "JOB_QUEUE_PATH": os.path.join(data_dir, "jobs.sqlite3"),
+        "PLACES_NEXT_PAGE_DELAY": str(stubs.settings.get("places_page_delay", 2))
+    })
+    env.update(overrides or {})
+    return env
+
+
+_sessions = threading.local()
+
+
+def _session():
+    # One keep-alive connection per client thread, like a browser tab
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    return session
+
+
+def send(base_url, scenario, index, timeout=300):
+    """Make request index of scenario and time it; returns {"latency", "ttfb", "ok", "status"}."""
+    session = _session()
+    start = time.perf_counter()
+    sample = {"latency": None, "ttfb": None, "ok": False, "status": None}
+    try:
+        response = session.request(scenario.method, base_url + scenario.path, json=scenario.payload(index),
+                                   stream=scenario.kind == "stream", timeout=timeout)
+        sample["status"] = response.status_code
+
+        if scenario.kind == "stream":
+            # The first line is the ": stream open" comment; time to the first real event instead
+            last_event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    last_event = line.split(":", 1)[1].strip()
+                    if sample["ttfb"] is None:
+                        sample["ttfb"] = time.perf_counter() - start
+            sample["ok"] = response.status_code == 200 and last_event == "done"
+        elif scenario.kind == "job":
+            job_id = response.json()["jobId"]
+            sample["ttfb"] = time.perf_counter() - start
+            status = "queued"
+            while status not in ("done", "failed"):
+                time.sleep(JOB_POLL_INTERVAL)
+                status = session.get(base_url + scenario.poll_path.format(id=job_id), timeout=timeout).json()["status"]
+            sample["ok"] = status == "done"
+        else:
+            response.content
+            sample["ok"] = response.status_code == 200
+    except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+        print(f"{scenario.name} request {index} failed: {e}")
+    sample["latency"] = time.perf_counter() - start
+    return sample
+
+
+def run_scenario(base_url, scenario, requests_count, concurrency, warmup=0):
+    """
+    Send requests_count requests from concurrency client threads and summarize them.
+
+    warmup requests go first and are not counted; they use negative indexes and so their own payloads,
+    which warms connections and imports without priming the caches of the measured requests.
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda index: send(base_url, scenario, -1 - index), range(warmup)))
+        start = time.perf_counter()
+        samples = list(executor.map(lambda index: send(base_url, scenario, index), range(requests_count)))
+        wall = time.perf_counter() - start
+    return summarize(samples, wall)
+
+
+def _percentiles(values):
+    values = np.array(values) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "mean": round(float(values.mean()), 1),
+        "p50": round(float(p50), 1),
+        "p95": round(float(p95), 1),
+        "p99": round(float(p99), 1),
+        "max": round(float(values.max()), 1)
+    }
+
+
+def summarize(samples, wall):
+    """Requests, errors, requests per second and latency percentiles (ms) of one scenario run."""
+    summary = {
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if not sample["ok"]),
+        "seconds": round(wall, 3),
+        "rps": round(len(samples) / wall, 2) if wall > 0 else None,
+        "latency_ms": _percentiles([sample["latency"] for sample in samples])
+    }
+    ttfb = [sample["ttfb"] for sample in samples if sample["ttfb"] is not None]
+    if ttfb:
+        summary["ttfb_ms"] = _percentiles(ttfb)
+    return summary
+
+
+def run_benchmark(stubs, scenarios, requests_count, concurrency, warmup=0, job_requests=None, env=None):
+    """
+    Start the app against running stubs, load each scenario in turn and collect the results.
+
+    Scenarios run one after another, so each endpoint's figures are not skewed by the others.
+    The app's own /api/metrics and the stubs' request counts are kept next to the client-side figures.
+    """
+    results = {
+        "revision": git_revision(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "settings": dict(stubs.settings, requests=requests_count, concurrency=concurrency, warmup=warmup,
+                         job_requests=job_requests or requests_count, env=env or {}),
+        "endpoints": {}
+    }
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        environment = app_env(stubs, data_dir, env)
+        workers = WorkerProcess(environment).start()  # Queued scenarios (lead discovery) run here
+        try:
+            app = AppProcess(environment).start()
+            try:
+                for scenario in scenarios:
+                    count = (job_requests or requests_count) if scenario.kind == "job" else requests_count
+                    print(f"{scenario.name}: {count} requests, {concurrency} clients")
+                    results["endpoints"][scenario.name] = run_scenario(app.url, scenario, count, concurrency, warmup)
+                results["server_metrics"] = requests.get(f"{app.url}/api/metrics", timeout=10).json()
+            finally:
+                app.stop()
+        finally:
+            workers.stop()
+
+    results["stub_counts"] = stubs.counts()
+    return results
+
+
+def format_results(results):
+    header = f"{'endpoint':<26}{'req':>6}{'err':>5}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ttfb p50':>10}"
+    lines = [header, "-" * len(header)]
+    for name, stats in results["endpoints"].items():
+        latency = stats["latency_ms"]
+        ttfb = stats.get("ttfb_ms", {}).get("p50", "")
+        lines.append(f"{name:<26}{stats['requests']:>6}{stats['errors']:>5}{stats['rps']:>9}"
+                     f"{latency['p50']:>10}{latency['p95']:>10}{latency['p99']:>10}{ttfb:>10}")
+    return "\n".join(lines)
+
+
+def _change(current, previous):
+    if current is None or not previous:
+        return "n/a"
+    return f"{(current - previous) / previous:+.1%}"
+
+
+def compare_results(current, previous):
+    """Table of rps and latency percentile changes per endpoint against an earlier results file."""
+    lines = [f"Compared with {(previous.get('revision') or {}).get('commit') or 'unknown commit'}"]
+    settings, before = current["settings"], previous.get("settings", {})
+    differing = sorted(key for key in set(settings) | set(before) if settings.get(key) != before.get(key))
+    if differing:
+        lines.append(f"Warning: settings differ ({', '.join(differing)}), so the figures are not directly comparable")
+
+    header = f"{'endpoint':<26}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+    lines += [header, "-" * len(header)]
+    for name, stats in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(name)
+        if before is None:
+            lines.append(f"{name:<26}{'new':>10}")
+            continue
+        lines.append(f"{name:<26}{_change(stats['rps'], before['rps']):>10}" + "".join(
+            f"{_change(stats['latency_ms'][p], before['latency_ms'][p]):>10}" for p in ("p50", "p95", "p99")))
+    return "\n".join(lines)
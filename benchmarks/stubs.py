@@ -0,0 +1,332 @@
+import asyncio
+import hashlib
+import json
+import logging
+import socket
+import threading
+import time
+
+from aiosmtpd.controller import Controller
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+
+from utils.llm_backend import FakeLlmClient
+
+
+def stable_fraction(*parts):
+    """Deterministic number in [0, 1) for the given values, so stub behaviour is the same on every run."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+def short_id(*parts):
+    return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:12]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubServer:
+    """Serve a WSGI app on 127.0.0.1 from a background thread, one thread per connection."""
+
+    def __init__(self, app, port=0):
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        self.server = make_server("127.0.0.1", port, app, threaded=True)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self._thread.join()
+
+
+def create_places_app(latency=0.0, pages=3, page_size=20, no_website_ratio=0.2, seed=0):
+    """
+    Google Places text search and details.
+
+    Every query has pages of page_size results chained by next_page_token. A no_website_ratio share
+    of the places has no website, like real listings.
+    """
+    app = Flask("places_stub")
+
+    @app.route("/textsearch/json")
+    def textsearch():
+        time.sleep(latency)
+        token = request.args.get("pagetoken")
+        if token:
+            page, query = token.split("|", 1)
+            page = int(page)
+        else:
+            page, query = 0, request.args.get("query", "")
+
+        results = [{"place_id": f"{short_id(seed, query)}-{page}-{index}", "name": f"Business {page}-{index}"}
+                   for index in range(page_size)]
+        body = {"status": "OK", "results": results}
+        if page + 1 < pages:
+            body["next_page_token"] = f"{page + 1}|{query}"
+        return jsonify(body)
+
+    @app.route("/details/json")
+    def details():
+        time.sleep(latency)
+        place_id = request.args.get("place_id", "")
+        result = {"name": f"Business {place_id}", "formatted_address": "1 Main St"}
+        if stable_fraction(seed, "website", place_id) >= no_website_ratio:
+            result["website"] = f"https://www.site-{short_id(seed, place_id)}.com"
+        return jsonify({"status": "OK", "result": result})
+
+    return app
+
+
+def create_scraper_app(latency=0.0, rate_limited_ratio=0.1, retry_after=1, seed=0):
+    """
+    RapidAPI website contact scraper.
+
+    Each attempt for a website is answered 429 with rate_limited_ratio probability, decided by hashing
+    (seed, website, attempt) so the same requests are throttled on every run.
+    """
+    app = Flask("scraper_stub")
+    attempts = {}
+    lock = threading.Lock()
+    app.config["counts"] = counts = {"requests": 0, "rate_limited": 0}
+
+    @app.route("/contacts")
+    def contacts():
+        website = request.args.get("website", "")
+        with lock:
+            attempt = attempts.get(website, 0)
+            attempts[website] = attempt + 1
+            counts["requests"] += 1
+            limited = stable_fraction(seed, "429", website, attempt) < rate_limited_ratio
+            if limited:
+                counts["rate_limited"] += 1
+        if limited:
+            return jsonify({"message": "Too many requests"}), 429, {"Retry-After": str(retry_after)}
+
+        time.sleep(latency)
+        host = website.split("://")[-1].split("/")[0].removeprefix("www.")
+        return jsonify({"website": website, "emails": [f"info@{host}", f"sales@{host}"]})
+
+    return app
+
+
+SHEET_COLUMNS = (
+    "Timestamp",
+    "On a scale of 1 to 10, how likely are you to recommend our product to a friend?",
+    "Which of the following features do you consider most important? (Select one)",
+    "Which features would you like to see in future products? (Select all that apply)",
+    "Please describe your experience with similar products."
+)
+FEATURES = ("Quality", "Price", "Brand Reputation", "Sustainability")
+WISHES = ("Eco-Friendly Materials", "Custom Designs", "Fast Delivery", "Subscription Options")
+EXPERIENCES = (
+    "Good quality overall but delivery took almost two weeks.",
+    "Too expensive for what you get, I switched to a cheaper brand.",
+    "Great customer service, they replaced a broken item right away.",
+    "The product works as described. Packaging could use less plastic.",
+    "I like the design, but sizes run small and returns are a hassle."
+)
+
+
+def sheet_rows(spreadsheet_id, rows, seed=0):
+    """The survey responses of a stub spreadsheet: rows deterministic answers keyed by spreadsheet id."""
+    responses = []
+    for index in range(rows):
+        pick = lambda *parts: stable_fraction(seed, spreadsheet_id, index, *parts)
+        wishes = [wish for wish in WISHES if pick("wish", wish) < 0.4] or [WISHES[0]]
+        responses.append(dict(zip(SHEET_COLUMNS, (
+            f"2024-05-{1 + index % 28:02d} {index % 24:02d}:{index % 60:02d}:00",
+            1 + int(pick("scale") * 10),
+            FEATURES[int(pick("feature") * len(FEATURES))],
+            ", ".join(wishes),
+            f"{EXPERIENCES[int(pick('text') * len(EXPERIENCES))]} (respondent {index + 1})"
+        ))))
+    return responses
+
+
+def create_apps_script_app(latency=0.0, rows=60, seed=0):
+    """The Apps Script web apps: /sheet returns survey responses (honouring startRow), /form creates a form."""
+    app = Flask("apps_script_stub")
+
+    @app.route("/sheet", methods=["POST"])
+    def sheet():
+        time.sleep(latency)
+        data = request.get_json(silent=True) or {}
+        responses = sheet_rows(data.get("id", ""), rows, seed)
+        start_row = int(data.get("startRow") or 0)
+        if start_row:
+            return jsonify({"startRow": start_row, "rows": responses[start_row:]})
+        return jsonify(responses)
+
+    @app.route("/form", methods=["POST"])
+    def form():
+        time.sleep(latency)
+        data = request.get_json(silent=True) or {}
+        form_id = short_id(seed, data.get("formTitle"), json.dumps(data.get("questions"), sort_keys=True))
+        return jsonify({
+            "formUrl": f"https://docs.google.com/forms/d/{form_id}/viewform",
+            "spreadsheetUrl": f"https://docs.google.com/spreadsheets/d/{form_id}/edit"
+        })
+
+    return app
+
+
+def _usage_json(usage):
+    return {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens}
+
+
+def create_openai_app(latency=0.5, tokens_per_second=50):
+    """
+    OpenAI chat completions at /v1/chat/completions, plain JSON or server-sent events.
+
+    Replies come from FakeLlmClient, so form design prompts get valid form JSON and the pacing
+    matches LLM_BACKEND=fake.
+    """
+    app = Flask("openai_stub")
+    backend = FakeLlmClient(latency=latency, tokens_per_second=tokens_per_second)
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    def chat_completions():
+        data = request.get_json()
+        model = data.get("model")
+        stream = bool(data.get("stream"))
+        include_usage = bool((data.get("stream_options") or {}).get("include_usage"))
+        reply = backend.complete(model, data["messages"], data.get("max_tokens"), stream, include_usage)
+        created = int(time.time())
+
+        if not stream:
+            return jsonify({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply.choices[0].message.content},
+                             "finish_reason": "stop"}],
+                "usage": _usage_json(reply.usage)
+            })
+
+        def events():
+            for chunk in reply:
+                body = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created,
+                        "model": model, "choices": [], "usage": None}
+                if chunk.choices:
+                    body["choices"] = [{"index": 0, "delta": {"content": chunk.choices[0].delta.content},
+                                        "finish_reason": None}]
+                if chunk.usage is not None:
+                    body["usage"] = _usage_json(chunk.usage)
+                yield f"data: {json.dumps(body)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return Response(events(), mimetype="text/event-stream")
+
+    return app
+
+
+def create_translate_app(latency=0.0):
+    """Google Cloud Translation v2 at /language/translate/v2; the translation is the text tagged with the target."""
+    app = Flask("translate_stub")
+
+    @app.route("/language/translate/v2", methods=["POST"])
+    def translate():
+        time.sleep(latency)
+        data = request.get_json()
+        texts = data["q"] if isinstance(data["q"], list) else [data["q"]]
+        translations = [{"translatedText": f"[{data.get('target')}] {text}"} for text in texts]
+        return jsonify({"data": {"translations": translations}})
+
+    return app
+
+
+class CountingSmtpHandler:
+    """Accepts every message after latency seconds and counts deliveries."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.messages = 0
+        self.recipients = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        self.messages += 1
+        self.recipients += len(envelope.rcpt_tos)
+        return "250 OK"
+
+
+class StubServices:
+    """
+    Every external service of the API, served locally.
+
+    settings holds per-service options (latencies, paging, 429 ratio, sheet size) and the seed;
+    env() gives the environment variables that point the app at the stubs.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.servers = {}
+        self.smtp = None
+        self.smtp_handler = None
+
+    def start(self):
+        settings = self.settings
+        seed = settings.get("seed", 0)
+        apps = {
+            "places": create_places_app(settings.get("places_latency", 0.05), settings.get("places_pages", 3),
+                                        no_website_ratio=settings.get("no_website_ratio", 0.2), seed=seed),
+            "scraper": create_scraper_app(settings.get("scraper_latency", 0.2),
+                                          settings.get("rate_limited_ratio", 0.1),
+                                          settings.get("retry_after", 1), seed=seed),
+            "apps_script": create_apps_script_app(settings.get("apps_script_latency", 0.3),
+                                                  settings.get("sheet_rows", 60), seed=seed),
+            "openai": create_openai_app(settings.get("llm_latency", 0.5), settings.get("llm_tokens_per_second", 50)),
+            "translate": create_translate_app(settings.get("translate_latency", 0.05))
+        }
+        for name, app in apps.items():
+            self.servers[name] = StubServer(app).start()
+
+        self.smtp_handler = CountingSmtpHandler(settings.get("smtp_latency", 0.01))
+        self.smtp = Controller(self.smtp_handler, hostname="127.0.0.1", port=free_port())
+        self.smtp.start()
+        return self
+
+    def stop(self):
+        for server in self.servers.values():
+            server.stop()
+        if self.smtp is not None:
+            self.smtp.stop()
+
+    def url(self, name):
+        return self.servers[name].url
+
+    def env(self):
+        return {
+            "GOOGLE_API_KEY": "benchmark",
+            "RAPID_API_KEY": "benchmark",
+            "OPENAI_API_KEY": "benchmark",
+            "GOOGLE_PLACES_API_URL": self.url("places"),
+            "RAPIDAPI_SCRAPER_URL": f"{self.url('scraper')}/contacts",
+            "APPS_SCRIPT_SHEET_URL": f"{self.url('apps_script')}/sheet",
+            "APPS_SCRIPT_FORM_URL": f"{self.url('apps_script')}/form",
+            "OPENAI_BASE_URL": f"{self.url('openai')}/v1",
+            "LLM_BACKEND": "openai",
+            "TRANSLATE_API_ENDPOINT": self.url("translate"),
+            "SMTP_HOST": self.smtp.hostname,
+            "SMTP_PORT": str(self.smtp.port),
+            "SMTP_USE_TLS": "false",
+            "MAILGUN_DOMAIN": "example.com",
+            "MAILGUN_PASSWORD": ""
+        }
+
+    def counts(self):
+        """Requests seen by the stubs, to put next to the latency figures."""
+        return {
+            "scraper": dict(self.servers["scraper"].server.app.config["counts"]),
+            "smtp": {"messages": self.smtp_handler.messages, "recipients": self.smtp_handler.recipients}
+        }
@@ -1,12 +1,9 @@
 from flask import Flask
 from flask_cors import CORS
-from openai import OpenAI
 import pandas as pd
 from api_routes.api_blueprint import api_bp
 #Add all libraries to requirements.txt
 
-from Config.config import Config
-
 
 pd.set_option('display.width', None)
 pd.set_option('display.max_rows', None)
@@ -20,9 +17,6 @@ CORS(app)
 
 
 
-client = OpenAI()
-client.api_key = Config.OPENAI_API_KEY
-
 #Move those to separate file bc they are too long and make code hard to read
 # System instructions for the OpenAI agent
 
@@ -1 +1,3 @@
-from utils.utils import fetch_sheet_data, get_businesses, get_place_details, scrape_contact_info_parallel, scrape_contact_info
+from utils.utils import fetch_sheet_data, get_businesses, get_place_details, scrape_contact_info_parallel, scrape_contact_info, iter_businesses, iter_contact_info
+from utils.cache import SqliteCache, TieredCache
+from utils.websites import canonical_website, group_websites
@@ -0,0 +1,217 @@
+import asyncio
+
+import httpx
+
+from Config.config import Config
+from utils.utils import (place_details_cache, business_query_cache, normalize_query, get_cached_contact_info,
+                         cache_contact_info, place_details_from_response, is_unready_page_token,
+                         SEARCH_COMPLETE_STATUSES)
+from utils.rate_limiter import rapidapi_limiter, parse_retry_after
+from utils.websites import canonical_website
+
+# The caches are SQLite files that may wait on another process's write lock (busy timeout), so every
+# cache read and write runs on a worker thread via asyncio.to_thread instead of stalling the event loop.
+
+
+async def fetch_place_details(client, place_id, semaphore):
+    """Async counterpart of utils.get_place_details, sharing the same on-disk cache."""
+    cached_details = await asyncio.to_thread(place_details_cache.get, place_id)
+    if cached_details is not None:
+        return cached_details
+
+    params = {
+        'place_id': place_id,
+        'fields': 'name,formatted_address,website',
+        'key': Config.GOOGLE_API_KEY
+    }
+    async with semaphore:
+        try:
+            response = await client.get(f"{Config.GOOGLE_PLACES_API_URL}/details/json", params=params)
+        except httpx.HTTPError as e:
+            print(f"Error fetching place details for {place_id}: {e}")
+            return {}
+
+    if response.status_code != 200:
+        return {}
+
+    try:
+        data = response.json()
+    except ValueError as e:
+        print(f"Error fetching place details for {place_id}: {e}")
+        return {}
+    return await asyncio.to_thread(place_details_from_response, place_id, data)
+
+
+async def iter_businesses_async(client, query, details_semaphore, use_cache=True):
+    """Async generator over the websites of a search query, yielding one page at a time."""
+    cache_key = normalize_query(query)
+    if use_cache:
+        cached_websites = await asyncio.to_thread(business_query_cache.get, cache_key)
+        if cached_websites is not None:
+            yield cached_websites
+            return
+
+    params = {
+        'query': query,
+        'key': Config.GOOGLE_API_KEY,
+        'radius': 5000
+    }
+
+    businesses = []
+    token_retries = 0
+    while True:
+        try:
+            response = await client.get(f"{Config.GOOGLE_PLACES_API_URL}/textsearch/json", params=params)
+        except httpx.HTTPError as e:
+            print(f"Error: Unable to fetch data: {e}")
+            return
+
+        if response.status_code != 200:
+            print(f"Error: Unable to fetch data. HTTP Status Code: {response.status_code}")
+            return
+
+        data = response.json()
+        status = data.get('status')
+        if is_unready_page_token(status, params, token_retries):
+            token_retries += 1
+            await asyncio.sleep(Config.PLACES_NEXT_PAGE_DELAY)
+            continue
+        if status not in SEARCH_COMPLETE_STATUSES:
+            print(f"Error: Unable to fetch data. Places status: {status} {data.get('error_message', '')}".rstrip())
+            return
+
+        details = await asyncio.gather(*(
+            fetch_place_details(client, place.get('place_id'), details_semaphore)
+            for place in data.get('results', [])
+        ))
+        page_websites = [place_details.get('website', 'N/A') for place_details in details]
+        businesses.extend(page_websites)
+        yield page_websites
+
+        next_page_token = data.get('next_page_token')
+        if not next_page_token:
+            break
+        await asyncio.sleep(Config.PLACES_NEXT_PAGE_DELAY)  # Wait for the next page to be available
+        params['pagetoken'] = next_page_token
+        token_retries = 0
+
+    if use_cache:
+        await asyncio.to_thread(business_query_cache.set, cache_key, businesses, Config.BUSINESS_QUERY_CACHE_TTL)
+
+
+async def scrape_contact_info_async(client, website_url, semaphore):
+    """Async counterpart of utils.scrape_contact_info, sharing the same per-domain contact cache."""
+    found, contact_info = await asyncio.to_thread(get_cached_contact_info, website_url)
+    if found:
+        return contact_info
+
+    headers = {
+        "x-rapidapi-key": Config.RAPID_API_KEY or "",  # httpx rejects None header values
+        "x-rapidapi-host": "website-social-scraper-api.p.rapidapi.com"
+    }
+
+    for attempt in range(Config.SCRAPER_MAX_RETRIES + 1):
+        async with semaphore:
+            await asyncio.sleep(rapidapi_limiter.reserve())
+            try:
+                response = await client.get(Config.RAPIDAPI_SCRAPER_URL, headers=headers, params={"website": website_url})
+            except httpx.HTTPError as e:
+                print(f"Error scraping {website_url}: {e}")
+                return None
+
+        if response.status_code == 200:
+            rapidapi_limiter.on_success()
+            try:
+                contact_info = response.json()
+            except ValueError as e:
+                print(f"Error scraping {website_url}: {e}")
+                return None
+            await asyncio.to_thread(cache_contact_info, website_url, contact_info)
+            return contact_info
+        elif response.status_code == 429:
+            rapidapi_limiter.on_rate_limited(parse_retry_after(response.headers.get('Retry-After')))
+            if attempt < Config.SCRAPER_MAX_RETRIES:
+                # Sleeping outside the semaphore lets other scrapes use the slot meanwhile
+                await asyncio.sleep(rapidapi_limiter.backoff(attempt, Config.SCRAPER_BACKOFF_BASE, Config.SCRAPER_BACKOFF_CAP))
+        else:
+            print(f"Error: Unable to scrape contact info. HTTP Status Code: {response.status_code}")
+            await asyncio.to_thread(cache_contact_info, website_url, None)
+            return None
+
+    return None
+
+
+async def discover_business_contacts(query, scrape_concurrency=None, details_concurrency=None, transport=None,
+                                     on_page=None, on_contact=None):
+    """
+    Search Google Places for a query and scrape contact info for every website found.
+
+    Scraping of each page starts as soon as its details resolve, so it overlaps pagination.
+
+    Args:
+        query (str): Google Places text search query.
+        scrape_concurrency (int): Maximum RapidAPI requests in flight.
+        details_concurrency (int): Maximum place details requests in flight.
+        transport: Optional httpx transport, used to plug in local stand-ins.
+        on_page: Optional callback on each page's websites as it arrives, 'N/A' placeholders included.
+        on_contact: Optional callback on (website, contact_info) for each website entry once its domain is
+            scraped, like the pairs utils.iter_contact_info yields. Callbacks run one at a time on a worker
+            thread, so they may block (e.g. on a job heartbeat) without stalling the event loop.
+
+    Returns:
+        dict: Contact info per website, None where scraping failed.
+    """
+    scrape_concurrency = scrape_concurrency or Config.ASYNC_SCRAPE_CONCURRENCY
+    details_concurrency = details_concurrency or Config.ASYNC_DETAILS_CONCURRENCY
+    scrape_semaphore = asyncio.Semaphore(scrape_concurrency)
+    details_semaphore = asyncio.Semaphore(details_concurrency)
+    report_lock = asyncio.Lock()
+    limits = httpx.Limits(
+        max_connections=scrape_concurrency + details_concurrency,
+        max_keepalive_connections=scrape_concurrency + details_concurrency
+    )
+
+    async def report(callback, *args):
+        if callback is not None:
+            async with report_lock:
+                await asyncio.to_thread(callback, *args)
+
+    async with httpx.AsyncClient(timeout=Config.ASYNC_HTTP_TIMEOUT, limits=limits, transport=transport) as client:
+        scrape_tasks = {}  # canonical domain -> task scraping it
+        domains = {}  # original website -> canonical domain
+        entries = {}  # canonical domain -> original websites waiting for its result
+        results = {}  # canonical domain -> contact info
+
+        async def scrape(domain, website):
+            try:
+                contact_info = await scrape_contact_info_async(client, website, scrape_semaphore)
+            except Exception as e:
+                # Like utils._scrape_result, one site's unexpected error leaves only that site without contact info
+                print(f"Error scraping {domain}: {e}")
+                contact_info = None
+            results[domain] = contact_info
+            for entry in entries.pop(domain):
+                await report(on_contact, entry, contact_info)
+
+        async for page_websites in iter_businesses_async(client, query, details_semaphore):
+            await report(on_page, page_websites)
+            for website in page_websites:
+                domain = canonical_website(website)
+                if domain is None:
+                    continue
+                domains[website] = domain
+                if domain in results:
+                    await report(on_contact, website, results[domain])
+                elif domain in entries:
+                    entries[domain].append(website)
+                else:
+                    entries[domain] = [website]
+                    scrape_tasks[domain] = asyncio.create_task(scrape(domain, website))
+
+        await asyncio.gather(*scrape_tasks.values())
+        return {website: results[domain] for website, domain in domains.items()}
+
+
+def discover_business_contacts_sync(query, **kwargs):
+    """Run discover_business_contacts from synchronous code such as a Flask view."""
+    return asyncio.run(discover_business_contacts(query, **kwargs))
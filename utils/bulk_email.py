@@ -0,0 +1,90 @@
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from email import policy
+from email.utils import parseaddr
+
+# Validates and folds the To header; as_string() templates use \n and smtplib sends them as CRLF
+ENVELOPE_POLICY = policy.SMTP.clone(linesep="\n")
+
+# Server-side rejections of a single message; the connection stays usable after these
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+def unique_recipients(recipients):
+    """Strip and dedupe recipients case-insensitively, keeping the first spelling and order."""
+    seen = set()
+    unique = []
+    for recipient in recipients:
+        recipient = (recipient or '').strip()
+        if recipient.lower() not in seen:
+            seen.add(recipient.lower())
+            unique.append(recipient)
+    return unique
+
+
+def is_valid_address(recipient):
+    """True for one bare address (local@domain); display names, lists and control characters are rejected."""
+    if not isinstance(recipient, str) or any(ord(char) < 32 or char == '\x7f' for char in recipient):
+        return False
+    name, address = parseaddr(recipient)
+    local, _, domain = address.rpartition('@')
+    return not name and address == recipient and bool(local) and '.' in domain and ' ' not in address
+
+
+def render_envelope(template, recipient):
+    """
+    Per-recipient copy of a pre-serialized message: only the To header is added.
+
+    The header is built by the email package, which raises ValueError on CR/LF instead of letting
+    a crafted address inject headers of its own.
+    """
+    name, header = ENVELOPE_POLICY.header_store_parse("To", recipient)
+    return ENVELOPE_POLICY.fold(name, header) + template
+
+
+def _send_chunk(pool, sender, recipients, template, report):
+    remaining = list(recipients)
+    while remaining:
+        try:
+            with pool.connection() as server:
+                while remaining:
+                    recipient = remaining[0]
+                    try:
+                        server.sendmail(sender, recipient, render_envelope(template, recipient))
+                        report[recipient] = {"recipient": recipient, "status": "sent"}
+                    except MESSAGE_ERRORS as e:
+                        report[recipient] = {"recipient": recipient, "status": "failed", "error": str(e)}
+                    remaining.pop(0)
+        except Exception as e:
+            # The connection broke; fail this recipient and carry on with a fresh connection
+            recipient = remaining.pop(0)
+            report[recipient] = {"recipient": recipient, "status": "failed", "error": str(e)}
+
+
+def send_bulk(pool, sender, recipients, message, max_connections):
+    """
+    Send one message to many recipients over several pooled SMTP connections in parallel.
+
+    The message (built without a To header) is serialized once. Recipients are spread across
+    max_connections workers, and one failing recipient never aborts the others.
+
+    Returns:
+        list: {"recipient", "status": "sent" | "failed", "error"} per unique recipient, in input order.
+    """
+    recipients = unique_recipients(recipients)
+    report = {}
+    valid = []
+    for recipient in recipients:
+        if is_valid_address(recipient):
+            valid.append(recipient)
+        else:
+            report[recipient] = {"recipient": recipient, "status": "failed", "error": "Invalid email address"}
+
+    if valid:
+        template = message.as_string()
+        workers = max(1, min(max_connections, len(valid)))
+        chunks = [valid[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda chunk: _send_chunk(pool, sender, chunk, template, report), chunks))
+
+    return [report[recipient] for recipient in recipients]
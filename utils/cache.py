@@ -0,0 +1,194 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from Config.config import Config
+from utils.sqlite_store import thread_connection
+
+
+class SqliteCache:
+    """
+    JSON key/value cache stored in a SQLite file so every Flask worker on the box shares it.
+
+    Entries expire after their own TTL. When the table grows past max_entries the entries
+    closest to expiry are evicted first.
+    """
+
+    def __init__(self, table, max_entries=None, path=None):
+        self.table = table
+        self.max_entries = max_entries
+        self._path = path
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def path(self):
+        return self._path or Config.CACHE_PATH
+
+    def _connect(self):
+        """Return a connection for the current thread, process and cache file."""
+        return thread_connection(self._local, self.path, (
+            f"CREATE TABLE IF NOT EXISTS {self.table} "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)",
+            f"CREATE INDEX IF NOT EXISTS {self.table}_expires_at ON {self.table} (expires_at)"
+        ), timeout=10)
+
+    def get(self, key):
+        """Return the cached value for key, or None if it is missing or expired."""
+        try:
+            row = self._connect().execute(
+                f"SELECT value FROM {self.table} WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Cache read failed for {self.table}: {e}")
+            row = None
+
+        with self._stats_lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        """Store a JSON-serializable value for ttl seconds. A ttl of 0 or less stores nothing."""
+        if ttl <= 0:
+            return
+
+        now = time.time()
+        try:
+            connection = self._connect()
+            connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + ttl)
+            )
+            if self.max_entries:
+                self._evict(connection, now)
+        except sqlite3.Error as e:
+            print(f"Cache write failed for {self.table}: {e}")
+
+    def _evict(self, connection, now):
+        connection.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+        connection.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY expires_at ASC "
+            f"LIMIT max(0, (SELECT COUNT(*) FROM {self.table}) - ?))",
+            (self.max_entries,)
+        )
+
+    def delete(self, key):
+        try:
+            self._connect().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"Cache delete failed for {self.table}: {e}")
+
+    def clear(self):
+        try:
+            self._connect().execute(f"DELETE FROM {self.table}")
+        except sqlite3.Error as e:
+            print(f"Cache clear failed for {self.table}: {e}")
+
+    def __len__(self):
+        try:
+            return self._connect().execute(
+                f"SELECT COUNT(*) FROM {self.table} WHERE expires_at > ?", (time.time(),)
+            ).fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def stats(self):
+        """Hit/miss counters of this process plus the number of live entries in the shared file."""
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self)
+        }
+
+
+class TieredCache:
+    """
+    In-process LRU cache in front of an optional SqliteCache.
+
+    The memory tier keeps up to max_entries values for ttl seconds and evicts the least recently used
+    entry first. With persist, values are also written to a SQLite table that survives restarts and is
+    shared by every worker on the box; a value found only there is copied back into memory.
+    """
+
+    def __init__(self, table, max_entries, ttl, persist=False, disk_max_entries=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk = SqliteCache(table, max_entries=disk_max_entries) if persist else None
+        self._entries = OrderedDict()  # key -> (value, expires_at), least recently used first
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached value for key, or None if neither tier has a live entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._entries[key]
+
+        value = self.disk.get(key) if self.disk is not None else None
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+        self._remember(key, value)
+        return value
+
+    def set(self, key, value):
+        """Store a value in memory and, when persisting, as JSON on disk."""
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        self._remember(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value, self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        """Hit/miss counters per tier and the number of entries held in this process (and on disk)."""
+        with self._lock:
+            memory_hits, disk_hits, misses = self.memory_hits, self.disk_hits, self.misses
+            entries = len(self._entries)
+        lookups = memory_hits + disk_hits + misses
+        stats = {
+            "memory_hits": memory_hits,
+            "disk_hits": disk_hits,
+            "misses": misses,
+            "hit_rate": (memory_hits + disk_hits) / lookups if lookups else 0.0,
+            "entries": entries
+        }
+        if self.disk is not None:
+            stats["disk_entries"] = len(self.disk)
+        return stats
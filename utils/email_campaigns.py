@@ -0,0 +1,182 @@
+import smtplib
+import threading
+import time
+import uuid
+
+from Config.config import Config
+from utils.bulk_email import MESSAGE_ERRORS, is_valid_address, render_envelope, unique_recipients
+from utils.rate_limiter import AdaptiveRateLimiter
+from utils.sqlite_store import thread_connection
+
+
+class EmailCampaignStore:
+    """
+    Per-recipient delivery state of email campaigns, kept next to the job queue in SQLite.
+
+    A recipient appears once per campaign however often it is added, so duplicates are
+    suppressed across every batch of recipients added to the campaign.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+        self._local = threading.local()
+
+    @property
+    def path(self):
+        return self._path or Config.JOB_QUEUE_PATH
+
+    def _connect(self):
+        return thread_connection(self._local, self.path, (
+            "CREATE TABLE IF NOT EXISTS email_campaigns ("
+            "id TEXT PRIMARY KEY, form_url TEXT NOT NULL, sender TEXT NOT NULL, created_at REAL NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS email_campaign_recipients ("
+            "campaign_id TEXT NOT NULL, recipient TEXT NOT NULL, address TEXT NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, next_attempt_at REAL NOT NULL, error TEXT, "
+            "PRIMARY KEY (campaign_id, recipient))",
+            "CREATE INDEX IF NOT EXISTS email_campaign_recipients_due "
+            "ON email_campaign_recipients (campaign_id, status, next_attempt_at)"
+        ))
+
+    def create(self, form_url, sender):
+        campaign_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO email_campaigns (id, form_url, sender, created_at) VALUES (?, ?, ?, ?)",
+            (campaign_id, form_url, sender, time.time())
+        )
+        return campaign_id
+
+    def get(self, campaign_id):
+        row = self._connect().execute("SELECT * FROM email_campaigns WHERE id = ?", (campaign_id,)).fetchone()
+        return dict(row) if row else None
+
+    def add_recipients(self, campaign_id, recipients):
+        """Queue recipients, ignoring ones already in the campaign. Returns how many were new."""
+        connection = self._connect()
+        now = time.time()
+        before = connection.total_changes
+        connection.executemany(
+            "INSERT OR IGNORE INTO email_campaign_recipients "
+            "(campaign_id, recipient, address, status, next_attempt_at) VALUES (?, ?, ?, 'pending', ?)",
+            [(campaign_id, recipient.lower(), recipient, now) for recipient in unique_recipients(recipients)]
+        )
+        return connection.total_changes - before
+
+    def due(self, campaign_id, limit):
+        """Pending recipients whose next attempt is due, oldest first."""
+        rows = self._connect().execute(
+            "SELECT address, attempts FROM email_campaign_recipients "
+            "WHERE campaign_id = ? AND status = 'pending' AND next_attempt_at <= ? "
+            "ORDER BY next_attempt_at LIMIT ?",
+            (campaign_id, time.time(), limit)
+        ).fetchall()
+        return [(row['address'], row['attempts']) for row in rows]
+
+    def next_attempt_at(self, campaign_id):
+        row = self._connect().execute(
+            "SELECT MIN(next_attempt_at) FROM email_campaign_recipients WHERE campaign_id = ? AND status = 'pending'",
+            (campaign_id,)
+        ).fetchone()
+        return row[0]
+
+    def mark(self, campaign_id, address, status, error=None, retry_at=None):
+        """Record an attempt; status 'pending' with retry_at schedules another try."""
+        self._connect().execute(
+            "UPDATE email_campaign_recipients SET status = ?, error = ?, attempts = attempts + 1, "
+            "next_attempt_at = COALESCE(?, next_attempt_at) WHERE campaign_id = ? AND recipient = ?",
+            (status, error, retry_at, campaign_id, address.lower())
+        )
+
+    def progress(self, campaign_id):
+        rows = self._connect().execute(
+            "SELECT status, COUNT(*) FROM email_campaign_recipients WHERE campaign_id = ? GROUP BY status",
+            (campaign_id,)
+        ).fetchall()
+        counts = {"sent": 0, "failed": 0, "pending": 0}
+        counts.update({row[0]: row[1] for row in rows})
+        counts["total"] = counts["sent"] + counts["failed"] + counts["pending"]
+        return counts
+
+    def failures(self, campaign_id):
+        rows = self._connect().execute(
+            "SELECT address, error FROM email_campaign_recipients WHERE campaign_id = ? AND status = 'failed'",
+            (campaign_id,)
+        ).fetchall()
+        return [{"recipient": row['address'], "error": row['error']} for row in rows]
+
+
+def is_transient(error):
+    """4xx replies, dropped connections and timeouts are worth retrying; 5xx replies are not."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, OSError))
+
+
+class CampaignSender:
+    """
+    Sends a campaign's pending recipients at no more than rate_limit messages per second.
+
+    Transient failures are retried with exponential backoff up to max_attempts.
+    """
+
+    def __init__(self, store, pool, rate_limit, max_attempts, retry_backoff, batch_size=50):
+        self.store = store
+        self.pool = pool
+        self.limiter = AdaptiveRateLimiter(rate=rate_limit, burst=1, min_rate=rate_limit, max_rate=rate_limit)
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.batch_size = batch_size
+
+    def _record_failure(self, campaign_id, address, attempts, error):
+        attempts += 1
+        if is_transient(error) and attempts < self.max_attempts:
+            retry_at = time.time() + self.retry_backoff * 2 ** (attempts - 1)
+            self.store.mark(campaign_id, address, "pending", error=str(error), retry_at=retry_at)
+        else:
+            self.store.mark(campaign_id, address, "failed", error=str(error))
+
+    def _send_batch(self, campaign_id, sender, template, batch):
+        remaining = list(batch)
+        while remaining:
+            try:
+                with self.pool.connection() as server:
+                    while remaining:
+                        address, attempts = remaining[0]
+                        if not is_valid_address(address):
+                            self.store.mark(campaign_id, address, "failed", error="Invalid email address")
+                            remaining.pop(0)
+                            continue
+                        self.limiter.acquire()
+                        try:
+                            server.sendmail(sender, address, render_envelope(template, address))
+                            self.store.mark(campaign_id, address, "sent")
+                        except MESSAGE_ERRORS as e:
+                            self._record_failure(campaign_id, address, attempts, e)
+                        remaining.pop(0)
+            except Exception as e:
+                address, attempts = remaining.pop(0)
+                self._record_failure(campaign_id, address, attempts, e)
+
+    def run(self, campaign_id, message, job=None):
+        """Send until no recipient is pending; returns the final counts."""
+        campaign = self.store.get(campaign_id)
+        template = message.as_string()
+
+        while True:
+            batch = self.store.due(campaign_id, self.batch_size)
+            if batch:
+                self._send_batch(campaign_id, campaign['sender'], template, batch)
+            else:
+                next_attempt_at = self.store.next_attempt_at(campaign_id)
+                if next_attempt_at is None:
+                    break
+                time.sleep(min(max(0.0, next_attempt_at - time.time()), 5))
+
+            if job is not None:
+                job.update(**self.store.progress(campaign_id))
+
+        return self.store.progress(campaign_id)
+
+
+campaign_store = EmailCampaignStore()
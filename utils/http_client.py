@@ -0,0 +1,68 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from Config.config import Config
+
+
+class PooledHttpClient:
+    """
+    Keep-alive HTTP client for every outbound call (Places, RapidAPI, Apps Script).
+
+    All threads share one HTTPAdapter, so connections are pooled per host across the whole
+    process. Each thread gets its own Session on top of it, which keeps cookie and header
+    state from being mutated concurrently. Requests get a default (connect, read) timeout
+    unless the caller passes one.
+    """
+
+    def __init__(self, pool_connections, pool_maxsize, timeout):
+        self.timeout = timeout
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            self._local.session = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def pool_stats(self):
+        """Connection counts per host pool, for tuning HTTP_POOL_MAXSIZE."""
+        stats = {}
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            idle = sum(1 for connection in list(pool.pool.queue) if connection is not None) if pool.pool else 0
+            stats[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle_connections": idle,
+                "max_size": pool.pool.maxsize if pool.pool else 0
+            }
+        return stats
+
+
+http_client = PooledHttpClient(
+    pool_connections=Config.HTTP_POOL_CONNECTIONS,
+    pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+    timeout=(Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+)
+
+
+def get(url, **kwargs):
+    return http_client.request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return http_client.request('POST', url, **kwargs)
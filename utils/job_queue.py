@@ -0,0 +1,266 @@
+import importlib
+import json
+import multiprocessing
+import threading
+import time
+import uuid
+
+from Config.config import Config
+from utils.metrics import endpoint_scope
+from utils.sqlite_store import thread_connection
+
+
+class SqliteJobQueue:
+    """
+    Durable job queue in a SQLite file, for a single box without an external broker.
+
+    A claimed job stays invisible to other workers for visibility_timeout seconds, extended by
+    heartbeats while it runs. If its worker dies the job becomes visible again and is retried, up to
+    max_attempts. Failed attempts are retried with exponential backoff. Each claim is identified by
+    its attempt number, and heartbeat, complete and fail only act for the current claim, so a run
+    that lost its claim cannot overwrite the outcome. Results and errors stay in the table for polling.
+    """
+
+    def __init__(self, path=None, visibility_timeout=None, max_attempts=None, retry_backoff=None):
+        self._path = path
+        self.visibility_timeout = visibility_timeout or Config.JOB_QUEUE_VISIBILITY_TIMEOUT
+        self.max_attempts = max_attempts or Config.JOB_QUEUE_MAX_ATTEMPTS
+        self.retry_backoff = Config.JOB_QUEUE_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+        self._local = threading.local()
+
+    @property
+    def path(self):
+        return self._path or Config.JOB_QUEUE_PATH
+
+    def _connect(self):
+        return thread_connection(self._local, self.path, (
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, task TEXT NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, visible_at REAL NOT NULL, "
+            "progress TEXT, result TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, visible_at)"
+        ))
+
+    def enqueue(self, task, payload, max_attempts=None):
+        """Add a job and return its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO jobs (id, task, payload, status, max_attempts, visible_at, created_at, updated_at) "
+            "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, task, json.dumps(payload), max_attempts or self.max_attempts, now, now, now)
+        )
+        return job_id
+
+    def claim(self):
+        """Take the oldest visible job for this worker, or return None when there is nothing to do."""
+        connection = self._connect()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Jobs whose worker vanished after using up every attempt are not handed out again
+            connection.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Visibility timeout expired', updated_at = ? "
+                "WHERE status = 'running' AND visible_at <= ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = connection.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') AND visible_at <= ? "
+                "ORDER BY created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+
+            connection.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, visible_at = ?, updated_at = ? "
+                "WHERE id = ?",
+                (now + self.visibility_timeout, now, row['id'])
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        return self.get(row['id'])
+
+    def heartbeat(self, job_id, attempt, progress=None, result=None):
+        """
+        Extend the job's visibility and store progress and partial results.
+
+        attempt is the attempts count the job was claimed with. Returns False when that claim is no longer
+        the current one (the job timed out and was claimed again, or already finished).
+        """
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE jobs SET visible_at = ?, updated_at = ?, progress = COALESCE(?, progress), "
+            "result = COALESCE(?, result) WHERE id = ? AND status = 'running' AND attempts = ?",
+            (now + self.visibility_timeout, now,
+             None if progress is None else json.dumps(progress),
+             None if result is None else json.dumps(result),
+             job_id, attempt)
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id, attempt, result):
+        """Store the result of the claim made with attempt; returns False if that claim was superseded."""
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, updated_at = ? "
+            "WHERE id = ? AND status = 'running' AND attempts = ?",
+            (json.dumps(result), time.time(), job_id, attempt)
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id, attempt, error, retry=True):
+        """
+        Record a failed attempt; the job is retried after a backoff while attempts remain.
+
+        Only the current claim (attempt) can fail the job; returns False if that claim was superseded.
+        """
+        now = time.time()
+        job = self.get(job_id)
+        if job is None or job['status'] != 'running' or job['attempts'] != attempt:
+            return False
+
+        if retry and attempt < job['maxAttempts']:
+            delay = self.retry_backoff * 2 ** (attempt - 1)
+            status, visible_at = 'queued', now + delay
+        else:
+            status, visible_at = 'failed', job['visibleAt']
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, error = ?, visible_at = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'running' AND attempts = ?",
+            (status, error, visible_at, now, job_id, attempt)
+        )
+        return cursor.rowcount > 0
+
+    def get(self, job_id):
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "jobId": row['id'],
+            "task": row['task'],
+            "payload": json.loads(row['payload']),
+            "status": row['status'],
+            "attempts": row['attempts'],
+            "maxAttempts": row['max_attempts'],
+            "visibleAt": row['visible_at'],
+            "progress": json.loads(row['progress']) if row['progress'] else {},
+            "result": json.loads(row['result']) if row['result'] else None,
+            "error": row['error'],
+            "createdAt": row['created_at'],
+            "updatedAt": row['updated_at']
+        }
+
+    def purge(self, older_than):
+        """Delete finished jobs last updated more than older_than seconds ago."""
+        self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+            (time.time() - older_than,)
+        )
+
+
+class QueuedJob:
+    """Progress reporter handed to tasks: update() stores progress counters and, optionally, the partial result."""
+
+    def __init__(self, queue, job):
+        self.queue = queue
+        self.id = job['jobId']
+        self.attempt = job['attempts']
+        self.progress = dict(job['progress'])
+
+    def update(self, result=None, **progress):
+        self.progress.update(progress)
+        self.queue.heartbeat(self.id, self.attempt, progress=self.progress, result=result)
+
+
+def is_retryable(handler):
+    """Tasks that must not run twice (e.g. ones sending email) set handler.retryable = False."""
+    return getattr(handler, "retryable", True)
+
+
+def payload_error(handler, payload):
+    """Tasks that check their payload before it is queued set handler.validate(payload) -> error message or None."""
+    validate = getattr(handler, "validate", None)
+    return validate(payload) if validate is not None else None
+
+
+def _keep_alive(queue, job, stop_event):
+    # Tasks may run longer than the visibility timeout without reporting progress
+    while not stop_event.wait(queue.visibility_timeout / 3):
+        if not queue.heartbeat(job['jobId'], job['attempts']):
+            return
+
+
+def run_job(queue, tasks, job):
+    """Run one claimed job, heartbeating while it runs, and record its outcome."""
+    handler = tasks.get(job['task'])
+    if handler is None:
+        queue.fail(job['jobId'], job['attempts'], f"Unknown task {job['task']}", retry=False)
+        return
+
+    stop_event = threading.Event()
+    heartbeat = threading.Thread(target=_keep_alive, args=(queue, job, stop_event), daemon=True)
+    heartbeat.start()
+    try:
+        with endpoint_scope(f"job:{job['task']}"):
+            result = handler(QueuedJob(queue, job), job['payload'])
+    except Exception as e:
+        print(f"Job {job['task']} {job['jobId']} failed: {e}")
+        recorded = queue.fail(job['jobId'], job['attempts'], str(e), retry=is_retryable(handler))
+    else:
+        recorded = queue.complete(job['jobId'], job['attempts'], result)
+    finally:
+        stop_event.set()
+        heartbeat.join()
+
+    if not recorded:
+        print(f"Job {job['task']} {job['jobId']} attempt {job['attempts']} lost its claim; outcome discarded")
+
+
+def run_worker(tasks, queue=None, poll_interval=None, stop_event=None):
+    """Claim and run jobs until stop_event is set."""
+    queue = queue or SqliteJobQueue()
+    poll_interval = poll_interval or Config.JOB_QUEUE_POLL_INTERVAL
+    last_purge = 0.0
+
+    while stop_event is None or not stop_event.is_set():
+        if time.time() - last_purge > 3600:
+            queue.purge(Config.JOB_RESULT_TTL)
+            last_purge = time.time()
+
+        job = queue.claim()
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        run_job(queue, tasks, job)
+
+
+def start_worker_pool(tasks_module, processes, path=None):
+    """
+    Start worker processes that import tasks_module and run its TASKS.
+
+    Each process imports the module by name itself, so task code never has to be pickled. Each also sees
+    Config.JOB_QUEUE_WORKER_PROCESSES set to processes, so tasks that split a shared limit (such as the
+    email rate) between workers divide by the number actually running.
+    """
+    context = multiprocessing.get_context("spawn")
+    stop_event = context.Event()
+    workers = [
+        context.Process(target=_worker_main, args=(tasks_module, path, stop_event, processes), daemon=True)
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    return workers, stop_event
+
+
+def _worker_main(tasks_module, path, stop_event, processes):
+    Config.JOB_QUEUE_WORKER_PROCESSES = processes
+    tasks = importlib.import_module(tasks_module).TASKS
+    run_worker(tasks, queue=SqliteJobQueue(path=path), stop_event=stop_event)
+
+
+job_queue = SqliteJobQueue()
@@ -0,0 +1,150 @@
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from openai import OpenAI
+
+from Config.config import Config
+from ModelInstructions.model_instructions import Instructions
+from utils.survey_data import estimate_tokens
+
+DEFAULT_FORM = {
+    "formTitle": "Market Validation Survey",
+    "questions": [
+        {"text": "What is the name of your business?", "type": "text", "required": True},
+        {
+            "text": "Which of the following features do you consider most important? (Select one)",
+            "type": "multiple-choice",
+            "options": ["Quality", "Price", "Brand Reputation", "Sustainability"],
+            "required": True
+        },
+        {
+            "text": "Which features would you like to see in future products? (Select all that apply)",
+            "type": "checkbox",
+            "options": ["Eco-Friendly Materials", "Custom Designs", "Fast Delivery", "Subscription Options"],
+            "required": False
+        },
+        {
+            "text": "On a scale of 1 to 10, how likely are you to recommend our product to a friend?",
+            "type": "linear-scale",
+            "required": True
+        },
+        {"text": "Please describe your experience with similar products.", "type": "paragraph", "required": False}
+    ],
+    "googlePlacesQuery": "B2B marketing agencies near San Francisco"
+}
+
+DEFAULT_ANALYSIS = (
+    "Overall Sentiment: Mixed, leaning positive.\n"
+    "Key Observations: Respondents value quality and fast delivery; price is the most common concern.\n"
+    "Recommendations: Offer volume discounts and publish delivery times up front."
+)
+
+# Whitespace-led words, the way streamed completions arrive
+_TOKEN = re.compile(r"\s*\S+")
+
+
+class FakeStream:
+    """Iterable of completion chunks with the close() of openai.Stream; closing stops the stream."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._closed = threading.Event()
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if self._closed.is_set():
+                return
+            yield chunk
+
+    def close(self):
+        self._closed.set()
+
+
+class FakeCompletions:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def create(self, model, messages, max_tokens=None, stream=False, stream_options=None, **kwargs):
+        return self.backend.complete(model, messages, max_tokens, stream,
+                                     include_usage=bool(stream_options and stream_options.get("include_usage")))
+
+
+class FakeLlmClient:
+    """
+    Local stand-in for the OpenAI client, for load tests that must not spend quota.
+
+    Replies come after latency seconds and then at tokens_per_second, streamed or not. Form design
+    requests get the canned formTitle/questions/googlePlacesQuery JSON, everything else a canned analysis.
+    """
+
+    def __init__(self, latency=0.0, tokens_per_second=0, form=None, analysis=None):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.form = form or DEFAULT_FORM
+        self.analysis = analysis or DEFAULT_ANALYSIS
+        self.chat = SimpleNamespace(completions=FakeCompletions(self))
+
+    def reply_for(self, messages):
+        system = next((message["content"] for message in messages if message["role"] == "system"), "")
+        if system == Instructions.SYSTEM_INSTRUCTIONS_FORM:
+            return json.dumps(self.form, ensure_ascii=False, indent=2)
+        return self.analysis
+
+    def _pace(self, tokens):
+        if self.tokens_per_second > 0:
+            time.sleep(tokens / self.tokens_per_second)
+
+    def complete(self, model, messages, max_tokens, stream, include_usage=False):
+        tokens = _TOKEN.findall(self.reply_for(messages))
+        if max_tokens:
+            tokens = tokens[:max_tokens]
+        usage = SimpleNamespace(
+            prompt_tokens=sum(estimate_tokens(message["content"]) for message in messages),
+            completion_tokens=len(tokens)
+        )
+        usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+
+        if not stream:
+            time.sleep(self.latency)
+            self._pace(len(tokens))
+            message = SimpleNamespace(role="assistant", content="".join(tokens))
+            return SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, message=message)], usage=usage)
+
+        def chunks():
+            time.sleep(self.latency)
+            for token in tokens:
+                self._pace(1)
+                delta = SimpleNamespace(content=token)
+                yield SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, delta=delta)], usage=None)
+            if include_usage:
+                yield SimpleNamespace(model=model, choices=[], usage=usage)
+
+        return FakeStream(chunks())
+
+
+def _load_form(path):
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def create_llm_client(backend=None):
+    """
+    Chat completion client for the configured LLM_BACKEND: "openai" (the default) or "fake".
+
+    The OpenAI client honours OPENAI_BASE_URL, so it can also be pointed at a local fake server.
+    """
+    backend = backend or Config.LLM_BACKEND
+    if backend == "openai":
+        return OpenAI(api_key=Config.OPENAI_API_KEY)
+    if backend == "fake":
+        return FakeLlmClient(
+            latency=Config.FAKE_LLM_LATENCY,
+            tokens_per_second=Config.FAKE_LLM_TOKENS_PER_SECOND,
+            form=_load_form(Config.FAKE_LLM_FORM_PATH)
+        )
+    raise ValueError(f"Unknown LLM backend {backend}")
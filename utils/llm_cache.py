@@ -0,0 +1,31 @@
+import hashlib
+import json
+import unicodedata
+
+from Config.config import Config
+from utils.cache import TieredCache
+
+
+def normalize_prompt(text):
+    """Collapse whitespace and Unicode variants so retried or re-pasted inputs share one cache entry."""
+    return unicodedata.normalize("NFC", " ".join(str(text).split()))
+
+
+def completion_key(model, instructions, content, max_tokens):
+    """
+    Content address of a chat completion.
+
+    The system instructions are hashed verbatim, so editing them in ModelInstructions
+    makes every entry built from the old text unreachable.
+    """
+    payload = json.dumps([model, instructions, normalize_prompt(content), max_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+llm_response_cache = TieredCache(
+    "llm_responses",
+    max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+    ttl=Config.LLM_CACHE_TTL,
+    persist=Config.LLM_CACHE_PERSIST,
+    disk_max_entries=Config.LLM_CACHE_DISK_MAX_ENTRIES
+)
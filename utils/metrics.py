@@ -0,0 +1,155 @@
+import contextvars
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+from flask import has_request_context, request
+
+from Config.config import Config
+
+# USD per 1K prompt and completion tokens
+MODEL_PRICES = {
+    "gpt-4": (0.03, 0.06),
+}
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+_endpoint = contextvars.ContextVar("metrics_endpoint", default=None)
+
+
+def current_endpoint():
+    """Name the current work is attributed to: an explicit endpoint_scope, the Flask endpoint, or "background"."""
+    name = _endpoint.get()
+    if name is None and has_request_context():
+        name = request.endpoint
+    return name or "background"
+
+
+@contextmanager
+def endpoint_scope(name):
+    """Attribute everything recorded inside the block to name, e.g. in a worker thread or job."""
+    token = _endpoint.set(name)
+    try:
+        yield
+    finally:
+        _endpoint.reset(token)
+
+
+def usage_counts(usage):
+    """Token counts from an OpenAI usage object, skipping fields that are missing or not numbers."""
+    counts = {}
+    for field in USAGE_FIELDS:
+        value = getattr(usage, field, None)
+        if isinstance(value, int):
+            counts[field] = value
+    return counts
+
+
+class CallMetrics:
+    """
+    Latency, token usage, cost and errors of slow calls, per endpoint and kind of call.
+
+    Latency percentiles cover the last window calls of each (endpoint, kind); counters cover the process lifetime.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _new_series(self):
+        return {
+            "latencies": deque(maxlen=self.window),
+            "calls": 0,
+            "errors": 0,
+            "cancelled": 0,
+            "last_error": None,
+            "totals": defaultdict(float),
+            "models": Counter()
+        }
+
+    def record(self, kind, seconds, endpoint=None, model=None, error=None, cancelled=False, **values):
+        """Record one call; values are numeric fields (tokens, prompt_chars, rows) summed per series."""
+        key = (endpoint or current_endpoint(), kind)
+        cost = None
+        if model in MODEL_PRICES and "prompt_tokens" in values:
+            prompt_price, completion_price = MODEL_PRICES[model]
+            cost = (values["prompt_tokens"] * prompt_price + values.get("completion_tokens", 0) * completion_price) / 1000
+
+        with self._lock:
+            series = self._series.setdefault(key, self._new_series())
+            series["latencies"].append(seconds)
+            series["calls"] += 1
+            if error is not None:
+                series["errors"] += 1
+                series["last_error"] = str(error)
+            if cancelled:
+                series["cancelled"] += 1
+            if model:
+                series["models"][model] += 1
+            for field, value in values.items():
+                series["totals"][field] += value
+            if cost is not None:
+                series["totals"]["cost_usd"] += cost
+
+    @contextmanager
+    def timed(self, kind, **fields):
+        """
+        Time the block and record it under kind.
+
+        The block may add fields to the yielded dict (usage counts, rows, an "error" it handled itself).
+        Exceptions are recorded as errors and re-raised; a generator closed early counts as cancelled.
+        """
+        sample = dict(fields)
+        start = time.perf_counter()
+        try:
+            yield sample
+        except GeneratorExit:
+            sample["cancelled"] = True
+            raise
+        except Exception as e:
+            sample["error"] = e
+            raise
+        finally:
+            self.record(kind, time.perf_counter() - start, **sample)
+
+    def summary(self):
+        """{endpoint: {kind: stats}} with latency percentiles in milliseconds and per-call averages."""
+        with self._lock:
+            snapshot = [(key, dict(series, latencies=list(series["latencies"]), totals=dict(series["totals"]),
+                                   models=dict(series["models"])))
+                        for key, series in self._series.items()]
+
+        report = defaultdict(dict)
+        for (endpoint, kind), series in snapshot:
+            latencies = np.array(series["latencies"]) * 1000
+            p50, p90, p95, p99 = np.percentile(latencies, [50, 90, 95, 99])
+            stats = {
+                "calls": series["calls"],
+                "errors": series["errors"],
+                "cancelled": series["cancelled"],
+                "last_error": series["last_error"],
+                "latency_ms": {
+                    "mean": round(float(latencies.mean()), 1),
+                    "p50": round(float(p50), 1),
+                    "p90": round(float(p90), 1),
+                    "p95": round(float(p95), 1),
+                    "p99": round(float(p99), 1),
+                    "max": round(float(latencies.max()), 1)
+                },
+                "totals": {field: round(value, 4) for field, value in series["totals"].items()},
+                "per_call": {field: round(value / series["calls"], 2) for field, value in series["totals"].items()}
+            }
+            if series["models"]:
+                stats["models"] = series["models"]
+            report[endpoint][kind] = stats
+        return dict(report)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+call_metrics = CallMetrics(window=Config.METRICS_WINDOW)
@@ -0,0 +1,100 @@
+import random
+import threading
+import time
+
+from Config.config import Config
+
+
+def parse_retry_after(value):
+    """Return the Retry-After header as seconds, or None when it is missing or not a number of seconds."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Process-wide token bucket shared by every scrape worker (threads and asyncio tasks alike).
+
+    The refill rate follows AIMD: every success nudges it up by increase_step, every 429
+    halves it (at most once per cooldown so one burst of 429s from many workers counts once),
+    and a Retry-After header pauses all callers until it has passed.
+    """
+
+    def __init__(self, rate, burst, min_rate, max_rate, increase_step=0.1, decrease_factor=0.5, cooldown=1.0):
+        self._lock = threading.Lock()
+        self.reset(rate, burst, min_rate, max_rate, increase_step, decrease_factor, cooldown)
+
+    def reset(self, rate, burst, min_rate, max_rate, increase_step=0.1, decrease_factor=0.5, cooldown=1.0):
+        with self._lock:
+            self.rate = rate
+            self.burst = burst
+            self.min_rate = min_rate
+            self.max_rate = max_rate
+            self.increase_step = increase_step
+            self.decrease_factor = decrease_factor
+            self.cooldown = cooldown
+            self._tokens = float(burst)
+            self._updated_at = time.monotonic()
+            self._paused_until = 0.0
+            self._last_decrease = 0.0
+            self.rate_limited_count = 0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self):
+        """Take a token and return how many seconds the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            token_wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(token_wait, self._paused_until - now)
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent. Async callers sleep on reserve() instead."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_rate_limited(self, retry_after=None):
+        with self._lock:
+            now = time.monotonic()
+            self.rate_limited_count += 1
+            if now - self._last_decrease >= self.cooldown:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self._last_decrease = now
+                self._refill(now)
+                self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+    @staticmethod
+    def backoff(attempt, base, cap):
+        """Exponential backoff with jitter for the given retry attempt (0-based)."""
+        delay = min(cap, base * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "tokens": self._tokens,
+                "paused_for": max(0.0, self._paused_until - time.monotonic()),
+                "rate_limited_count": self.rate_limited_count
+            }
+
+
+rapidapi_limiter = AdaptiveRateLimiter(
+    rate=Config.RAPIDAPI_RATE_LIMIT,
+    burst=Config.RAPIDAPI_BURST,
+    min_rate=Config.RAPIDAPI_MIN_RATE,
+    max_rate=Config.RAPIDAPI_MAX_RATE
+)
@@ -0,0 +1,143 @@
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+from Config.config import Config
+
+
+class SmtpConnectionPool:
+    """
+    Bounded pool of authenticated SMTP connections, so sends skip the connect/STARTTLS/login handshake.
+
+    At most max_size connections exist at once; callers beyond that wait for one to be released.
+    A connection that sat idle longer than health_check_after is checked with NOOP before reuse,
+    and connections idle longer than max_idle are closed instead of reused. A connection that
+    raises while in use is discarded rather than returned to the pool.
+    """
+
+    def __init__(self, host, port, username=None, password=None, max_size=4, use_tls=True,
+                 timeout=30, health_check_after=10, max_idle=240):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_size = max_size
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.max_idle = max_idle
+        self._idle = []  # (connection, released_at), most recently released last
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _open(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()  # Upgrade to secure connection
+            if self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        with self._lock:
+            self.opened += 1
+        return server
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_healthy(server):
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _take_idle(self):
+        """Pop the most recently used idle connection that is still alive, closing stale ones."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                server, released_at = self._idle.pop()
+
+            idle_for = time.monotonic() - released_at
+            if idle_for <= self.max_idle and (idle_for < self.health_check_after or self._is_healthy(server)):
+                with self._lock:
+                    self.reused += 1
+                return server
+
+            with self._lock:
+                self.discarded += 1
+            self._close(server)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a logged-in connection for a batch of sends."""
+        self._slots.acquire()
+        server = None
+        try:
+            server = self._take_idle() or self._open()
+            yield server
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+            # The server rejected this message; the connection itself is still usable
+            raise
+        except Exception:
+            if server is not None:
+                with self._lock:
+                    self.discarded += 1
+                self._close(server)
+                server = None
+            raise
+        finally:
+            if server is not None:
+                with self._lock:
+                    self._idle.append((server, time.monotonic()))
+            self._slots.release()
+
+    def sendmail(self, from_addr, to_addrs, message):
+        """Send one message, reconnecting once if the pooled connection turned out to be dead."""
+        try:
+            with self.connection() as server:
+                return server.sendmail(from_addr, to_addrs, message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            with self.connection() as server:
+                return server.sendmail(from_addr, to_addrs, message)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "opened": self.opened,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "idle": len(self._idle),
+                "max_size": self.max_size
+            }
+
+
+smtp_pool = SmtpConnectionPool(
+    host=Config.SMTP_HOST,
+    port=Config.SMTP_PORT,
+    username=f'info@{Config.MAILGUN_DOMAIN}',
+    password=Config.MAILGUN_PASSWORD,
+    max_size=Config.SMTP_POOL_SIZE,
+    use_tls=Config.SMTP_USE_TLS
+)
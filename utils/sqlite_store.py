@@ -0,0 +1,26 @@
+import os
+import sqlite3
+
+
+def thread_connection(local, path, schema, timeout=30):
+    """
+    Return this thread's SQLite connection to path, opening it on first use.
+
+    Connections are kept per process and thread (SQLite connections must not cross either),
+    run in autocommit WAL mode so several workers can share the file, and execute the given
+    schema statements when opened.
+    """
+    connections = getattr(local, 'connections', None)
+    if connections is None:
+        connections = local.connections = {}
+
+    key = (os.getpid(), path)
+    connection = connections.get(key)
+    if connection is None:
+        connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        for statement in schema:
+            connection.execute(statement)
+        connections[key] = connection
+    return connection
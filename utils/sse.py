@@ -0,0 +1,26 @@
+import json
+
+from flask import Response, stream_with_context
+
+
+def format_sse(data, event=None):
+    """One server-sent event carrying data as JSON, so newlines in model output need no escaping."""
+    message = f"event: {event}\n" if event else ""
+    return f"{message}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events):
+    """
+    Stream an iterable of formatted events to the client.
+
+    A comment line goes out first so headers are flushed before the first slow event, and proxies are
+    asked not to buffer. The request context stays available while streaming. When the client disconnects
+    the WSGI server closes the iterable, which runs the generators' cleanup and cancels any upstream work
+    in progress.
+    """
+    def stream():
+        yield ": stream open\n\n"
+        yield from events
+
+    return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
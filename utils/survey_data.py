@@ -0,0 +1,257 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from Config.config import Config
+
+# Roughly the pre-tokenizer split GPT models use: words, short digit groups, punctuation runs, whitespace runs
+_PRETOKEN = re.compile(r"'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+")
+
+# Google Forms joins the options picked in a checkbox question with ", "
+CHECKBOX_SEPARATOR = ", "
+MAX_CHOICE_OPTIONS = 15
+MAX_OPTION_LENGTH = 100
+
+# NPS bands only mean something for "how likely are you to recommend" asked on a 0-10 (or 1-10) scale
+_RECOMMEND = re.compile(r"\brecommend", re.IGNORECASE)
+_STATED_RANGE = re.compile(r"\b(\d{1,2})\s*(?:-|–|to)\s*(\d{1,2})\b")
+
+
+def estimate_tokens(text):
+    """
+    Approximate the number of model tokens in text without a tokenizer dependency.
+
+    Counts pre-tokenizer pieces and charges long pieces one extra token per 8 characters,
+    which tracks GPT-4's tokenizer closely enough to compare two encodings of the same data.
+    """
+    return sum(1 + max(0, len(piece) - 1) // 8 for piece in _PRETOKEN.findall(text))
+
+
+def _clean_answer(value, max_chars):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    text = " ".join(str(value).split())
+    if len(text) > max_chars:
+        text = text[:max_chars].rstrip() + "…"
+    return text
+
+
+def _prepare(df, max_answer_chars):
+    """
+    Clean answers and label the questions Q1, Q2, ... in column order.
+
+    Returns the answers with the labels as column names, and (label, header) pairs for the legend.
+    Empty rows, empty columns and columns repeating an earlier column under the same header are dropped.
+    """
+    answers = df.apply(lambda column: column.map(lambda value: _clean_answer(value, max_answer_chars)))
+    answers = answers.loc[(answers != "").any(axis=1), (answers != "").any(axis=0)]
+
+    questions = []
+    kept = []
+    for position in range(answers.shape[1]):
+        header = " ".join(str(answers.columns[position]).split())
+        column = answers.iloc[:, position]
+        if any(header == kept_header and column.equals(answers.iloc[:, other])
+               for other, (_, kept_header) in zip(kept, questions)):
+            continue
+        questions.append((f"Q{len(questions) + 1}", header))
+        kept.append(position)
+
+    answers = answers.iloc[:, kept]
+    answers.columns = [label for label, _ in questions]
+    return answers, questions
+
+
+def _legend(questions):
+    return "Questions:\n" + "\n".join(f"{label}: {header}" for label, header in questions)
+
+
+def classify_answers(answers):
+    """
+    Guess the form question type behind a column of cleaned answers.
+
+    Returns one of "empty", "scale" (whole numbers 0-10), "numeric", "timestamp", "choice"
+    (multiple-choice or dropdown), "checkbox" (several options joined by ", ") or "text".
+    """
+    given = answers[answers != ""]
+    if given.empty:
+        return "empty"
+
+    numbers = pd.to_numeric(given, errors="coerce")
+    if numbers.notna().all():
+        values = numbers.to_numpy(dtype=float)
+        if np.all(values == np.round(values)) and values.min() >= 0 and values.max() <= 10:
+            return "scale"
+        return "numeric"
+
+    if given.str.contains(r"\d").all() and pd.to_datetime(given, errors="coerce", format="mixed").notna().all():
+        return "timestamp"
+
+    # Options repeat across respondents; free text mostly does not
+    options = given.str.split(CHECKBOX_SEPARATOR).explode()
+    if options.nunique() <= MAX_CHOICE_OPTIONS and options.str.len().max() <= MAX_OPTION_LENGTH \
+            and options.nunique() <= len(options) / 2:
+        if given.str.contains(CHECKBOX_SEPARATOR, regex=False).any() and options.nunique() <= given.nunique():
+            return "checkbox"
+        return "choice"
+    return "text"
+
+
+def _distribution(counts, answered):
+    # Options may contain commas themselves, so entries are separated by semicolons
+    return "; ".join(f"{option}: {count} ({count / answered:.0%})" for option, count in counts.items())
+
+
+def is_nps_question(header):
+    """
+    Whether a question header asks the Net Promoter question.
+
+    The question has to be about recommending, and a range stated in the header has to end at 10;
+    "How satisfied are you (1-7)?" is never scored as NPS, however high its answers go.
+    """
+    if not _RECOMMEND.search(header or ""):
+        return False
+    stated = _STATED_RANGE.search(header)
+    return stated is None or (int(stated.group(1)) in (0, 1) and int(stated.group(2)) == 10)
+
+
+def summarize_answers(answers, kind, nps=False):
+    """
+    Exact statistics for a structured question, computed with pandas and NumPy.
+
+    Returns a dict with the answer count and, depending on kind, the option distribution,
+    mean, median and, for scales with nps set, the NPS (percent promoters 9-10 minus percent detractors 0-6).
+    """
+    given = answers[answers != ""]
+    summary = {"type": kind, "answered": int(len(given))}
+
+    if kind in ("scale", "numeric"):
+        values = pd.to_numeric(given).to_numpy(dtype=float)
+        summary["mean"] = round(float(values.mean()), 2)
+        summary["median"] = round(float(np.median(values)), 2)
+        if kind == "scale":
+            levels, counts = np.unique(values.astype(int), return_counts=True)
+            summary["distribution"] = dict(zip(levels.tolist(), counts.tolist()))
+            if nps:
+                summary["nps"] = round(float(np.mean(values >= 9) - np.mean(values <= 6)) * 100, 1)
+    elif kind == "timestamp":
+        times = pd.to_datetime(given, format="mixed")
+        summary["first"] = str(times.min())
+        summary["last"] = str(times.max())
+    elif kind == "checkbox":
+        summary["distribution"] = given.str.split(CHECKBOX_SEPARATOR).explode().value_counts().to_dict()
+    elif kind == "choice":
+        summary["distribution"] = given.value_counts().to_dict()
+    return summary
+
+
+def _describe(label, summary):
+    line = f"{label} ({summary['type']}, {summary['answered']} answers):"
+    if "mean" in summary:
+        line += f" mean {summary['mean']}, median {summary['median']}"
+        if "nps" in summary:
+            line += f", NPS {summary['nps']:+g}"
+        if "distribution" in summary:
+            line += " | " + _distribution(summary["distribution"], summary["answered"])
+    elif "first" in summary:
+        line += f" from {summary['first']} to {summary['last']}"
+    elif "distribution" in summary:
+        line += " " + _distribution(summary["distribution"], summary["answered"])
+        if summary["type"] == "checkbox":
+            line += " (respondents could pick several)"
+    return line
+
+
+def summarize_survey(df, max_answer_chars=None):
+    """
+    Pre-analyze survey responses locally before they go to the model.
+
+    Structured questions (scales, numbers, timestamps, choices, checkboxes) are reduced to exact
+    statistics; only free-text answers stay as rows.
+
+    Args:
+        df (pd.DataFrame): Survey responses, one row per response, one column per question
+        max_answer_chars (int): Longest free-text answer kept in full
+
+    Returns:
+        dict: responses (row count), questions ({label, question, type, answered, ...} per column)
+        and text (pd.DataFrame of the free-text columns, labelled Q1, Q2, ...)
+    """
+    answers, questions = _prepare(df, max_answer_chars or Config.SURVEY_MAX_ANSWER_CHARS)
+
+    summaries = []
+    text_labels = []
+    for label, header in questions:
+        kind = classify_answers(answers[label])
+        if kind == "text":
+            text_labels.append(label)
+            summary = {"type": kind, "answered": int((answers[label] != "").sum())}
+        else:
+            summary = summarize_answers(answers[label], kind, nps=is_nps_question(header))
+        summaries.append({"label": label, "question": header, **summary})
+
+    text = answers[text_labels]
+    return {
+        "responses": len(answers),
+        "questions": summaries,
+        "text": text.loc[(text != "").any(axis=1)]
+    }
+
+
+def question_legend(summary):
+    """The Q1, Q2, ... legend for the questions of a summarize_survey() result."""
+    return _legend([(question["label"], question["question"]) for question in summary["questions"]])
+
+
+def survey_overview(summary):
+    """Responses count, question legend and exact structured statistics from summarize_survey()."""
+    sections = [f"Responses: {summary['responses']}", question_legend(summary)]
+    structured = [_describe(question["label"], question) for question in summary["questions"]
+                  if question["type"] != "text"]
+    if structured:
+        sections.append("Structured answers (exact counts):\n" + "\n".join(structured))
+    return "\n\n".join(sections)
+
+
+def token_batches(texts, max_tokens):
+    """Group consecutive texts into batches of about max_tokens each; a longer text gets a batch of its own."""
+    batches = []
+    current, used = [], 0
+    for text in texts:
+        tokens = estimate_tokens(text) + 1
+        if current and used + tokens > max_tokens:
+            batches.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def text_chunks(text, max_tokens):
+    """
+    Split free-text answers into CSV chunks of about max_tokens each, keeping whole rows together.
+
+    Every chunk repeats the header row.
+    """
+    if text.empty:
+        return []
+
+    header = ",".join(text.columns)
+    # Answers were cleaned of newlines, so every CSV line is exactly one response
+    rows = text.to_csv(index=False, header=False).strip().split("\n")
+    return [header + "\n" + "\n".join(batch)
+            for batch in token_batches(rows, max_tokens - estimate_tokens(header))]
+
+
+def survey_prompt(df, max_answer_chars=None):
+    """
+    Prompt text for a survey: question legend, exact summaries of structured answers, free-text answers as CSV.
+    """
+    summary = summarize_survey(df, max_answer_chars)
+    prompt = survey_overview(summary)
+    if not summary["text"].empty:
+        prompt += "\n\nFree-text answers (CSV):\n" + summary["text"].to_csv(index=False).strip()
+    return prompt
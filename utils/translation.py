@@ -0,0 +1,112 @@
+import hashlib
+import json
+import threading
+
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import translate_v2 as translate
+
+from Config.config import Config
+from utils.cache import TieredCache
+from utils.llm_cache import normalize_prompt
+from utils.metrics import call_metrics
+
+# Batch direction name -> (source language, target language)
+DIRECTIONS = {
+    "to_bg": ("en", "bg"),
+    "to_en": ("bg", "en"),
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+# Translation memory: repeated UI strings, survey questions and option labels skip the upstream call
+translation_memory = TieredCache(
+    "translation_memory",
+    max_entries=Config.TRANSLATION_CACHE_MAX_ENTRIES,
+    ttl=Config.TRANSLATION_CACHE_TTL,
+    persist=Config.TRANSLATION_CACHE_PERSIST,
+    disk_max_entries=Config.TRANSLATION_CACHE_DISK_MAX_ENTRIES
+)
+
+
+def get_translate_client():
+    """
+    Google Cloud Translation client for this worker process, created on first use.
+
+    Building a client loads credentials and opens a new HTTP session, so every request reuses this one.
+    With TRANSLATE_API_ENDPOINT set it talks to that server without credentials.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                endpoint = Config.TRANSLATE_API_ENDPOINT
+                if endpoint:
+                    _client = translate.Client(credentials=AnonymousCredentials(),
+                                               client_options={"api_endpoint": endpoint})
+                else:
+                    _client = translate.Client()
+    return _client
+
+
+def translation_chunks(texts, max_texts=None, max_chars=None):
+    """
+    Split texts into consecutive chunks within the provider's per-request limits.
+
+    A chunk holds at most max_texts strings and max_chars characters; a single longer text gets a chunk of its own.
+    """
+    max_texts = max_texts or Config.TRANSLATE_BATCH_MAX_TEXTS
+    max_chars = max_chars or Config.TRANSLATE_BATCH_MAX_CHARS
+    chunks = []
+    current, used = [], 0
+    for text in texts:
+        if current and (len(current) >= max_texts or used + len(text) > max_chars):
+            chunks.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += len(text)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def translation_key(source_language, target_language, text):
+    """Translation memory key: the language pair and the text with whitespace and Unicode variants normalized."""
+    payload = json.dumps([source_language, target_language, normalize_prompt(text)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def translate_texts(texts, source_language, target_language):
+    """
+    Translate a list of texts, answering from the translation memory where possible.
+
+    Texts the memory does not know are deduplicated and sent with one upstream request per chunk;
+    their translations are remembered for the next caller.
+
+    Returns:
+        list: Translated texts, in the order of texts
+    """
+    keys = [translation_key(source_language, target_language, text) for text in texts]
+    known = {}
+    missing = {}  # key -> first text with that key, in order
+    for key, text in zip(keys, texts):
+        if key in known or key in missing:
+            continue
+        cached = translation_memory.get(key)
+        if cached is not None:
+            known[key] = cached
+        else:
+            missing[key] = text
+
+    if missing:
+        client = get_translate_client()
+        pending = list(missing.items())
+        for chunk in translation_chunks([text for _, text in pending]):
+            with call_metrics.timed("translate", texts=len(chunk), chars=sum(len(text) for text in chunk)):
+                results = client.translate(chunk, target_language=target_language, source_language=source_language)
+            for (key, _), result in zip(pending[:len(chunk)], results):
+                known[key] = result["translatedText"]
+                translation_memory.set(key, result["translatedText"])
+            pending = pending[len(chunk):]
+
+    return [known[key] for key in keys]
@@ -1,40 +1,178 @@
+import re
 import requests
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 from Config.config import Config
+from utils import http_client
+from utils.cache import SqliteCache
+from utils.rate_limiter import rapidapi_limiter, parse_retry_after
+from utils.metrics import call_metrics
+from utils.websites import canonical_website
 
+place_details_cache = SqliteCache('place_details', max_entries=Config.PLACE_DETAILS_CACHE_MAX_ENTRIES)
+business_query_cache = SqliteCache('business_queries', max_entries=Config.BUSINESS_QUERY_CACHE_MAX_ENTRIES)
+contact_info_cache = SqliteCache('contact_info', max_entries=Config.CONTACT_INFO_CACHE_MAX_ENTRIES)
+# Last analysis per spreadsheet, so later calls only analyze rows added since
+feedback_analysis_cache = SqliteCache('feedback_analyses', max_entries=Config.FEEDBACK_ANALYSIS_MAX_ENTRIES)
+
+
+def contact_emails(contact_info):
+        """Emails from a RapidAPI response, which may or may not nest them under 'result'."""
+        if not contact_info:
+            return []
+        return contact_info.get('emails') or (contact_info.get('result') or {}).get('emails') or []
+
+def get_cached_contact_info(website_url):
+        """Return (found, contact_info) from the per-domain contact cache. contact_info may be a cached failure (None)."""
+        entry = contact_info_cache.get(canonical_website(website_url) or website_url)
+        if entry is None:
+            return False, None
+        return True, entry['contact_info']
+
+def cache_contact_info(website_url, contact_info):
+        """Cache a scrape result per domain; failures and responses without emails expire sooner."""
+        ttl = Config.CONTACT_INFO_CACHE_TTL if contact_emails(contact_info) else Config.CONTACT_INFO_NEGATIVE_CACHE_TTL
+        contact_info_cache.set(canonical_website(website_url) or website_url, {'contact_info': contact_info}, ttl)
+
+def place_details_from_response(place_id, data):
+        """
+        Place details from a Places details response body, cached only when Google answered OK.
+
+        OVER_QUERY_LIMIT, REQUEST_DENIED and the other error statuses come back with HTTP 200 and no result;
+        they return {} uncached so the next lookup asks again instead of remembering "no website".
+        """
+        status = data.get('status')
+        if status != 'OK':
+            print(f"Error fetching place details for {place_id}: {status} {data.get('error_message', '')}".rstrip())
+            return {}
+
+        place_details = data.get('result', {})
+        # Places without a website are cached too, for a shorter time, so we stop asking for them
+        ttl = Config.PLACE_DETAILS_CACHE_TTL if place_details.get('website') else Config.PLACE_DETAILS_NEGATIVE_CACHE_TTL
+        place_details_cache.set(place_id, place_details, ttl)
+        return place_details
+
+def _scrape_result(website, future):
+        try:
+            return website, future.result()
+        except Exception as e:
+            print(f"Error scraping {website}: {e}")
+            return website, None
+
+def iter_contact_info(websites, max_workers=None):
+        """
+        Scrape emails for websites as they arrive from any iterable (e.g. iter_businesses).
+
+        Each website is submitted to the pool as soon as it is produced, so scraping of the first
+        page runs while later pages are still being fetched. Placeholders such as 'N/A' are dropped
+        and every canonical domain is scraped once, its result fanned back out to each original
+        entry. Yields (website, contact_info) pairs in completion order; contact_info is None when
+        scraping failed.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or Config.SCRAPER_MAX_WORKERS) as executor:
+            pending = {}  # future -> canonical domain
+            entries = {}  # canonical domain -> original websites waiting for its result
+            finished = {}  # canonical domain -> contact info
+
+            def complete(future):
+                domain = pending.pop(future)
+                website, contact_info = _scrape_result(entries[domain][0], future)
+                finished[domain] = contact_info
+                return [(website, contact_info) for website in entries.pop(domain)]
+
+            for website in websites:
+                domain = canonical_website(website)
+                if domain is None:
+                    continue
+                if domain not in finished and domain not in entries:
+                    # Answer cached domains here instead of spending a pool slot on them
+                    found, contact_info = get_cached_contact_info(website)
+                    if found:
+                        finished[domain] = contact_info
+
+                if domain in finished:
+                    yield website, finished[domain]
+                elif domain in entries:
+                    entries[domain].append(website)
+                else:
+                    entries[domain] = [website]
+                    pending[executor.submit(scrape_contact_info, website, check_cache=False)] = domain
+
+                for future in [future for future in pending if future.done()]:
+                    yield from complete(future)
+
+            for future in as_completed(list(pending)):
+                yield from complete(future)
 
 def scrape_contact_info_parallel(websites):
-        """Scrape emails concurrently from a list of websites."""
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_website = {executor.submit(scrape_contact_info, website): website for website in websites}
-            results = {}
-            for future in as_completed(future_to_website):
-                website = future_to_website[future]
-                try:
-                    results[website] = future.result()
-                except Exception as e:
-                    print(f"Error scraping {website}: {e}")
-                    results[website] = None
-            return results
+        """Scrape emails concurrently from a list (or stream) of websites."""
+        return dict(iter_contact_info(websites))
 
 def get_place_details(place_id):
-        """Fetch place details using Google Places API."""
-        details_endpoint = "https://maps.googleapis.com/maps/api/place/details/json"
+        """Fetch place details using Google Places API, going through the shared place details cache."""
+        cached_details = place_details_cache.get(place_id)
+        if cached_details is not None:
+            return cached_details
+
+        details_endpoint = f"{Config.GOOGLE_PLACES_API_URL}/details/json"
         details_params = {
             'place_id': place_id,
             'fields': 'name,formatted_address,website',  # Request only the fields we care about
             'key': Config.GOOGLE_API_KEY
         }
 
-        details_response = requests.get(details_endpoint, params=details_params)
+        try:
+            details_response = http_client.get(details_endpoint, params=details_params)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching place details for {place_id}: {e}")
+            return {}
+
+        if details_response.status_code != 200:
+            return {}
 
-        return details_response.json().get('result', {}) if details_response.status_code == 200 else {}
+        return place_details_from_response(place_id, details_response.json())
 
-def get_businesses(query):
-        """Retrieve restaurants based on a search query."""
-        endpoint = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+def get_place_websites(place_ids, max_workers=None):
+        """Fetch the websites for a page of place ids concurrently, keeping the input order."""
+        if not place_ids:
+            return []
+
+        max_workers = max_workers or Config.PLACE_DETAILS_MAX_WORKERS
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(place_ids))) as executor:
+            details = executor.map(get_place_details, place_ids)
+            return [place_details.get('website', 'N/A') for place_details in details]
+
+def normalize_query(query):
+        """Normalize a Places search query so equivalent phrasings share one cache entry."""
+        query = (query or '').lower()
+        query = re.sub(r'[,.;!?]+', ' ', query)
+        # "cafes near Sofia", "cafes around Sofia" and "cafes close to Sofia" all mean "cafes in Sofia"
+        query = re.sub(r'\b(near|around|nearby|close to|in the area of)\b', ' in ', query)
+        return ' '.join(query.split())
+
+# Text search statuses of a page that was answered in full; anything else leaves the result list incomplete
+SEARCH_COMPLETE_STATUSES = ('OK', 'ZERO_RESULTS')
+
+def is_unready_page_token(status, params, token_retries):
+        """
+        Whether a text search page should be asked for again.
+
+        A next_page_token only becomes valid a short while after it is issued; until then Google answers
+        INVALID_REQUEST, so a page token request gets PLACES_PAGE_TOKEN_RETRIES more tries.
+        """
+        return status == 'INVALID_REQUEST' and 'pagetoken' in params and token_retries < Config.PLACES_PAGE_TOKEN_RETRIES
+
+def iter_businesses(query, max_workers=None, use_cache=True):
+        """Yield the websites for a search query page by page, as soon as each page's details resolve."""
+        cache_key = normalize_query(query)
+        if use_cache:
+            cached_websites = business_query_cache.get(cache_key)
+            if cached_websites is not None:
+                yield from cached_websites
+                return
+
+        endpoint = f"{Config.GOOGLE_PLACES_API_URL}/textsearch/json"
         params = {
             'query': query,
             'key': Config.GOOGLE_API_KEY,
@@ -42,88 +180,142 @@ def get_businesses(query):
         }
 
         busineses = []
+        token_retries = 0
         while True:
-            response = requests.get(endpoint, params=params)
-            if response.status_code == 200:
-                results = response.json().get('results', [])
-                for place in results:
-                    name = place.get('name')
-                    address = place.get('formatted_address')
-                    place_id = place.get('place_id')
-
-                    place_details = get_place_details(place_id)
-                    website = place_details.get('website', 'N/A')
-
-                    restaurant_info = {
-                        'name': name,
-                        'address': address,
-                        'website': website
-                    }
-                    busineses.append(restaurant_info['website'])
-                next_page_token = response.json().get('next_page_token')
-                if next_page_token:
-                    time.sleep(2)  # Wait for the next page to be available
-                    params['pagetoken'] = next_page_token
-                else:
-                    break
-            else:
+            try:
+                response = http_client.get(endpoint, params=params)
+            except requests.exceptions.RequestException as e:
+                print(f"Error: Unable to fetch data: {e}")
+                return
+            if response.status_code != 200:
                 print(f"Error: Unable to fetch data. HTTP Status Code: {response.status_code}")
+                # Don't cache a partial result list
+                return
+
+            data = response.json()
+            status = data.get('status')
+            if is_unready_page_token(status, params, token_retries):
+                token_retries += 1
+                time.sleep(Config.PLACES_NEXT_PAGE_DELAY)
+                continue
+            if status not in SEARCH_COMPLETE_STATUSES:
+                print(f"Error: Unable to fetch data. Places status: {status} {data.get('error_message', '')}".rstrip())
+                # Don't cache a partial result list
+                return
+
+            place_ids = [place.get('place_id') for place in data.get('results', [])]
+
+            # Details lookups for a page are independent, so dispatch them together
+            page_websites = get_place_websites(place_ids, max_workers=max_workers)
+            busineses.extend(page_websites)
+            yield from page_websites
+
+            next_page_token = data.get('next_page_token')
+            if not next_page_token:
                 break
+            time.sleep(Config.PLACES_NEXT_PAGE_DELAY)  # Wait for the next page to be available
+            params['pagetoken'] = next_page_token
+            token_retries = 0
+
+        if use_cache:
+            business_query_cache.set(cache_key, busineses, Config.BUSINESS_QUERY_CACHE_TTL)
 
-        return busineses
+def get_businesses(query, max_workers=None, use_cache=True):
+        """Retrieve restaurants based on a search query."""
+        return list(iter_businesses(query, max_workers=max_workers, use_cache=use_cache))
+
+def scrape_contact_info(website_url, check_cache=True):
+        """
+        Scrape emails from a given website using RapidAPI Email Scraper.
 
-def scrape_contact_info(website_url):
-        """Scrape emails from a given website using RapidAPI Email Scraper."""
-        url = "https://website-social-scraper-api.p.rapidapi.com/contacts"
+        Results are written to the per-domain contact cache. check_cache=False skips the read for
+        callers that already looked the domain up.
+        """
+        url = Config.RAPIDAPI_SCRAPER_URL
         querystring = {"website": website_url}
         headers = {
             "x-rapidapi-key": Config.RAPID_API_KEY,
             "x-rapidapi-host": "website-social-scraper-api.p.rapidapi.com"
         }
 
-        retries = 2
-        while retries > 0:
-            response = requests.get(url, headers=headers, params=querystring)
+        if check_cache:
+            found, contact_info = get_cached_contact_info(website_url)
+            if found:
+                return contact_info
+
+        for attempt in range(Config.SCRAPER_MAX_RETRIES + 1):
+            # Every worker draws from the same bucket, so a 429 slows all of them down together
+            rapidapi_limiter.acquire()
+            try:
+                response = http_client.get(url, headers=headers, params=querystring)
+            except requests.exceptions.RequestException as e:
+                # Timeouts and dropped connections are transient; retry them like a 429, without slowing the bucket
+                print(f"Error scraping {website_url}: {e}")
+                if attempt < Config.SCRAPER_MAX_RETRIES:
+                    time.sleep(rapidapi_limiter.backoff(attempt, Config.SCRAPER_BACKOFF_BASE, Config.SCRAPER_BACKOFF_CAP))
+                continue
 
             if response.status_code == 200:
-                return response.json()  # Return the JSON response on success
+                rapidapi_limiter.on_success()
+                contact_info = response.json()  # Return the JSON response on success
+                cache_contact_info(website_url, contact_info)
+                return contact_info
             elif response.status_code == 429:
-                retries -= 1
-                time.sleep(0.5)
+                rapidapi_limiter.on_rate_limited(parse_retry_after(response.headers.get('Retry-After')))
+                if attempt < Config.SCRAPER_MAX_RETRIES:
+                    time.sleep(rapidapi_limiter.backoff(attempt, Config.SCRAPER_BACKOFF_BASE, Config.SCRAPER_BACKOFF_CAP))
             else:
                 print(f"Error: Unable to scrape contact info. HTTP Status Code: {response.status_code}")
+                cache_contact_info(website_url, None)
                 return None
 
+        # Running out of retries on 429s or timeouts says nothing about the site, so it is not cached
         return None
 
-def fetch_sheet_data(spreadsheet_id):
+def fetch_sheet_data(spreadsheet_id, start_row=0):
         """
         Fetch data from the Google Apps Script endpoint and convert it to a Pandas DataFrame.
 
         Args:
             spreadsheet_id (str): The ID of the Google Spreadsheet.
+            start_row (int): Number of leading responses to skip. It is sent to the script as a startRow hint;
+                a script that honours it answers {"startRow": ..., "rows": [...]}, otherwise the plain list of
+                all rows is sliced here.
 
         Returns:
             pd.DataFrame: The data converted into a Pandas DataFrame.
         """
         # URL of the Google Apps Script endpoint
-        endpoint = "https://script.google.com/macros/s/AKfycbx5kuuR9WqK9ZxFNrWuy2lvEwpeG1CimGBfwcVtpEReBoSnNc1gCO6XiQcVsm598U8C/exec"
+        endpoint = Config.APPS_SCRIPT_SHEET_URL
 
-        try:
-            # Make the GET request
-            response = requests.post(url=endpoint, json={'id': spreadsheet_id})
+        with call_metrics.timed("sheet_fetch") as sample:
+            try:
+                # Make the GET request
+                payload = {'id': spreadsheet_id}
+                if start_row:
+                    payload['startRow'] = start_row
+                response = http_client.post(url=endpoint, json=payload, timeout=(Config.HTTP_CONNECT_TIMEOUT, Config.APPS_SCRIPT_TIMEOUT))
 
-            # Raise an exception if the request failed
-            response.raise_for_status()
+                # Raise an exception if the request failed
+                response.raise_for_status()
 
-            # Parse the JSON response
-            data = response.json()
-            # Convert JSON data to a Pandas DataFrame
-            df = pd.DataFrame(data)
-            return df
-        except requests.exceptions.RequestException as e:
-            print(f"HTTP Request failed: {e}")
-            return pd.DataFrame()  # Return an empty DataFrame on error
-        except ValueError as e:
-            print(f"Error parsing JSON: {e}")
-            return pd.DataFrame()
\ No newline at end of file
+                # Parse the JSON response
+                data = response.json()
+                if isinstance(data, dict) and 'rows' in data:
+                    # The script already skipped the rows before startRow
+                    df = pd.DataFrame(data['rows'])
+                else:
+                    # Convert JSON data to a Pandas DataFrame
+                    df = pd.DataFrame(data)
+                    if start_row:
+                        df = df.iloc[start_row:].reset_index(drop=True)
+                sample['rows'] = len(df)
+                return df
+            except requests.exceptions.RequestException as e:
+                print(f"HTTP Request failed: {e}")
+                sample['error'] = e
+                return pd.DataFrame()  # Return an empty DataFrame on error
+            except ValueError as e:
+                print(f"Error parsing JSON: {e}")
+                sample['error'] = e
+                return pd.DataFrame()
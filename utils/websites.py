@@ -0,0 +1,106 @@
+from urllib.parse import parse_qs, urlsplit
+
+PLACEHOLDERS = {'', 'n/a', 'na', 'none', 'null', '-'}
+
+# Second-level suffixes under which the registrable domain has three labels
+MULTI_LABEL_SUFFIXES = {
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'com.au', 'net.au', 'org.au', 'co.nz', 'co.jp', 'co.in',
+    'co.za', 'com.br', 'com.mx', 'com.tr', 'com.cn', 'com.sg', 'com.bg', 'org.bg', 'net.bg',
+    # Hosting platforms that give every business its own subdomain
+    'business.site', 'wixsite.com', 'blogspot.com', 'wordpress.com', 'github.io', 'squarespace.com',
+    'weebly.com', 'webnode.com', 'webflow.io'
+}
+
+# Second-level labels that country registries sell domains under (co.il, com.ar, ne.jp, gov.bg, edu.au, ...).
+# Under a two-letter country TLD they are part of the suffix, so the registrable domain keeps three labels.
+GENERIC_SECOND_LEVEL_LABELS = {
+    'ac', 'biz', 'co', 'com', 'edu', 'go', 'gob', 'gov', 'info', 'ltd', 'mil', 'ne', 'net', 'nom', 'or', 'org',
+    'plc', 'sch'
+}
+
+# Platforms where businesses live under a path, so the first path segment identifies the business
+PATH_TENANT_DOMAINS = {
+    'facebook.com', 'instagram.com', 'linktr.ee', 'sites.google.com', 'tripadvisor.com', 'yelp.com'
+}
+
+# First path segments that are containers rather than tenants; the tenant is the segment after them
+TENANT_CONTAINER_SEGMENTS = {
+    'facebook.com': {'pages', 'people', 'groups'},
+    'sites.google.com': {'view', 'site'}
+}
+
+# Pages that identify the tenant in the query string, e.g. facebook.com/profile.php?id=100012345
+QUERY_TENANT_PAGES = {
+    'facebook.com': ('profile.php', 'id')
+}
+
+
+def canonical_website(website):
+    """
+    Reduce a website URL to the registrable domain used to deduplicate scraping.
+
+    'https://www.Example.co.uk/menu' and 'example.co.uk' both become 'example.co.uk'.
+    Pages on shared platforms keep the tenant, e.g. 'facebook.com/pizzeria',
+    'facebook.com/profile.php?id=100012345' or 'sites.google.com/view/pizzeria'.
+    Returns None for placeholders such as 'N/A', for values that are not URLs and for platform
+    pages that do not name a business.
+    """
+    if not isinstance(website, str) or website.strip().lower() in PLACEHOLDERS:
+        return None
+
+    website = website.strip()
+    if website.lower().startswith(('mailto:', 'tel:', 'javascript:')):
+        return None
+    if '://' not in website:
+        website = f'http://{website}'
+
+    try:
+        parts = urlsplit(website)
+        host = (parts.hostname or '').rstrip('.')
+    except ValueError:
+        return None
+
+    if parts.scheme not in ('http', 'https') or '.' not in host:
+        return None
+
+    labels = host.split('.')
+    if labels[0] in ('www', 'm'):
+        labels = labels[1:]
+    host = '.'.join(labels)
+
+    for tenant_domain in PATH_TENANT_DOMAINS:
+        if host == tenant_domain or host.endswith(f'.{tenant_domain}'):
+            return _tenant(tenant_domain, parts)
+
+    if '.'.join(labels[-2:]) in MULTI_LABEL_SUFFIXES or \
+            (len(labels[-1]) == 2 and labels[-2] in GENERIC_SECOND_LEVEL_LABELS):
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def _tenant(tenant_domain, parts):
+    """Key of one business on a shared platform: the domain plus the path segment (or query id) naming it."""
+    segments = [segment for segment in parts.path.lower().split('/') if segment]
+    if not segments:
+        # The platform's home page names no business
+        return None
+
+    query_page = QUERY_TENANT_PAGES.get(tenant_domain)
+    if query_page is not None and segments[0] == query_page[0]:
+        tenant_ids = parse_qs(parts.query).get(query_page[1])
+        return f'{tenant_domain}/{query_page[0]}?{query_page[1]}={tenant_ids[0]}' if tenant_ids else None
+
+    if segments[0] in TENANT_CONTAINER_SEGMENTS.get(tenant_domain, ()):
+        # A bare container page (sites.google.com/view) names no business
+        return f'{tenant_domain}/{segments[0]}/{segments[1]}' if len(segments) > 1 else None
+    return f'{tenant_domain}/{segments[0]}'
+
+
+def group_websites(websites):
+    """Group websites by canonical domain, dropping placeholders. Keeps first-seen order."""
+    groups = {}
+    for website in websites:
+        domain = canonical_website(website)
+        if domain is not None:
+            groups.setdefault(domain, []).append(website)
+    return groups
@@ -0,0 +1,25 @@
+import argparse
+import signal
+import time
+
+from Config.config import Config
+from utils.job_queue import start_worker_pool
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run job queue workers next to the Flask app.")
+    parser.add_argument("--processes", type=int, default=Config.JOB_QUEUE_WORKER_PROCESSES)
+    args = parser.parse_args()
+
+    workers, stop_event = start_worker_pool("api_functions.job_tasks", args.processes)
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    print(f"Started {len(workers)} job queue workers on {Config.JOB_QUEUE_PATH}")
+
+    try:
+        while not stop_event.is_set():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        stop_event.set()
+
+    for worker in workers:
+        worker.join()